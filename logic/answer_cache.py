@@ -0,0 +1,246 @@
+# answer_cache.py
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE_TTL_S = float(os.getenv("ANSWER_CACHE_TTL_S", "86400"))
+
+# Written by embed.py after every ingestion run that changed the collection.
+# Anchored to the repo root: embed.py runs from logic/, the server from the root.
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+CORPUS_VERSION_FILE = os.getenv("CORPUS_VERSION_FILE", str(OUTPUT_DIR / "corpus_version"))
+
+
+# ========== Corpus Version Stamp ==========
+def read_corpus_version() -> str:
+    try:
+        with open(CORPUS_VERSION_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_corpus_version() -> str:
+    """Writes a new corpus version so every running answer cache drops its entries."""
+    version = str(time.time_ns())
+    os.makedirs(os.path.dirname(CORPUS_VERSION_FILE) or ".", exist_ok=True)
+    tmp_path = f"{CORPUS_VERSION_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, CORPUS_VERSION_FILE)
+    logging.info(f"🔖 Corpus version bumped to {version}")
+    return version
+
+
+# ========== Question Normalization ==========
+def normalize_question(text: str) -> str:
+    """Folds case, punctuation and whitespace so near-duplicate questions share a key."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in text)
+    return " ".join(text.split())
+
+
+# Words that never change what a question asks; everything else (days, names,
+# numbers, question words) must match before a cached answer is reused
+STOPWORDS = frozenset("""
+a an the is are was be been do does did can could would will please tell me us i we you
+to of in on at for from with about and or it its this that there any some my our your
+il lo la le gli i un una uno di da del della dei delle al alla in su per con e o è sono mi ci
+le la les un une des du de à au aux en et ou est sont je nous vous me moi il elle ce cette
+der die das ein eine den dem des zu im am an auf für mit und oder ist sind ich wir sie mir uns
+ال في من على إلى عن و هل
+""".split())
+
+
+def content_words(normalized: str) -> frozenset:
+    return frozenset(word for word in normalized.split() if word not in STOPWORDS)
+
+
+def question_key(question: str) -> str:
+    """
+    The cache key of a question: its sorted content words, so stopword and
+    word-order variants share one entry. Questions made only of stopwords
+    keep their normalized text.
+    """
+    normalized = normalize_question(question)
+    words = content_words(normalized)
+    return " ".join(sorted(words)) if words else normalized
+
+
+class _Entry:
+    __slots__ = ("answer", "created")
+
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.created = time.monotonic()
+
+
+class AnswerCache:
+    """
+    Caches final RAG answers keyed by (language, user profile, question key).
+
+    The question key ignores case, punctuation, stopwords and word order, so
+    "When does the museum open?" and "museum open when" share an entry while
+    "open on Monday?" and "open on Tuesday?" do not. No embedding is needed
+    to look an answer up. Entries expire after a TTL, the least recently used
+    entries are evicted past `max_entries`, and everything is dropped when
+    the corpus version stamp changes. With a shared state, answers are
+    shared between workers too.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_s: float = ANSWER_CACHE_TTL_S,
+        shared_state=None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # Answers are also kept here, so every worker benefits from them
+        self._shared_state = shared_state
+
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._version = read_corpus_version()
+        self._version_mtime = self._stat_version_file()
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    # ---------- Internals ----------
+    @staticmethod
+    def _stat_version_file() -> int:
+        try:
+            return os.stat(CORPUS_VERSION_FILE).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _check_version(self):
+        mtime = self._stat_version_file()
+        if mtime == self._version_mtime:
+            return
+        self._version_mtime = mtime
+        version = read_corpus_version()
+        if version != self._version:
+            logging.info(f"♻️ Corpus version changed ({self._version} -> {version}), clearing answer cache.")
+            self._version = version
+            self._entries.clear()
+
+    def _is_expired(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.created > self.ttl_s
+
+    @staticmethod
+    def _key(language: str, profile: Tuple[str, ...], question: str) -> tuple:
+        return language, tuple(profile), question_key(question)
+
+    def _lookup_local(self, key: tuple) -> Tuple[Optional[str], str]:
+        """Returns (answer, corpus_version) from this worker's entries."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_expired(entry):
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.answer, self._version
+            return None, self._version
+
+    def _count_shared(self, answer: Optional[str]) -> Optional[str]:
+        with self._lock:
+            if answer is not None:
+                self.hits += 1
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+        return answer
+
+    @staticmethod
+    def _shared_key(version: str, key: tuple) -> str:
+        payload = json.dumps([version, key[0], list(key[1]), key[2]], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_shared(self, version: str, key: tuple) -> Optional[str]:
+        if self._shared_state is None:
+            return None
+        try:
+            return self._shared_state.get("answer", self._shared_key(version, key))
+        except Exception as e:
+            logging.warning(f"Shared answer cache lookup failed: {e}")
+            return None
+
+    def _put_shared(self, key: tuple, answer: str):
+        if self._shared_state is None:
+            return
+        try:
+            self._shared_state.set("answer", self._shared_key(self._version, key), answer, self.ttl_s)
+        except Exception as e:
+            logging.warning(f"Shared answer cache store failed: {e}")
+
+    def _insert(self, key: tuple, answer: str):
+        with self._lock:
+            self._entries[key] = _Entry(answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ---------- Public API ----------
+    def lookup(self, language: str, profile: Tuple[str, ...], question: str) -> Optional[str]:
+        """Returns the cached answer, or None on a miss."""
+        key = self._key(language, profile, question)
+        answer, version = self._lookup_local(key)
+        if answer is not None:
+            return answer
+        # Another worker may already have answered the same question
+        return self._count_shared(self._get_shared(version, key))
+
+    async def alookup(self, language: str, profile: Tuple[str, ...], question: str) -> Optional[str]:
+        """Async `lookup`: the shared state is read in a worker thread, off the event loop."""
+        key = self._key(language, profile, question)
+        answer, version = self._lookup_local(key)
+        if answer is not None:
+            return answer
+        shared = None
+        if self._shared_state is not None:
+            shared = await asyncio.to_thread(self._get_shared, version, key)
+        return self._count_shared(shared)
+
+    def store(self, language: str, profile: Tuple[str, ...], question: str, answer: str):
+        key = self._key(language, profile, question)
+        self._insert(key, answer)
+        self._put_shared(key, answer)
+
+    async def astore(self, language: str, profile: Tuple[str, ...], question: str, answer: str):
+        key = self._key(language, profile, question)
+        self._insert(key, answer)
+        if self._shared_state is not None:
+            await asyncio.to_thread(self._put_shared, key, answer)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "corpus_version": self._version,
+            }
@@ -0,0 +1,152 @@
+# clients.py
+
+import os
+import threading
+from typing import Any, Callable, Dict
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ASTRA_DB_API_ENDPOINT = os.getenv("ASTRA_DB_API_ENDPOINT")
+ASTRA_DB_APPLICATION_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
+ASTRA_DB_NAMESPACE = os.getenv("ASTRA_DB_NAMESPACE")
+ASTRA_DB_COLLECTION = os.getenv("ASTRA_DB_COLLECTION", "balzi_rossi")
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+LLM_MODEL = "gpt-4o"
+LLM_TEMPERATURE = 0.7
+
+# Keep-alive pools shared by every OpenAI call of the process
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "32"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "120"))
+HTTP_CONNECT_TIMEOUT_S = float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "5"))
+HTTP_READ_TIMEOUT_S = float(os.getenv("HTTP_READ_TIMEOUT_S", "60"))
+
+# edge-tts opens one websocket per synthesis, so only its timeouts are configurable
+TTS_CONNECT_TIMEOUT_S = int(os.getenv("TTS_CONNECT_TIMEOUT_S", "10"))
+TTS_RECEIVE_TIMEOUT_S = int(os.getenv("TTS_RECEIVE_TIMEOUT_S", "60"))
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.RLock()
+
+
+def _shared(name: str, factory: Callable[[], Any]) -> Any:
+    """Builds a client on first use; every later call gets the same instance."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(HTTP_READ_TIMEOUT_S, connect=HTTP_CONNECT_TIMEOUT_S)
+
+
+def get_http_client() -> httpx.Client:
+    return _shared("http", lambda: httpx.Client(limits=http_limits(), timeout=http_timeout()))
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    return _shared("http_async", lambda: httpx.AsyncClient(limits=http_limits(), timeout=http_timeout()))
+
+
+def new_async_openai(**kwargs):
+    """
+    A fresh AsyncOpenAI client with the registry's pool settings, for code
+    that runs its own event loop (asyncio.run) and closes the client itself.
+    """
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(http_client=httpx.AsyncClient(limits=http_limits(), timeout=http_timeout()), **kwargs)
+
+
+def _build_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+    try:
+        from logic.embedding_cache import CachedEmbeddings
+    except ImportError:  # Imported by embed.py, which runs from logic/
+        from embedding_cache import CachedEmbeddings
+    return CachedEmbeddings(
+        OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
+        ),
+        model=EMBEDDING_MODEL,
+        dimensions=EMBEDDING_DIMENSIONS,
+    )
+
+
+def _build_vectorstore():
+    try:
+        from logic.local_index import LocalVectorIndex, VECTOR_BACKEND, LOCAL_INDEX_PATH
+    except ImportError:  # Imported by embed.py, which runs from logic/
+        from local_index import LocalVectorIndex, VECTOR_BACKEND, LOCAL_INDEX_PATH
+    if VECTOR_BACKEND == "local":
+        return LocalVectorIndex.load(get_embeddings(), LOCAL_INDEX_PATH)
+
+    from langchain_astradb import AstraDBVectorStore
+    return AstraDBVectorStore(
+        embedding=get_embeddings(),
+        collection_name=ASTRA_DB_COLLECTION,
+        api_endpoint=ASTRA_DB_API_ENDPOINT,
+        token=ASTRA_DB_APPLICATION_TOKEN,
+        namespace=ASTRA_DB_NAMESPACE,
+    )
+
+
+def _build_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+def get_embeddings():
+    """Cached OpenAI embeddings (memory and sqlite tiers) on the shared pools."""
+    return _shared("embeddings", _build_embeddings)
+
+
+def get_vectorstore():
+    """AstraDB collection, or the in-process index when VECTOR_BACKEND=local."""
+    return _shared("vectorstore", _build_vectorstore)
+
+
+def get_llm():
+    return _shared("llm", _build_llm)
+
+
+def tts_options() -> dict:
+    """Keyword arguments for edge_tts.Communicate."""
+    return {"connect_timeout": TTS_CONNECT_TIMEOUT_S, "receive_timeout": TTS_RECEIVE_TIMEOUT_S}
+
+
+async def aclose_clients():
+    """Closes the shared HTTP pools; called on application shutdown."""
+    with _clients_lock:
+        http = _clients.pop("http", None)
+        http_async = _clients.pop("http_async", None)
+        for name in ("embeddings", "vectorstore", "llm"):
+            _clients.pop(name, None)
+    if http_async is not None:
+        await http_async.aclose()
+    if http is not None:
+        http.close()
@@ -0,0 +1,98 @@
+# context_packer.py
+
+import os
+import logging
+import threading
+from typing import List
+
+import tiktoken
+from langchain_core.documents import Document
+
+# Total prompt tokens the retrieved context may use
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# No single document may take more than this, so one long artifact cannot crowd out the rest
+CONTEXT_DOC_MAX_TOKENS = int(os.getenv("CONTEXT_DOC_MAX_TOKENS", "600"))
+# Hits below this relevance (0..1) are dropped; the best hit is always kept
+CONTEXT_MIN_SCORE = float(os.getenv("CONTEXT_MIN_SCORE", "0.6"))
+# A trimmed document shorter than this is not worth including
+MIN_DOC_TOKENS = 48
+CONTEXT_MODEL = "gpt-4o"
+SEPARATOR = "\n\n"
+# Marks a trimmed document; its tokens count against the document's share
+ELLIPSIS = " …"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                _encoding = tiktoken.encoding_for_model(CONTEXT_MODEL)
+    return _encoding
+
+
+def _trim(text: str, tokens: List[int], limit: int) -> str:
+    """Cuts to `limit` tokens including the ellipsis, preferably at the last sentence end in the second half."""
+    encoding = get_encoding()
+    keep = max(limit - len(encoding.encode_ordinary(ELLIPSIS)), 0)
+    cut = encoding.decode(tokens[:keep])
+    end = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("\n\n"))
+    if end > len(cut) // 2:
+        cut = cut[:end + 1]
+    return cut.rstrip() + ELLIPSIS
+
+
+def select_hits(docs: List[Document], min_score: float = CONTEXT_MIN_SCORE) -> List[Document]:
+    """
+    Drops repeated hits of the same doc_id and hits scoring below `min_score`,
+    keeping rank order. Documents without a score (lexical matches) are kept.
+    """
+    selected, seen = [], set()
+    for doc in docs:
+        key = (doc.metadata.get("doc_id"), doc.metadata.get("language"))
+        if key in seen and key[0] is not None:
+            continue
+        score = doc.metadata.get("score")
+        if selected and score is not None and score < min_score:
+            continue
+        seen.add(key)
+        selected.append(doc)
+    return selected
+
+
+def pack_context(docs: List[Document], budget: int = CONTEXT_TOKEN_BUDGET,
+                 doc_max_tokens: int = CONTEXT_DOC_MAX_TOKENS, min_score: float = CONTEXT_MIN_SCORE) -> str:
+    """
+    Builds the prompt context from ranked hits: deduplicated, thresholded and
+    trimmed so the whole context fits in `budget` tokens.
+    """
+    if not docs:
+        return ""
+    encoding = get_encoding()
+    separator_tokens = len(encoding.encode_ordinary(SEPARATOR))
+    token_lists = encoding.encode_ordinary_batch([doc.page_content for doc in docs])
+    original_tokens = sum(len(tokens) for tokens in token_lists) + separator_tokens * (len(docs) - 1)
+    tokens_by_doc = {id(doc): tokens for doc, tokens in zip(docs, token_lists)}
+
+    parts = []
+    remaining = budget
+    for doc in select_hits(docs, min_score):
+        tokens = tokens_by_doc[id(doc)]
+        if parts:
+            remaining -= separator_tokens
+        limit = min(len(tokens), doc_max_tokens, remaining)
+        if limit < min(MIN_DOC_TOKENS, len(tokens)):
+            break
+        parts.append(doc.page_content if limit == len(tokens) else _trim(doc.page_content, tokens, limit))
+        remaining -= limit
+
+    context = SEPARATOR.join(parts)
+    packed_tokens = len(encoding.encode_ordinary(context))
+    logging.info(
+        f"Context packing: kept {len(parts)}/{len(docs)} hits, "
+        f"{packed_tokens} tokens (saved {max(original_tokens - packed_tokens, 0)})."
+    )
+    return context
@@ -1,17 +1,19 @@
 # embed.py
 
 import os
+import asyncio
 import argparse
 import logging
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
-from tqdm import tqdm
-from typing import List
-from langchain_openai import OpenAIEmbeddings
+from typing import Dict, List, Optional
 from langchain_core.documents import Document
-from langchain_astradb import AstraDBVectorStore
-from utils import load_all_docs  # ✅ Only import this now
-import tiktoken
+from utils import iter_all_docs, LOADER_TRACE_MEMORY
+from answer_cache import bump_corpus_version
+from local_index import LocalVectorIndex, VECTOR_BACKEND, LOCAL_INDEX_PATH
+from clients import get_embeddings, get_vectorstore, new_async_openai, EMBEDDING_MODEL, ASTRA_DB_COLLECTION, ASTRA_DB_API_ENDPOINT
+from ingest_engine import IngestEngine, CheckpointJournal
+from token_planner import plan_batches, chunk_id, MAX_REQUEST_TOKENS, MAX_REQUEST_INPUTS
+from ingest_manifest import load_manifest, save_manifest, plan_changes, removed_part_ids, stale_part_ids
 
 # ========== 1. Load environment variables ==========
 load_dotenv()
@@ -19,70 +21,86 @@ load_dotenv()
 # ========== 2. Configure Logging ==========
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-# ========== 3. Tokenizer Helper ==========
-encoding = tiktoken.encoding_for_model("text-embedding-3-small")
-
-def truncate_to_token_limit(text: str, max_tokens=8191) -> str:
-    try:
-        tokens = encoding.encode(text)
-        return encoding.decode(tokens[:max_tokens])
-    except Exception as e:
-        logging.warning(f"Tokenization failed for text: {e}")
-        return ""
-
-# ========== 4. Embedding Model ==========
-embedding_model = OpenAIEmbeddings(
-    model="text-embedding-3-small",
-    dimensions=512
-)
-
-# ========== 5. Astra Vector Store ==========
-vectorstore = AstraDBVectorStore(
-    embedding=embedding_model,
-    collection_name=os.getenv("ASTRA_DB_COLLECTION"),
-    api_endpoint=os.getenv("ASTRA_DB_API_ENDPOINT"),
-    token=os.getenv("ASTRA_DB_APPLICATION_TOKEN"),
-)
-
-# ========== 6. Embed a Single Batch ==========
-def embed_batch(batch_id: int, docs: List[Document], vectorstore) -> int:
-    for doc in docs:
-        doc.page_content = truncate_to_token_limit(doc.page_content)
-
+# ========== 3. Embedding Model ==========
+# Cached text-embedding-3-small, on the process-wide connection pools
+embedding_model = get_embeddings()
+
+# ========== 4. Vector Store (AstraDB or local index) ==========
+vectorstore = get_vectorstore()
+
+# ========== 5. Ingestion Manifest ==========
+def manifest_target() -> str:
+    """The manifest keeps one section per vector store, so switching backends never mixes state."""
+    if VECTOR_BACKEND == "local":
+        return f"local:{os.path.abspath(LOCAL_INDEX_PATH)}"
+    return f"astra:{ASTRA_DB_API_ENDPOINT}/{ASTRA_DB_COLLECTION}"
+
+
+# ========== 6. Async Upload ==========
+def process_batches_parallel(docs: List[Document], ids: List[str], batch_size=MAX_REQUEST_INPUTS,
+                             batch_tokens=MAX_REQUEST_TOKENS, max_workers=4,
+                             journal: Optional[CheckpointJournal] = None,
+                             entries: Optional[Dict[str, dict]] = None) -> List[str]:
+    """
+    Plans token-packed batches and uploads them through the async ingestion
+    engine; returns the IDs of documents whose parts were all stored. Each
+    completed document is journaled with its manifest entry.
+    """
+    if not docs:
+        logging.info("No new or changed documents to embed.")
+        return []
+
+    batches, part_counts = plan_batches(docs, ids, EMBEDDING_MODEL, batch_tokens, batch_size)
+    entries = entries if entries is not None else {}
+    for doc_id, count in part_counts.items():
+        if count > 1 and doc_id in entries:
+            entries[doc_id]["chunks"] = count
+
+    # Split documents count as uploaded once every part is stored
+    pending_parts = dict(part_counts)
+    parent_of = {chunk_id(doc_id, part): doc_id for doc_id, count in part_counts.items() for part in range(count)}
+    completed: List[str] = []
+
+    def on_batch_done(batch_ids: List[str]):
+        done = []
+        for part_id in batch_ids:
+            doc_id = parent_of[part_id]
+            pending_parts[doc_id] -= 1
+            if pending_parts[doc_id] == 0:
+                done.append(doc_id)
+        completed.extend(done)
+        if journal is not None and done:
+            journal.append({doc_id: entries[doc_id] for doc_id in done if doc_id in entries})
+
+    logging.info(f"\n🚀 Uploading {len(batches)} batches to the {VECTOR_BACKEND} vector store...\n")
+    engine = IngestEngine(embedding_model, vectorstore, max_concurrency=max_workers, on_batch_done=on_batch_done,
+                          client_factory=new_async_openai)
+    asyncio.run(engine.run(batches))
+    return completed
+
+
+def delete_ids(ids: List[str], what: str) -> bool:
+    if not ids:
+        return True
     try:
-        vectorstore.add_documents(docs)
-        logging.info(f"✅ Batch {batch_id} uploaded ({len(docs)} docs).")
-        return len(docs)
+        vectorstore.delete(ids=ids)
+        logging.info(f"🗑️ Deleted {len(ids)} {what}.")
+        return True
     except Exception as e:
-        logging.error(f"❌ Failed to embed batch {batch_id}: {e}")
-        return 0
+        logging.error(f"❌ Failed to delete {what}: {e}")
+        return False
 
-# ========== 7. Parallel Upload ==========
-def process_batches_parallel(docs: List[Document], batch_size=20, max_workers=4) -> int:
-    if not docs:
-        logging.warning("No documents to embed.")
-        return 0
-
-    batches = [
-        (i // batch_size, docs[i:i + batch_size])
-        for i in range(0, len(docs), batch_size)
-    ]
 
-    logging.info(f"\n🚀 Uploading {len(batches)} batches directly to AstraDB...\n")
-    total_uploaded = 0
+def delete_removed(doc_ids: List[str], manifest: Dict[str, dict]) -> List[str]:
+    """Deletes documents (all their parts) that disappeared from the source data; returns the deleted IDs."""
+    return doc_ids if delete_ids(removed_part_ids(doc_ids, manifest), "removed documents") else []
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(embed_batch, batch_id, batch_docs, vectorstore)
-            for batch_id, batch_docs in batches
-        ]
-        for future in tqdm(futures, desc="Embedding Upload Progress"):
-            total_uploaded += future.result()
 
-    logging.info(f"\n📦 Total documents uploaded: {total_uploaded}")
-    return total_uploaded
+def delete_stale_parts(doc_ids: List[str], manifest: Dict[str, dict], current: Dict[str, dict]):
+    """Deletes trailing parts of re-uploaded documents that now split into fewer parts."""
+    delete_ids(stale_part_ids(doc_ids, manifest, current), "stale document parts")
 
-# ========== 8. CLI Entry Point ==========
+# ========== 7. CLI Entry Point ==========
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Embed multilingual museum data into AstraDB.")
     parser.add_argument(
@@ -90,13 +108,84 @@ if __name__ == "__main__":
         nargs="*",
         help="Optional list of sources to load (e.g., exhibition artifact reviews). Default is all."
     )
-    parser.add_argument("--batch_size", type=int, default=20, help="Batch size for embedding uploads.")
-    parser.add_argument("--max_workers", type=int, default=4, help="Number of parallel workers.")
+    parser.add_argument("--batch_size", type=int, default=MAX_REQUEST_INPUTS, help="Maximum inputs per embedding request.")
+    parser.add_argument("--batch_tokens", type=int, default=MAX_REQUEST_TOKENS, help="Token budget per embedding request.")
+    parser.add_argument("--max_workers", type=int, default=4, help="Upper bound for concurrent embedding requests.")
+    parser.add_argument("--load_workers", type=int, default=1,
+                        help="Sources parsed concurrently (1 = sequential, fastest for local files).")
+    parser.add_argument("--trace_memory", action="store_true", help="Log each source's peak memory (slow).")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Empty the vector store and the manifest, then upload everything "
+             "(run once to remove duplicates left by runs without stable IDs)."
+    )
 
     args = parser.parse_args()
 
-    # ✅ Provide base_path when calling load_all_docs
-    all_docs = load_all_docs(selected_sources=args.sources, base_path="data")
-
-    logging.info(f"\n📚 Total documents loaded: {len(all_docs)}")
-    process_batches_parallel(all_docs, batch_size=args.batch_size, max_workers=args.max_workers)
+    target = manifest_target()
+    manifest = {} if args.rebuild else load_manifest(target)
+
+    # Batches an interrupted run already stored in AstraDB count as done. The
+    # local index is only persisted at the end, so it is never journaled.
+    journal = CheckpointJournal(target) if VECTOR_BACKEND != "local" else None
+    if journal is not None:
+        resumed = {} if args.rebuild else journal.replay()
+        if resumed:
+            logging.info(f"↩️ Resuming: {len(resumed)} documents were stored by an interrupted run.")
+            manifest.update(resumed)
+            save_manifest(manifest, target)
+        journal.clear()
+
+    if args.rebuild:
+        logging.info("🧹 Rebuild requested: emptying the vector store.")
+        if VECTOR_BACKEND == "local":
+            vectorstore = LocalVectorIndex(embedding_model)
+        else:
+            vectorstore.clear()
+
+    # Embed each source as soon as it is parsed while later sources are still loading.
+    # Removals are only detected for sources that actually loaded.
+    uploaded: List[str] = []
+    deleted: List[str] = []
+    total_loaded = 0
+    for source, docs in iter_all_docs(selected_sources=args.sources, base_path="data", workers=args.load_workers,
+                                      trace_memory=args.trace_memory or LOADER_TRACE_MEMORY):
+        if not docs:
+            logging.warning(f"⚠️ No documents from `{source}`; keeping its existing entries.")
+            continue
+        total_loaded += len(docs)
+
+        changed_docs, changed_ids, removed_ids, current = plan_changes({source: docs}, manifest)
+        logging.info(
+            f"🔎 `{source}`: {len(changed_docs)} new or changed, {len(removed_ids)} removed, "
+            f"{len(current) - len(changed_docs)} unchanged."
+        )
+
+        source_uploaded = process_batches_parallel(
+            changed_docs, changed_ids, batch_size=args.batch_size, batch_tokens=args.batch_tokens,
+            max_workers=args.max_workers, journal=journal, entries=current
+        )
+        delete_stale_parts(source_uploaded, manifest, current)
+        source_deleted = delete_removed(removed_ids, manifest)
+
+        # Record only what actually reached the store; failed batches are retried next run
+        for doc_id in source_uploaded:
+            manifest[doc_id] = current[doc_id]
+        for doc_id in source_deleted:
+            manifest.pop(doc_id, None)
+        save_manifest(manifest, target)
+        uploaded.extend(source_uploaded)
+        deleted.extend(source_deleted)
+
+    logging.info(f"\n📚 Total documents loaded: {total_loaded}, uploaded: {len(uploaded)}, deleted: {len(deleted)}")
+    if journal is not None:
+        journal.clear()
+
+    # The local backend keeps everything in memory; persist the snapshot
+    if VECTOR_BACKEND == "local" and (uploaded or deleted or args.rebuild):
+        vectorstore.save(LOCAL_INDEX_PATH)
+
+    # Invalidate cached answers in every running app process
+    if uploaded or deleted or args.rebuild:
+        bump_corpus_version()
@@ -0,0 +1,197 @@
+# embedding_cache.py
+
+import os
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", str(OUTPUT_DIR / "embedding_cache.sqlite"))
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000"))
+SQLITE_MAX_VARIABLES = 500
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC and collapsed whitespace, so trivially different inputs share a vector."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings client with an in-memory LRU and an on-disk sqlite
+    tier, keyed by (model, dimensions, normalized text). Only texts missing
+    from both tiers are sent to the provider, deduplicated, in one call.
+    """
+
+    def __init__(self, underlying: Embeddings, model: str, dimensions: int,
+                 db_path: Optional[str] = EMBEDDING_CACHE_PATH,
+                 memory_items: int = EMBEDDING_CACHE_MEMORY_ITEMS):
+        self.underlying = underlying
+        self.model = model
+        self.dimensions = dimensions
+        self.memory_items = memory_items
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------- Keys and tiers ----------
+    def cache_key(self, text: str) -> str:
+        payload = f"{self.model}\x1f{self.dimensions}\x1f{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup_memory(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.memory_hits += len(found)
+        return found
+
+    def _lookup_disk(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        if self._db is None or not keys:
+            return found
+        with self._lock:
+            for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[i:i + SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+        return found
+
+    @staticmethod
+    def _not_found(keys: List[str], found: Dict[str, List[float]]) -> List[str]:
+        return [key for key in dict.fromkeys(keys) if key not in found]
+
+    def _store(self, items: Dict[str, List[float]]):
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._db is not None and items:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+                    )
+                except sqlite3.Error as e:
+                    logging.warning(f"Embedding cache write failed: {e}")
+
+    def put(self, texts: List[str], vectors: List[List[float]]):
+        """Stores vectors computed elsewhere (e.g. by the ingestion engine)."""
+        self._store({self.cache_key(text): list(vector) for text, vector in zip(texts, vectors)})
+
+    def missing(self, texts: List[str]) -> List[str]:
+        """Returns the distinct normalized texts found in neither tier."""
+        _, _, missing = self._split(texts)
+        return list(missing.values())
+
+    def _collect_missing(self, keys: List[str], texts: List[str], found: Dict[str, List[float]]) -> Dict[str, str]:
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = normalize_text(text)
+        with self._lock:
+            self.misses += len(missing)
+        return missing
+
+    def _split(self, texts: List[str]):
+        keys = [self.cache_key(text) for text in texts]
+        found = self._lookup_memory(keys)
+        found.update(self._lookup_disk(self._not_found(keys, found)))
+        return keys, found, self._collect_missing(keys, texts, found)
+
+    async def _asplit(self, texts: List[str]):
+        """Async `_split`: memory hits stay on the loop, the sqlite tier is read in a worker thread."""
+        keys = [self.cache_key(text) for text in texts]
+        found = self._lookup_memory(keys)
+        on_disk = self._not_found(keys, found)
+        if self._db is not None and on_disk:
+            found.update(await asyncio.to_thread(self._lookup_disk, on_disk))
+        return keys, found, self._collect_missing(keys, texts, found)
+
+    async def _astore(self, items: Dict[str, List[float]]):
+        if self._db is None:
+            self._store(items)
+        else:
+            await asyncio.to_thread(self._store, items)
+
+    # ---------- Embeddings interface ----------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._split(texts)
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._split([text])
+        if missing:
+            vector = self.underlying.embed_query(missing[keys[0]])
+            self._store({keys[0]: vector})
+            return vector
+        return found[keys[0]]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = await self._asplit(texts)
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await self._astore(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, missing = await self._asplit([text])
+        if missing:
+            vector = await self.underlying.aembed_query(missing[keys[0]])
+            await self._astore({keys[0]: vector})
+            return vector
+        return found[keys[0]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_items": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,290 @@
+# ingest_engine.py
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import openai
+from openai import AsyncOpenAI
+from tqdm import tqdm
+from langchain_core.documents import Document
+
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "6"))
+INGEST_BACKOFF_BASE_S = float(os.getenv("INGEST_BACKOFF_BASE_S", "1"))
+INGEST_BACKOFF_MAX_S = float(os.getenv("INGEST_BACKOFF_MAX_S", "60"))
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+JOURNAL_PATH = os.getenv("INGEST_JOURNAL_PATH", str(OUTPUT_DIR / "ingest_journal.jsonl"))
+DEAD_LETTER_PATH = os.getenv("INGEST_DEAD_LETTER_PATH", str(OUTPUT_DIR / "ingest_dead_letter.jsonl"))
+# Below this share of the remaining rate limit the engine stops growing and backs off
+LOW_HEADROOM = 0.1
+THROUGHPUT_LOG_INTERVAL_S = 10
+
+# Errors worth another attempt; everything else goes straight to the dead-letter list
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+_DURATION_PART = re.compile(r"([\d.]+)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parses rate-limit reset values such as '20ms', '1s' or '6m0s' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def rate_limit_headroom(headers) -> Optional[float]:
+    """Smallest remaining share of the request and token limits, if the provider reports them."""
+    shares = []
+    for kind in ("requests", "tokens"):
+        limit = headers.get(f"x-ratelimit-limit-{kind}")
+        remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+        try:
+            if limit and remaining is not None and float(limit) > 0:
+                shares.append(float(remaining) / float(limit))
+        except ValueError:
+            continue
+    return min(shares) if shares else None
+
+
+def retry_after(headers) -> Optional[float]:
+    """How long the provider asks us to wait, from Retry-After or the rate-limit reset headers."""
+    if headers is None:
+        return None
+    waits = [
+        parse_duration(headers.get(name))
+        for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    waits = [w for w in waits if w is not None]
+    return max(waits) if waits else None
+
+
+def backoff_delay(attempt: int, base: float = INGEST_BACKOFF_BASE_S, cap: float = INGEST_BACKOFF_MAX_S) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: grows by about one slot per window of successful
+    requests, halves when the provider throttles and pauses new requests
+    until the advertised reset time.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            while self._in_flight >= int(self.limit):
+                await self._condition.wait()
+            self._in_flight += 1
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, headroom: Optional[float]):
+        if headroom is not None and headroom < LOW_HEADROOM:
+            self.limit = max(self.minimum, self.limit * 0.75)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self, wait_s: Optional[float]):
+        self.limit = max(self.minimum, self.limit / 2)
+        if wait_s:
+            self._paused_until = max(self._paused_until, time.monotonic() + wait_s)
+
+
+class CheckpointJournal:
+    """
+    Append-only record of batches that reached the vector store, written as
+    soon as each batch finishes, so an interrupted run can be resumed. Lines
+    carry a scope (the target store) so a resume never mixes up targets.
+    """
+
+    def __init__(self, scope: str, path: str = JOURNAL_PATH):
+        self.scope = scope
+        self.path = path
+
+    def append(self, entries: Dict[str, dict]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"scope": self.scope, "entries": entries}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self) -> Dict[str, dict]:
+        entries: Dict[str, dict] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn last line from a crash
+                    if record.get("scope") == self.scope:
+                        entries.update(record.get("entries", {}))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def write_dead_letter(ids: List[str], error: Exception, attempts: int, path: str = DEAD_LETTER_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ids": ids,
+        "attempts": attempts,
+        "error": f"{type(error).__name__}: {error}",
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class IngestEngine:
+    """
+    Embeds batches with direct OpenAI calls (to see the rate-limit headers),
+    seeds the embedding cache with the results and then upserts into the
+    vector store, whose own embedding calls are all cache hits.
+    """
+
+    def __init__(self, embeddings, vectorstore, max_concurrency: int = 4, initial_concurrency: int = 2,
+                 max_retries: int = INGEST_MAX_RETRIES, dead_letter_path: str = DEAD_LETTER_PATH,
+                 on_batch_done: Optional[Callable[[List[str]], None]] = None,
+                 client_factory: Callable[..., AsyncOpenAI] = AsyncOpenAI):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path
+        self.on_batch_done = on_batch_done
+        self.client_factory = client_factory
+
+        self.docs_done = 0
+        self.tokens_used = 0
+        self.dead_letters = 0
+
+    async def _embed(self, client: AsyncOpenAI, limiter: AdaptiveLimiter, texts: List[str]):
+        texts = self.embeddings.missing(texts)
+        if not texts:
+            return
+        await limiter.acquire()
+        try:
+            raw = await client.embeddings.with_raw_response.create(
+                model=self.embeddings.model, dimensions=self.embeddings.dimensions, input=texts
+            )
+        except openai.RateLimitError as e:
+            limiter.on_throttle(retry_after(e.response.headers))
+            raise
+        finally:
+            await limiter.release()
+
+        limiter.on_success(rate_limit_headroom(raw.headers))
+        response = raw.parse()
+        vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        self.embeddings.put(texts, vectors)
+        self.tokens_used += response.usage.total_tokens
+
+    async def _process(self, client, limiter, store_slots, batch_id: int, docs: List[Document], ids: List[str]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._embed(client, limiter, [doc.page_content for doc in docs])
+                async with store_slots:
+                    await asyncio.to_thread(self.vectorstore.add_documents, docs, ids=ids)
+                return True
+            except Exception as e:
+                retryable = isinstance(e, RETRYABLE_ERRORS) or not isinstance(e, openai.OpenAIError)
+                if not retryable or attempt == self.max_retries:
+                    logging.error(f"❌ Batch {batch_id} failed after {attempt + 1} attempts: {e}")
+                    write_dead_letter(ids, e, attempt + 1, self.dead_letter_path)
+                    self.dead_letters += 1
+                    return False
+                delay = backoff_delay(attempt)
+                if isinstance(e, openai.RateLimitError):
+                    delay = max(delay, retry_after(e.response.headers) or 0)
+                logging.warning(f"⚠️ Batch {batch_id} attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return False
+
+    async def run(self, batches: List[Tuple[List[Document], List[str]]]) -> List[str]:
+        """Processes all batches; returns the IDs that were stored."""
+        client = self.client_factory(max_retries=0)
+        limiter = AdaptiveLimiter(self.initial_concurrency, self.max_concurrency)
+        store_slots = asyncio.Semaphore(self.max_concurrency)
+        uploaded_ids: List[str] = []
+        started = time.monotonic()
+        last_log = started
+
+        progress = tqdm(total=sum(len(docs) for docs, _ in batches), desc="Embedding Upload Progress")
+        tasks = [
+            asyncio.ensure_future(self._process(client, limiter, store_slots, batch_id, docs, ids))
+            for batch_id, (docs, ids) in enumerate(batches)
+        ]
+        index_of = {task: i for i, task in enumerate(tasks)}
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    docs, ids = batches[index_of[task]]
+                    progress.update(len(docs))
+                    if task.result():
+                        uploaded_ids.extend(ids)
+                        self.docs_done += len(docs)
+                        if self.on_batch_done:
+                            self.on_batch_done(ids)
+
+                now = time.monotonic()
+                if now - last_log >= THROUGHPUT_LOG_INTERVAL_S:
+                    last_log = now
+                    logging.info(f"⏱️ {self.throughput(now - started)} (concurrency {limiter.limit:.1f})")
+        finally:
+            progress.close()
+            for task in tasks:
+                task.cancel()
+            await client.close()
+
+        logging.info(f"\n📦 Total documents uploaded: {len(uploaded_ids)} — {self.throughput(time.monotonic() - started)}")
+        if self.dead_letters:
+            logging.warning(f"⚠️ {self.dead_letters} batches written to {self.dead_letter_path}")
+        return uploaded_ids
+
+    def throughput(self, elapsed_s: float) -> str:
+        elapsed_s = max(elapsed_s, 1e-6)
+        return (f"{self.docs_done / elapsed_s:.1f} docs/s, "
+                f"{self.tokens_used / elapsed_s:.0f} tokens/s")
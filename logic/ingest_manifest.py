@@ -0,0 +1,118 @@
+# ingest_manifest.py
+
+import os
+import json
+import uuid
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+try:
+    from logic.token_planner import chunk_id
+except ImportError:  # Imported by embed.py, which runs from logic/
+    from token_planner import chunk_id
+
+# Deterministic IDs and the content-hash manifest that make embed.py runs
+# incremental: one section per vector store, {id: {"source", "hash", "chunks"}}
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", str(OUTPUT_DIR / "ingest_manifest.json"))
+DOC_ID_NAMESPACE = uuid.UUID("6f1d2c3e-8b0a-4e59-9a57-3b1f0c2d4e61")
+
+
+def assign_ids(source: str, docs: List[Document]) -> List[str]:
+    """
+    Stable ID per (source, doc_type, doc_id, language). Language variants share
+    a doc_id in some loaders, so the language is part of the key; exact
+    duplicates get an ordinal suffix in load order.
+    """
+    ids = []
+    seen: Dict[str, int] = {}
+    for doc in docs:
+        meta = doc.metadata
+        key = "|".join(str(meta.get(field, "")) for field in ("doc_type", "doc_id", "language"))
+        key = f"{source}|{key}"
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        if count:
+            key = f"{key}#{count}"
+        ids.append(str(uuid.uuid5(DOC_ID_NAMESPACE, key)))
+    return ids
+
+
+def content_hash(doc: Document) -> str:
+    payload = json.dumps([doc.page_content, doc.metadata], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(target: str, path: str = MANIFEST_PATH) -> Dict[str, dict]:
+    """Returns {id: {"source": ..., "hash": ...}} for the vector store `target`."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get(target, {})
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, AttributeError):
+        logging.warning(f"⚠️ Ignoring unreadable manifest: {path}")
+        return {}
+
+
+def save_manifest(entries: Dict[str, dict], target: str, path: str = MANIFEST_PATH):
+    data = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    data[target] = entries
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def plan_changes(loaded: Dict[str, List[Document]], manifest: Dict[str, dict]) -> Tuple[List[Document], List[str], List[str], Dict[str, dict]]:
+    """
+    Compares the loaded documents with the manifest. Returns the documents to
+    upsert, their IDs, the IDs to delete and the manifest entries of the
+    loaded documents. Only sources that were loaded are considered for deletion.
+    """
+    changed_docs, changed_ids = [], []
+    current: Dict[str, dict] = {}
+    for source, docs in loaded.items():
+        for doc_id, doc in zip(assign_ids(source, docs), docs):
+            entry = {"source": source, "hash": content_hash(doc)}
+            previous = manifest.get(doc_id, {})
+            if previous.get("source") == source and previous.get("hash") == entry["hash"]:
+                current[doc_id] = previous  # Unchanged, keeps its recorded part count
+                continue
+            current[doc_id] = entry
+            changed_docs.append(doc)
+            changed_ids.append(doc_id)
+
+    removed_ids = [
+        doc_id for doc_id, entry in manifest.items()
+        if entry.get("source") in loaded and doc_id not in current
+    ]
+    return changed_docs, changed_ids, removed_ids, current
+
+
+def part_ids(doc_id: str, start: int, stop: int) -> List[str]:
+    return [chunk_id(doc_id, part) for part in range(start, stop)]
+
+
+def removed_part_ids(doc_ids: List[str], manifest: Dict[str, dict]) -> List[str]:
+    """Every stored part of documents that disappeared from the source data."""
+    return [part_id for doc_id in doc_ids for part_id in part_ids(doc_id, 0, manifest[doc_id].get("chunks", 1))]
+
+
+def stale_part_ids(doc_ids: List[str], manifest: Dict[str, dict], current: Dict[str, dict]) -> List[str]:
+    """Trailing parts of re-uploaded documents that now split into fewer parts."""
+    return [
+        part_id for doc_id in doc_ids
+        for part_id in part_ids(doc_id, current[doc_id].get("chunks", 1), manifest.get(doc_id, {}).get("chunks", 1))
+    ]
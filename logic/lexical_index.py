@@ -0,0 +1,168 @@
+# lexical_index.py
+
+import os
+import re
+import math
+import logging
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+# Anchored to the repository, so the index loads the same corpus from any working directory
+LEXICAL_DATA_PATH = os.getenv("LEXICAL_DATA_PATH", str(Path(__file__).resolve().parents[1] / "data"))
+# Reciprocal rank fusion constant; larger values flatten the rank weighting
+RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+(?:[-./]\w+)*")
+_SEPARATORS = re.compile(r"[-./]")
+# Leading "Title: ..." / "Name: ..." of a document's text
+_TITLE = re.compile(r"^(?:Title|Name|Sub-artifact Name): (.+?)(?:\. |\.$|$)")
+# Metadata fields that name a document unambiguously
+IDENTIFIER_FIELDS = ("accession_number", "doc_id")
+TITLE_FIELDS = ("title_en", "name_en")
+
+
+def fold(text: str) -> str:
+    """Lowercases and removes accents and Arabic diacritics."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Words, plus compound identifiers such as 'br-vf-coll-001' both whole and split."""
+    tokens = []
+    for match in _TOKEN.finditer(fold(text)):
+        token = match.group()
+        tokens.append(token)
+        if _SEPARATORS.search(token):
+            tokens.extend(part for part in _SEPARATORS.split(token) if part)
+    return tokens
+
+
+def normalize_key(text: str) -> str:
+    return " ".join(match.group() for match in _TOKEN.finditer(fold(text)))
+
+
+def doc_key(doc: Document) -> Tuple:
+    """Identity of a document across the vector store and the lexical index."""
+    meta = doc.metadata
+    return meta.get("doc_id"), meta.get("language"), meta.get("doc_type"), meta.get("chunk", 0)
+
+
+class _Partition:
+    """BM25 postings for the documents of one language."""
+
+    __slots__ = ("docs", "postings", "lengths", "avg_length", "idf", "exact")
+
+    def __init__(self, docs: List[Document]):
+        self.docs = docs
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths = []
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+
+        for position, doc in enumerate(docs):
+            tokens = tokenize(doc.page_content)
+            self.lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                self.postings[term].append((position, count))
+
+            keys = {doc.metadata.get(field) for field in IDENTIFIER_FIELDS + TITLE_FIELDS}
+            title = _TITLE.match(doc.page_content)
+            if title:
+                keys.add(title.group(1))
+            for key in keys:
+                if isinstance(key, str) and normalize_key(key):
+                    self.exact[normalize_key(key)].append(position)
+
+        n = len(docs)
+        self.avg_length = sum(self.lengths) / n if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, tf in self.postings[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / (self.avg_length or 1))
+                scores[position] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 inverted index, one partition per language, plus an exact
+    lookup of identifiers (accession numbers, doc IDs) and titles.
+    """
+
+    def __init__(self, docs: List[Document]):
+        by_language: Dict[str, List[Document]] = defaultdict(list)
+        for doc in docs:
+            by_language[doc.metadata.get("language")].append(doc)
+        self._partitions = {language: _Partition(group) for language, group in by_language.items()}
+
+    def __len__(self) -> int:
+        return sum(len(p.docs) for p in self._partitions.values())
+
+    def search(self, query: str, language: str, k: int = 5) -> List[Tuple[Document, float]]:
+        partition = self._partitions.get(language)
+        if partition is None:
+            return []
+        return [(partition.docs[position], score) for position, score in partition.search(query, k)]
+
+    def exact_match(self, query: str, language: str, k: int = 5) -> List[Document]:
+        """
+        Documents named by the query: the whole query equals a title or an
+        identifier, or the query contains an identifier token.
+        """
+        partition = self._partitions.get(language)
+        if partition is None:
+            return []
+        key = normalize_key(query)
+        positions = list(partition.exact.get(key, []))
+        if not positions:
+            for token in key.split():
+                # Only compound tokens (e.g. accession numbers) are specific enough on their own
+                if _SEPARATORS.search(token) and any(c.isdigit() for c in token):
+                    positions.extend(partition.exact.get(token, []))
+        return [partition.docs[position] for position in dict.fromkeys(positions)][:k]
+
+
+def reciprocal_rank_fusion(*rankings: List[Document], k: int = 5, rrf_k: int = RRF_K) -> List[Document]:
+    """Merges ranked lists by summing 1 / (rrf_k + rank); the first copy of a document wins."""
+    scores: Dict[Tuple, float] = defaultdict(float)
+    first: Dict[Tuple, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc_key(doc)
+            scores[key] += 1 / (rrf_k + rank + 1)
+            first.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [first[key] for key in ranked]
+
+
+_lexical_index: Optional[LexicalIndex] = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """Builds the process-wide index from the corpus on first use."""
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                from logic.utils import load_all_docs
+                _lexical_index = LexicalIndex(load_all_docs(base_path=LEXICAL_DATA_PATH))
+                logging.info(f"Lexical index built with {len(_lexical_index)} documents.")
+    return _lexical_index
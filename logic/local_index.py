@@ -0,0 +1,369 @@
+# local_index.py
+
+import os
+import glob
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Retrieval backend used by retrieve_llm.py, retriever.py and embed.py: "astra" or "local"
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "astra").lower()
+# Anchored to the repository, so embed.py (run from logic/) and the app share one index
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", str(OUTPUT_DIR / "local_index"))
+
+# Partitions smaller than this are searched brute force; larger ones get an IVF
+IVF_MIN_PARTITION_SIZE = int(os.getenv("LOCAL_INDEX_IVF_MIN_SIZE", "20000"))
+IVF_NPROBE = int(os.getenv("LOCAL_INDEX_IVF_NPROBE", "8"))
+IVF_KMEANS_ITERATIONS = 10
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _matches_filter(metadata: dict, conditions: dict) -> bool:
+    """Supports the subset of Astra filter syntax we use: equality and $in."""
+    for key, expected in conditions.items():
+        value = metadata.get(key)
+        if isinstance(expected, dict):
+            if "$in" in expected and value not in expected["$in"]:
+                return False
+            if "$eq" in expected and value != expected["$eq"]:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class _Partition:
+    """Contiguous float32 vectors of one language, plus an optional IVF."""
+    __slots__ = ("vectors", "rows", "centroids", "lists", "mask_cache")
+
+    def __init__(self, vectors: np.ndarray, rows: np.ndarray,
+                 centroids: Optional[np.ndarray] = None, assignments: Optional[np.ndarray] = None):
+        self.vectors = vectors
+        self.rows = rows
+        self.centroids = centroids
+        self.lists = None
+        if centroids is not None and assignments is not None:
+            order = np.argsort(assignments, kind="stable")
+            bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+            self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+        self.mask_cache: Dict[str, np.ndarray] = {}
+
+
+def _train_ivf(vectors: np.ndarray, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means with sqrt(n) lists."""
+    n_lists = max(1, int(np.sqrt(len(vectors))))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(IVF_KMEANS_ITERATIONS):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vectors[assignments == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize_rows(centroids)
+    assignments = np.argmax(vectors @ centroids.T, axis=1)
+    return centroids.astype(np.float32), assignments.astype(np.int32)
+
+
+class LocalVectorIndex(VectorStore):
+    """
+    In-process vector store for the museum corpus.
+
+    Vectors are kept as one contiguous, L2-normalized float32 matrix per
+    `language` metadata value, so a language-filtered query is a single
+    matrix-vector product (or an IVF probe for large partitions). Scores
+    are reported like Astra's cosine similarity, in [0, 1]. Snapshots are
+    saved as .npy files and memory-mapped on load.
+    """
+
+    def __init__(self, embedding: Embeddings):
+        self.embedding = embedding
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._vectors: List[np.ndarray] = []
+        self._positions: Dict[str, int] = {}
+        self._partitions: Dict[Any, _Partition] = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ---------- Writing ----------
+    def add_embeddings(self, texts: List[str], vectors: List[List[float]],
+                       metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None) -> List[str]:
+        """Adds precomputed vectors; an existing id is replaced (upsert)."""
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        with self._lock:
+            self._materialize_vectors()
+            for doc_id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                position = self._positions.get(doc_id)
+                if position is None:
+                    self._positions[doc_id] = len(self._ids)
+                    self._ids.append(doc_id)
+                    self._texts.append(text)
+                    self._metadatas.append(dict(metadata))
+                    self._vectors.append(vector)
+                else:
+                    self._texts[position] = text
+                    self._metadatas[position] = dict(metadata)
+                    self._vectors[position] = vector
+            self._dirty = True
+        return list(ids)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, *,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            self._materialize_vectors()
+            remove = {self._positions[i] for i in ids if i in self._positions}
+            if not remove:
+                return False
+            keep = [p for p in range(len(self._ids)) if p not in remove]
+            self._ids = [self._ids[p] for p in keep]
+            self._texts = [self._texts[p] for p in keep]
+            self._metadatas = [self._metadatas[p] for p in keep]
+            self._vectors = [self._vectors[p] for p in keep]
+            self._positions = {doc_id: p for p, doc_id in enumerate(self._ids)}
+            self._dirty = True
+        return True
+
+    def get_by_ids(self, ids, /) -> List[Document]:
+        with self._lock:
+            return [self._document(self._positions[i]) for i in ids if i in self._positions]
+
+    # ---------- Partitions ----------
+    def _materialize_vectors(self):
+        # After a memory-mapped load the per-row list is empty; rebuild it for writes
+        if self._ids and not self._vectors:
+            vectors = [None] * len(self._ids)
+            for partition in self._partitions.values():
+                for row, vector in zip(partition.rows, partition.vectors):
+                    vectors[row] = np.array(vector, dtype=np.float32)
+            self._vectors = vectors
+
+    def _build_partitions(self):
+        by_language: Dict[Any, List[int]] = {}
+        for position, metadata in enumerate(self._metadatas):
+            by_language.setdefault(metadata.get("language"), []).append(position)
+
+        partitions = {}
+        for language, positions in by_language.items():
+            rows = np.asarray(positions, dtype=np.int64)
+            vectors = np.ascontiguousarray(
+                _normalize_rows(np.vstack([self._vectors[p] for p in positions]).astype(np.float32))
+            )
+            centroids = assignments = None
+            if len(rows) >= IVF_MIN_PARTITION_SIZE:
+                centroids, assignments = _train_ivf(vectors)
+            partitions[language] = _Partition(vectors, rows, centroids, assignments)
+        self._partitions = partitions
+        self._dirty = False
+
+    def _get_partitions(self) -> Dict[Any, _Partition]:
+        with self._lock:
+            if self._dirty:
+                self._build_partitions()
+            return self._partitions
+
+    # ---------- Search ----------
+    def _document(self, position: int) -> Document:
+        return Document(id=self._ids[position], page_content=self._texts[position],
+                        metadata=dict(self._metadatas[position]))
+
+    def _search_partition(self, partition: _Partition, query: np.ndarray, k: int,
+                          conditions: dict) -> List[Tuple[int, float]]:
+        if partition.lists is not None:
+            probe = np.argsort(partition.centroids @ query)[::-1][:IVF_NPROBE]
+            candidates = np.concatenate([partition.lists[c] for c in probe])
+            scores = partition.vectors[candidates] @ query
+        else:
+            candidates = None
+            scores = partition.vectors @ query
+
+        if conditions:
+            cache_key = json.dumps(conditions, sort_keys=True, default=str)
+            mask = partition.mask_cache.get(cache_key)
+            if mask is None:
+                mask = np.fromiter(
+                    (_matches_filter(self._metadatas[row], conditions) for row in partition.rows),
+                    dtype=bool, count=len(partition.rows)
+                )
+                partition.mask_cache[cache_key] = mask
+            keep = mask[candidates] if candidates is not None else mask
+            scores = np.where(keep, scores, -np.inf)
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        local_rows = candidates[top] if candidates is not None else top
+        return [
+            (int(partition.rows[r]), float(s))
+            for r, s in zip(local_rows, scores[top]) if np.isfinite(s)
+        ]
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[dict] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        conditions = dict(filter or {})
+        partitions = self._get_partitions()
+        if "language" in conditions and not isinstance(conditions["language"], dict):
+            partition = partitions.get(conditions.pop("language"))
+            selected = [partition] if partition is not None else []
+        else:
+            selected = list(partitions.values())
+
+        hits = []
+        for partition in selected:
+            hits.extend(self._search_partition(partition, query, k, conditions))
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+
+        # Report cosine similarity on Astra's [0, 1] scale
+        return [(self._document(row), (score + 1.0) / 2.0) for row, score in hits[:k]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                          **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   *, ids: Optional[List[str]] = None, **kwargs: Any) -> "LocalVectorIndex":
+        index = cls(embedding)
+        index.add_texts(texts, metadatas, ids=ids)
+        return index
+
+    # ---------- Snapshot ----------
+    def save(self, path: str = LOCAL_INDEX_PATH):
+        """
+        Writes a snapshot. Each snapshot gets its own directory and `path` is a
+        symlink to it, swapped with one atomic rename: readers see the old or
+        the new snapshot, never a partial one, and memory-mapped readers keep
+        their files until they reload.
+        """
+        partitions = self._get_partitions()
+        path = os.path.abspath(path)
+        snapshot_dir = f"{path}.{time.time_ns()}"
+        os.makedirs(snapshot_dir)
+
+        manifest = {"partitions": []}
+        for i, (language, partition) in enumerate(partitions.items()):
+            np.save(os.path.join(snapshot_dir, f"vectors_{i}.npy"), partition.vectors)
+            np.save(os.path.join(snapshot_dir, f"rows_{i}.npy"), partition.rows)
+            entry = {"language": language, "file_index": i, "ivf": partition.lists is not None}
+            if partition.lists is not None:
+                assignments = np.empty(len(partition.rows), dtype=np.int32)
+                for c, members in enumerate(partition.lists):
+                    assignments[members] = c
+                np.save(os.path.join(snapshot_dir, f"centroids_{i}.npy"), partition.centroids)
+                np.save(os.path.join(snapshot_dir, f"assignments_{i}.npy"), assignments)
+            manifest["partitions"].append(entry)
+
+        with open(os.path.join(snapshot_dir, "documents.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas}, f, ensure_ascii=False)
+        with open(os.path.join(snapshot_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        link_tmp = f"{path}.link"
+        if os.path.lexists(link_tmp):
+            os.remove(link_tmp)
+        os.symlink(os.path.basename(snapshot_dir), link_tmp)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)  # A plain directory written before snapshots were symlinked
+        os.replace(link_tmp, path)
+
+        # Older snapshots, and leftovers of interrupted saves
+        for old_dir in glob.glob(f"{glob.escape(path)}.*"):
+            if old_dir != snapshot_dir and os.path.isdir(old_dir) and not os.path.islink(old_dir):
+                shutil.rmtree(old_dir, ignore_errors=True)
+        logging.info(f"💾 Local index saved to {path} ({len(self._ids)} vectors).")
+
+    @classmethod
+    def load(cls, embedding: Embeddings, path: str = LOCAL_INDEX_PATH, mmap: bool = True) -> "LocalVectorIndex":
+        index = cls(embedding)
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            logging.warning(f"No local index snapshot at {path}; starting empty.")
+            return index
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, "documents.json"), "r", encoding="utf-8") as f:
+            documents = json.load(f)
+
+        index._ids = documents["ids"]
+        index._texts = documents["texts"]
+        index._metadatas = documents["metadatas"]
+        index._positions = {doc_id: p for p, doc_id in enumerate(index._ids)}
+
+        mmap_mode = "r" if mmap else None
+        for entry in manifest["partitions"]:
+            i = entry["file_index"]
+            vectors = np.load(os.path.join(path, f"vectors_{i}.npy"), mmap_mode=mmap_mode)
+            rows = np.load(os.path.join(path, f"rows_{i}.npy"))
+            centroids = assignments = None
+            if entry.get("ivf"):
+                centroids = np.load(os.path.join(path, f"centroids_{i}.npy"))
+                assignments = np.load(os.path.join(path, f"assignments_{i}.npy"))
+            index._partitions[entry["language"]] = _Partition(vectors, rows, centroids, assignments)
+        return index
+
+
+# Offline smoke test: python -m logic.local_index
+if __name__ == "__main__":
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from logic.utils import load_all_docs
+
+    logging.basicConfig(level=logging.INFO)
+    fake_embedding = DeterministicFakeEmbedding(size=512)
+    docs = load_all_docs(base_path="data")
+    index = LocalVectorIndex.from_documents(docs, fake_embedding)
+
+    for lang in ["en", "it", "fr", "de", "ar"]:
+        hits = index.similarity_search_with_score(docs[0].page_content, k=3, filter={"language": lang})
+        print(lang, [(doc.metadata.get("doc_id"), round(score, 3)) for doc, score in hits])
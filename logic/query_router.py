@@ -0,0 +1,219 @@
+# query_router.py
+
+import os
+import re
+import math
+import logging
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from logic.lexical_index import LEXICAL_DATA_PATH, fold, tokenize
+
+QUERY_ROUTER = os.getenv("QUERY_ROUTER", "1") == "1"
+# Below this route probability the question is searched across all document types.
+# On the labelled questions in test/test_query_router.py, misrouted questions peak
+# around 0.55 and keyword-backed practical questions start around 0.85.
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.8"))
+ROUTER_CACHE_SIZE = 4096
+# Words found in more than this share of a language's documents ("the", "museum", "di")
+# say nothing about the route and are left out of the model
+ROUTER_MAX_DOC_FREQUENCY = 0.2
+
+# Routes and the doc_types they search. Everything else (artifacts, sub-artifacts,
+# collection overview) is "collection", which is searched without a doc_type filter
+# because artifact types are open-ended and make up most of the corpus.
+COLLECTION = "collection"
+ROUTES: Dict[str, Tuple[str, ...]] = {
+    "practical": ("accessibility", "location", "visitor_services", "safety_info", "visitor_summary", "special_feature"),
+    "events": ("exhibition", "special_event", "educational_calendar"),
+    "education": ("educational_school", "educational_university", "educational_public", "educational_calendar", "research"),
+    "reviews": ("visitor_summary", "highlight", "example_review"),
+}
+
+# Keyword rules, matched as whole words (plus a plural "s"/"es", or an Arabic
+# clitic prefix) after accent folding, in any supported language. A hit is
+# evidence for its route, weighed together with the model, not a verdict.
+ROUTE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "practical": (
+        "ticket", "price", "cost", "fee", "admission", "how much", "opening hours", "opening times",
+        "closing time", "open today", "open on", "closed on", "park", "parking", "car park", "wheelchair",
+        "accessible", "accessibility", "disabled", "disability", "address", "how to get", "get there",
+        "directions", "train", "bus", "safety", "toilet", "restroom", "gift shop",
+        "biglietto", "biglietti", "prezzo", "prezzi", "costo", "quanto costa", "ingresso", "orari", "orario",
+        "parcheggio", "sedia a rotelle", "disabili", "disabilità", "accessibile", "indirizzo",
+        "come arrivare", "treno", "autobus", "sicurezza", "bagno", "bagni",
+        "billet", "prix", "tarif", "entrée", "horaires", "heures d'ouverture", "ouvert", "stationnement",
+        "fauteuil roulant", "handicap", "handicapé", "adresse", "comment aller", "comment venir", "sécurité",
+        "toilettes",
+        "eintritt", "eintrittspreis", "preis", "preise", "kosten", "kostet", "öffnungszeiten", "geöffnet",
+        "geschlossen", "parkplatz", "rollstuhl", "barrierefrei", "behindert", "anfahrt", "zug", "sicherheit",
+        "toilette", "toiletten",
+        "تذكرة", "تذاكر", "سعر", "أسعار", "دخول", "مواعيد", "ساعات العمل", "مفتوح", "مغلق", "موقف",
+        "كرسي متحرك", "إعاقة", "عنوان", "قطار", "حافلة", "سلامة", "مرحاض",
+    ),
+    "events": (
+        "exhibition", "event", "easter", "temporary exhibition", "calendar", "upcoming", "what's on",
+        "mostre", "mostra temporanea", "mostra in corso", "esposizione", "esposizioni", "evento", "eventi", "pasqua", "temporanea",
+        "temporanee", "calendario", "in programma",
+        "exposition", "événement", "pâques", "temporaire", "calendrier", "agenda",
+        "ausstellung", "ausstellungen", "sonderausstellung", "veranstaltung", "veranstaltungen", "ostern",
+        "kalender",
+        "معرض", "فعالية", "فعاليات", "عيد الفصح", "تقويم",
+    ),
+    "education": (
+        "school", "student", "pupil", "class trip", "school trip", "workshop", "university", "universities",
+        "research", "researcher", "project", "teacher", "education", "educational",
+        "scuola", "scuole", "studente", "studenti", "laboratorio", "laboratori", "ricerca", "ricerche",
+        "progetto", "progetti", "insegnante", "insegnanti", "didattica", "didattico", "università",
+        "école", "écoles", "élève", "étudiant", "atelier", "recherche", "projet", "enseignant", "université",
+        "scolaire",
+        "schule", "schulen", "schüler", "studenten", "forschung", "projekt", "projekte", "lehrer",
+        "universität",
+        "مدرسة", "طلاب", "طالب", "ورشة", "جامعة", "بحث", "مشروع",
+    ),
+    "reviews": (
+        "review", "rating", "opinion", "recommend", "recommended", "worth visiting", "worth a visit",
+        "worth it", "visitors think", "visitors say",
+        "recensione", "recensioni", "opinione", "opinioni", "valutazione", "consigliato", "consigliata",
+        "vale la pena",
+        "avis", "recommandé", "recommandez", "vaut la peine", "vaut le détour",
+        "bewertung", "bewertungen", "meinung", "empfehlen", "empfehlenswert", "lohnt sich",
+        "تقييم", "مراجعة", "رأي", "آراء",
+    ),
+}
+# How much a keyword hit multiplies the model's odds for its route
+ROUTER_KEYWORD_WEIGHT = float(os.getenv("ROUTER_KEYWORD_WEIGHT", "50"))
+
+
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    alternatives = []
+    for keyword in dict.fromkeys(fold(keyword) for keyword in keywords):
+        if keyword.isascii():
+            alternatives.append(re.escape(keyword) + "(?:e?s)?")
+        else:
+            # Arabic words may carry a conjunction, a preposition and the article: "وبال", "لل"...
+            alternatives.append("[وف]?(?:[بك]?ال|لل|[بلك])?" + re.escape(keyword))
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)")
+
+
+_KEYWORD_PATTERNS = {route: _keyword_pattern(keywords) for route, keywords in ROUTE_KEYWORDS.items()}
+
+
+def keyword_routes(question: str) -> List[str]:
+    folded = fold(question)
+    return [route for route, pattern in _KEYWORD_PATTERNS.items() if pattern.search(folded)]
+
+
+def _labels(doc_type: str) -> List[str]:
+    return [route for route, doc_types in ROUTES.items() if doc_type in doc_types] or [COLLECTION]
+
+
+class _NaiveBayes:
+    """Multinomial naive Bayes over the corpus text of one language, with a uniform prior."""
+
+    __slots__ = ("log_likelihood", "unseen", "labels")
+
+    def __init__(self, docs: List[Document]):
+        token_lists = [tokenize(doc.page_content) for doc in docs]
+        document_frequency = Counter(term for tokens in token_lists for term in set(tokens))
+        common = {term for term, n in document_frequency.items() if n > ROUTER_MAX_DOC_FREQUENCY * len(docs)}
+
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for doc, tokens in zip(docs, token_lists):
+            tokens = [t for t in tokens if t not in common]
+            for label in _labels(doc.metadata.get("doc_type")):
+                counts[label].update(tokens)
+
+        vocabulary = set().union(*counts.values()) if counts else set()
+        self.labels = list(counts)
+        self.log_likelihood: Dict[str, Dict[str, float]] = {}
+        self.unseen: Dict[str, float] = {}
+        for label, counter in counts.items():
+            total = sum(counter.values()) + len(vocabulary)
+            self.log_likelihood[label] = {term: math.log((n + 1) / total) for term, n in counter.items()}
+            self.unseen[label] = math.log(1 / total)
+
+    def predict(self, tokens: List[str]) -> Dict[str, float]:
+        known = [t for t in tokens if any(t in ll for ll in self.log_likelihood.values())]
+        if not known:
+            return {}
+        scores = {
+            label: sum(self.log_likelihood[label].get(t, self.unseen[label]) for t in known)
+            for label in self.labels
+        }
+        top = max(scores.values())
+        weights = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(weights.values())
+        return {label: weight / total for label, weight in weights.items()}
+
+
+class QueryRouter:
+    """
+    Predicts which doc_types a question is about with a naive Bayes model
+    trained on the corpus itself, where keyword hits multiply the odds of
+    their route. Returns None (search everything) for collection questions
+    and whenever the top route is below `min_confidence`.
+    """
+
+    def __init__(self, docs: List[Document], min_confidence: float = ROUTER_MIN_CONFIDENCE,
+                 keyword_weight: float = ROUTER_KEYWORD_WEIGHT):
+        by_language: Dict[str, List[Document]] = defaultdict(list)
+        for doc in docs:
+            by_language[doc.metadata.get("language")].append(doc)
+        self._models = {language: _NaiveBayes(group) for language, group in by_language.items()}
+        self.min_confidence = min_confidence
+        self.keyword_weight = keyword_weight
+        self.route = lru_cache(maxsize=ROUTER_CACHE_SIZE)(self._route)
+
+    def probabilities(self, question: str, language: str) -> Dict[str, float]:
+        """Route probabilities after keyword evidence; empty when nothing is known about the question."""
+        model = self._models.get(language)
+        if model is None:
+            return {}
+        probabilities = model.predict(tokenize(question))
+        routes = keyword_routes(question)
+        if not routes:
+            return probabilities
+        if not probabilities:
+            probabilities = dict.fromkeys(model.labels, 1 / len(model.labels))
+        weights = {
+            label: p * (self.keyword_weight if label in routes else 1)
+            for label, p in probabilities.items()
+        }
+        total = sum(weights.values())
+        return {label: weight / total for label, weight in weights.items()}
+
+    def _route(self, question: str, language: str) -> Optional[Tuple[str, ...]]:
+        probabilities = self.probabilities(question, language)
+        if not probabilities:
+            return None
+        label, confidence = max(probabilities.items(), key=lambda item: item[1])
+        if confidence < self.min_confidence or label == COLLECTION:
+            return None
+        return tuple(sorted(ROUTES[label]))
+
+
+_query_router: Optional[QueryRouter] = None
+_query_router_lock = threading.Lock()
+
+
+def get_query_router() -> QueryRouter:
+    """Trains the process-wide router from the corpus on first use."""
+    global _query_router
+    if _query_router is None:
+        with _query_router_lock:
+            if _query_router is None:
+                from logic.utils import load_all_docs
+                _query_router = QueryRouter(load_all_docs(base_path=LEXICAL_DATA_PATH))
+                logging.info(f"Query router trained for {len(_query_router._models)} languages.")
+    return _query_router
+
+
+def route_query(question: str, language: str) -> Optional[Tuple[str, ...]]:
+    """The doc_types to restrict retrieval to, or None to search all of them."""
+    if not QUERY_ROUTER:
+        return None
+    return get_query_router().route(question, language)
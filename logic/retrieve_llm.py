@@ -1,53 +1,57 @@
 
 import os
+import asyncio
 import logging
+import threading
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_astradb import AstraDBVectorStore
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import BaseOutputParser
-from langchain_core.runnables import RunnablePassthrough, RunnableLambda
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.output_parsers import BaseTransformOutputParser
+from langchain_core.messages import BaseMessage
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnablePassthrough, RunnableLambda, RunnableGenerator
+from logic.clients import get_embeddings, get_vectorstore, get_llm
+from logic.lexical_index import HYBRID_SEARCH, doc_key, get_lexical_index, reciprocal_rank_fusion
+from logic.context_packer import CONTEXT_MIN_SCORE, pack_context, get_encoding
+from logic.query_router import QUERY_ROUTER, get_query_router, route_query
 
 # Load environment variables
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 
-ASTRA_DB_API_ENDPOINT = os.getenv("ASTRA_DB_API_ENDPOINT")
-ASTRA_DB_APPLICATION_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
-ASTRA_DB_NAMESPACE = os.getenv("ASTRA_DB_NAMESPACE")
-ASTRA_DB_COLLECTION = "balzi_rossi"
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# Embeddings and vectorstore
-embedding_model = OpenAIEmbeddings(
-    model="text-embedding-3-small",
-    dimensions=512,
-    openai_api_key=OPENAI_API_KEY
-)
-
-vectorstore = AstraDBVectorStore(
-    embedding=embedding_model,
-    collection_name=ASTRA_DB_COLLECTION,
-    api_endpoint=ASTRA_DB_API_ENDPOINT,
-    token=ASTRA_DB_APPLICATION_TOKEN,
-    namespace=ASTRA_DB_NAMESPACE,
-)
-
-# LLM
-llm = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0.7,
-    openai_api_key=OPENAI_API_KEY
-)
-
 # Custom output parser that returns only the raw text (clean for TTS)
-class VoiceOutputParser(BaseOutputParser):
+class VoiceOutputParser(BaseTransformOutputParser[str]):
     def parse(self, text: str) -> str:
         # We can clean or trim the response here if needed
         return text.strip()
 
+    # When streaming, drop leading whitespace and hold trailing whitespace back
+    # until more text follows, so the joined chunks equal parse(full_text)
+    @staticmethod
+    def _strip_chunk(chunk, held: str, started: bool):
+        text = chunk.text() if isinstance(chunk, BaseMessage) else chunk
+        if not started:
+            text = text.lstrip()
+            if not text:
+                return "", "", False
+        text = held + text
+        stripped = text.rstrip()
+        return stripped, text[len(stripped):], True
+
+    def _transform(self, input):
+        held, started = "", False
+        for chunk in input:
+            text, held, started = self._strip_chunk(chunk, held, started)
+            if text:
+                yield text
+
+    async def _atransform(self, input):
+        held, started = "", False
+        async for chunk in input:
+            text, held, started = self._strip_chunk(chunk, held, started)
+            if text:
+                yield text
+
 # System prompt template for RAG, incorporating user profile to guide voice style
 SYSTEM_PROMPT_TEMPLATE = """
 You are an empathetic, multilingual AI assistant for the Balzi Rossi Archaeological Site and Museum.
@@ -95,39 +99,171 @@ Respond concisely and clearly:
 def prepare_prompt_input(inputs: dict) -> dict:
     return {
         "question": inputs["question"],
-        "context": "\n\n".join(doc.page_content for doc in inputs["context"]),
+        "context": pack_context(inputs["context"]),
         "emotion": inputs.get("emotion", "neutral"),
         "tone": inputs.get("tone", "friendly"),
         "age_group": inputs.get("age_group", "adult"),
         "language": inputs.get("language", "en")
     }
 
-def get_rag_chain():
-    def retriever_with_lang_filter(input_dict: dict):
-        # Filter by user selected language ONLY (no auto detect)
-        retriever = vectorstore.as_retriever(
-            search_kwargs={"k": 5, "filter": {"language": input_dict.get("language", "en")}}
+# Candidates fetched per request; the context packer keeps only those above the score threshold
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "8"))
+
+RAG_PROMPT = ChatPromptTemplate.from_template(SYSTEM_PROMPT_TEMPLATE)
+
+# Per-stage caps on concurrent OpenAI calls made by async requests in this process
+RETRIEVAL_MAX_CONCURRENCY = int(os.getenv("RETRIEVAL_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+retrieval_slots = asyncio.Semaphore(RETRIEVAL_MAX_CONCURRENCY)
+llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+_rag_chain = None
+_rag_chain_lock = threading.Lock()
+
+
+def _search_filter(language: str, doc_types) -> dict:
+    search_filter = {"language": language}
+    if doc_types:
+        search_filter["doc_type"] = {"$in": list(doc_types)}
+    return search_filter
+
+
+def _plan_search(inputs: dict):
+    """
+    Returns (question, language, lexical_index, doc_types, exact_hits).
+    Questions naming an accession number or a title are answered by
+    `exact_hits` and skip the embedding call entirely.
+    """
+    # Filter by user selected language ONLY (no auto detect)
+    language = inputs.get("language", "en")
+    question = inputs["question"]
+
+    lexical_index = get_lexical_index() if HYBRID_SEARCH else None
+    if lexical_index is not None:
+        exact = lexical_index.exact_match(question, language, k=RETRIEVER_K)
+        if exact:
+            return question, language, lexical_index, None, exact
+
+    # Narrow to the doc_types the question is about; None means search all of them
+    return question, language, lexical_index, route_query(question, language), None
+
+
+def _needs_widening(hits, doc_types) -> bool:
+    """A routed search whose best hit would not survive the context packer was likely misrouted."""
+    return bool(doc_types) and (not hits or max(score for _, score in hits) < CONTEXT_MIN_SCORE)
+
+
+def _merge_hits(*hit_lists):
+    """Best score per document, highest first."""
+    best = {}
+    for hits in hit_lists:
+        for doc, score in hits:
+            key = doc_key(doc)
+            if key not in best or score > best[key][1]:
+                best[key] = (doc, score)
+    return sorted(best.values(), key=lambda hit: hit[1], reverse=True)[:RETRIEVER_K]
+
+
+def _fuse(question: str, language: str, lexical_index, doc_types, hits):
+    # Hits carry their relevance score so the context packer can drop weak ones
+    vector_docs = [
+        Document(page_content=doc.page_content, metadata={**doc.metadata, "score": score})
+        for doc, score in hits
+    ]
+    if lexical_index is None:
+        return vector_docs
+
+    lexical_docs = [
+        doc for doc, _ in lexical_index.search(question, language, k=RETRIEVER_K)
+        if not doc_types or doc.metadata.get("doc_type") in doc_types
+    ]
+    return reciprocal_rank_fusion(vector_docs, lexical_docs, k=RETRIEVER_K)
+
+
+def retrieve_context(inputs: dict):
+    question, language, lexical_index, doc_types, exact = _plan_search(inputs)
+    if exact:
+        return exact
+
+    hits = get_vectorstore().similarity_search_with_relevance_scores(
+        question, k=RETRIEVER_K, filter=_search_filter(language, doc_types)
+    )
+    if _needs_widening(hits, doc_types):
+        doc_types = None
+        hits = _merge_hits(hits, get_vectorstore().similarity_search_with_relevance_scores(
+            question, k=RETRIEVER_K, filter=_search_filter(language, None)
+        ))
+    return _fuse(question, language, lexical_index, doc_types, hits)
+
+
+async def aretrieve_context(inputs: dict):
+    # The first call builds the lexical index and trains the router from the corpus
+    question, language, lexical_index, doc_types, exact = await asyncio.to_thread(_plan_search, inputs)
+    if exact:
+        return exact
+
+    async with retrieval_slots:
+        hits = await get_vectorstore().asimilarity_search_with_relevance_scores(
+            question, k=RETRIEVER_K, filter=_search_filter(language, doc_types)
         )
-        return {"retriever": retriever}
+        if _needs_widening(hits, doc_types):
+            doc_types = None
+            hits = _merge_hits(hits, await get_vectorstore().asimilarity_search_with_relevance_scores(
+                question, k=RETRIEVER_K, filter=_search_filter(language, None)
+            ))
+    return _fuse(question, language, lexical_index, doc_types, hits)
+
+
+def _llm_transform(prompts, config):
+    yield from get_llm().transform(prompts, config)
+
+
+async def _llm_atransform(prompts, config):
+    # Held for the whole generation, so it caps concurrent GPT-4o streams
+    async with llm_slots:
+        async for chunk in get_llm().atransform(prompts, config):
+            yield chunk
 
-    rag_chain = (
+
+def build_rag_chain():
+    return (
         RunnablePassthrough.assign(
-            retriever_info=RunnableLambda(retriever_with_lang_filter)
-        )
-        .assign(
-            context=lambda x: x["retriever_info"]["retriever"].invoke(x["question"])
-        )
-        .assign(
-            prompt_input=RunnableLambda(prepare_prompt_input)
+            context=RunnableLambda(retrieve_context, afunc=aretrieve_context)
         )
         .assign(
-            answer=ChatPromptTemplate.from_template(SYSTEM_PROMPT_TEMPLATE)
-                   | llm
+            answer=RunnableLambda(prepare_prompt_input)
+                   | RAG_PROMPT
+                   | RunnableGenerator(_llm_transform, _llm_atransform)
                    | VoiceOutputParser()
         )
         .pick("answer")
     )
-    return rag_chain
+
+
+def get_rag_chain():
+    """
+    Returns the process-wide RAG chain, compiling it on first use.
+    """
+    global _rag_chain
+    if _rag_chain is None:
+        with _rag_chain_lock:
+            if _rag_chain is None:
+                _rag_chain = build_rag_chain()
+    return _rag_chain
+
+
+def warm_up() -> None:
+    """
+    Sends a throwaway request through the embedding and LLM clients so the
+    first visitor does not pay for connection setup.
+    """
+    get_embeddings().embed_query("Balzi Rossi")
+    get_encoding()
+    if HYBRID_SEARCH:
+        get_lexical_index()
+    if QUERY_ROUTER:
+        get_query_router()
+    get_llm().invoke("Hello", max_tokens=1)
 
 # Example usage
 if __name__ == "__main__":
@@ -1,36 +1,11 @@
-from langchain_openai import OpenAIEmbeddings
-from langchain_astradb import AstraDBVectorStore
-from dotenv import load_dotenv
-import os
 from langdetect import detect, DetectorFactory # Import langdetect
+from logic.clients import get_vectorstore
 
 # Ensure consistent results from langdetect
 DetectorFactory.seed = 0
 
-# Load environment variables
-load_dotenv()
-
-ASTRA_DB_API_ENDPOINT = os.getenv("ASTRA_DB_API_ENDPOINT")
-ASTRA_DB_APPLICATION_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
-ASTRA_DB_NAMESPACE = os.getenv("ASTRA_DB_NAMESPACE")
-ASTRA_DB_COLLECTION = "balzi_rossi"
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# 1. OpenAI Multilingual Embedding (text-embedding-3-large)
-embedding_model = OpenAIEmbeddings(
-    model="text-embedding-3-small",
-    dimensions=512,
-    openai_api_key=OPENAI_API_KEY
-)
-
-# 2. AstraDB Vector Store (initialization remains the same, as it will handle filters via retriever)
-vectorstore = AstraDBVectorStore(
-    embedding=embedding_model,
-    collection_name=ASTRA_DB_COLLECTION,
-    api_endpoint=ASTRA_DB_API_ENDPOINT,
-    token=ASTRA_DB_APPLICATION_TOKEN,
-    namespace=ASTRA_DB_NAMESPACE,
-)
+# 1-2. Cached OpenAI embeddings and the vector store (AstraDB or local), shared with serving
+vectorstore = get_vectorstore()
 
 # 3. Test multilingual queries
 if __name__ == "__main__":
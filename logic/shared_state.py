@@ -0,0 +1,189 @@
+# shared_state.py
+
+import os
+import time
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+# "memory" keeps all state per process (single worker). "sqlite" and "redis" share
+# sessions, hot caches, audio streams and chunked uploads between uvicorn workers,
+# so the app can run with --workers N.
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", str(OUTPUT_DIR / "shared_state.sqlite"))
+STATE_REDIS_URL = os.getenv("STATE_REDIS_URL", "redis://localhost:6379/0")
+STATE_KEY_PREFIX = os.getenv("STATE_KEY_PREFIX", "balzi_rossi")
+# Expired sqlite rows are deleted at most this often
+STATE_PURGE_INTERVAL_S = 60
+
+
+class SqliteState:
+    """
+    Key-value state in one sqlite file in WAL mode, which several processes
+    on the same machine can read and write concurrently. Values are strings
+    with an optional expiry.
+    """
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires REAL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires IS NULL OR expires > ?)",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: str, ttl_s: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, now + ttl_s if ttl_s else None),
+            )
+            if now - self._last_purge > STATE_PURGE_INTERVAL_S:
+                self._last_purge = now
+                self._db.execute("DELETE FROM state WHERE expires IS NOT NULL AND expires <= ?", (now,))
+
+    def add(self, namespace: str, key: str, value: str, ttl_s: Optional[float] = None) -> bool:
+        """Sets the value only if the key is absent or expired; True if it was set."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM state WHERE namespace = ? AND key = ? AND expires IS NOT NULL AND expires <= ?",
+                (namespace, key, now),
+            )
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO state (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, now + ttl_s if ttl_s else None),
+            )
+        return cursor.rowcount == 1
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class RedisState:
+    """The same interface on any Redis-protocol server (Redis, Valkey, KeyDB...)."""
+
+    def __init__(self, url: str = STATE_REDIS_URL, prefix: str = STATE_KEY_PREFIX):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("redis not installed. Please run 'pip install redis' or use STATE_BACKEND=sqlite") from e
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        return self._client.get(self._key(namespace, key))
+
+    def set(self, namespace: str, key: str, value: str, ttl_s: Optional[float] = None):
+        self._client.set(self._key(namespace, key), value, px=int(ttl_s * 1000) if ttl_s else None)
+
+    def add(self, namespace: str, key: str, value: str, ttl_s: Optional[float] = None) -> bool:
+        return bool(self._client.set(self._key(namespace, key), value, px=int(ttl_s * 1000) if ttl_s else None, nx=True))
+
+    def delete(self, namespace: str, key: str):
+        self._client.delete(self._key(namespace, key))
+
+    def close(self):
+        self._client.close()
+
+
+class MemoryState:
+    """The same interface in a dict, for state that only this process needs to see."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _get(self, namespace: str, key: str) -> Optional[str]:
+        item = self._values.get((namespace, key))
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.time():
+            del self._values[(namespace, key)]
+            return None
+        return item[0]
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            return self._get(namespace, key)
+
+    def set(self, namespace: str, key: str, value: str, ttl_s: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._values[(namespace, key)] = (value, now + ttl_s if ttl_s else None)
+            if now - self._last_purge > STATE_PURGE_INTERVAL_S:
+                self._last_purge = now
+                for k in [k for k, (_, expires) in self._values.items() if expires is not None and expires <= now]:
+                    del self._values[k]
+
+    def add(self, namespace: str, key: str, value: str, ttl_s: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._get(namespace, key) is not None:
+                return False
+            self._values[(namespace, key)] = (value, time.time() + ttl_s if ttl_s else None)
+            return True
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._values.pop((namespace, key), None)
+
+    def close(self):
+        pass
+
+
+_shared_state = None
+_shared_state_lock = threading.Lock()
+
+
+def get_shared_state():
+    """The process-wide shared state, or None when STATE_BACKEND=memory."""
+    global _shared_state
+    if STATE_BACKEND == "memory":
+        return None
+    if _shared_state is None:
+        with _shared_state_lock:
+            if _shared_state is None:
+                if STATE_BACKEND == "sqlite":
+                    _shared_state = SqliteState()
+                elif STATE_BACKEND == "redis":
+                    _shared_state = RedisState()
+                else:
+                    raise ValueError(f"Unknown STATE_BACKEND '{STATE_BACKEND}' (expected memory, sqlite or redis)")
+                logging.info(f"Shared state backend: {type(_shared_state).__name__}")
+    return _shared_state
+
+
+def close_shared_state():
+    global _shared_state
+    with _shared_state_lock:
+        if _shared_state is not None:
+            _shared_state.close()
+            _shared_state = None
@@ -0,0 +1,144 @@
+# token_planner.py
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import tiktoken
+from langchain_core.documents import Document
+
+# Per-input limit of the OpenAI embedding models
+MAX_INPUT_TOKENS = 8191
+# Per-request limits of the embeddings endpoint
+MAX_REQUEST_TOKENS = int(os.getenv("EMBED_REQUEST_MAX_TOKENS", "300000"))
+MAX_REQUEST_INPUTS = 2048
+# Below this many texts, tiktoken's threaded batch encoder in-process is faster than a pool
+PROCESS_POOL_MIN_TEXTS = 2000
+
+_worker_encoding = None
+
+
+def _init_worker(model: str):
+    global _worker_encoding
+    _worker_encoding = tiktoken.encoding_for_model(model)
+
+
+def _encode_slice(texts: List[str]) -> List[List[int]]:
+    return _worker_encoding.encode_ordinary_batch(texts)
+
+
+def encode_corpus(texts: List[str], model: str, workers: int = 0) -> List[List[int]]:
+    """
+    Tokenizes every text once. Large corpora are split across worker
+    processes, each running tiktoken's batch encoder on its slice.
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(texts) < PROCESS_POOL_MIN_TEXTS or workers < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        return tiktoken.encoding_for_model(model).encode_ordinary_batch(texts)
+
+    # Fork so workers do not re-import the calling script and rebuild its clients
+    context = multiprocessing.get_context("fork")
+    slice_size = -(-len(texts) // workers)
+    slices = [texts[i:i + slice_size] for i in range(0, len(texts), slice_size)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(model,)) as executor:
+        return [tokens for part in executor.map(_encode_slice, slices) for tokens in part]
+
+
+def chunk_id(doc_id: str, part: int) -> str:
+    """The first part keeps the document ID, so unsplit documents are unaffected."""
+    return doc_id if part == 0 else f"{doc_id}:{part}"
+
+
+def _piece_bounds(tokens: List[int], max_tokens: int, encoding) -> List[Tuple[int, int]]:
+    """
+    Cuts `tokens` into runs of at most `max_tokens`. A token can hold only
+    part of a multi-byte UTF-8 character (Arabic letters, emoji), so each cut
+    moves back to a token that starts a character; otherwise both pieces
+    would decode to U+FFFD.
+    """
+    def starts_character(i: int) -> bool:
+        data = encoding.decode_single_token_bytes(tokens[i])
+        return not data or data[0] & 0xC0 != 0x80
+
+    bounds, start = [], 0
+    while len(tokens) - start > max_tokens:
+        end = start + max_tokens
+        cut = end
+        while cut > start and not starts_character(cut):
+            cut -= 1
+        if cut == start:
+            cut = end  # No character boundary in the whole window
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, len(tokens)))
+    return bounds
+
+
+def split_documents(docs: List[Document], ids: List[str], token_lists: List[List[int]], model: str,
+                    max_tokens: int = MAX_INPUT_TOKENS) -> Tuple[List[Document], List[str], List[int], Dict[str, int]]:
+    """
+    Splits documents longer than `max_tokens` into consecutive parts instead
+    of truncating them. Returns the parts, their IDs, their token counts and
+    the number of parts per document ID.
+    """
+    encoding = None
+    parts, part_ids, part_tokens = [], [], []
+    part_counts: Dict[str, int] = {}
+
+    for doc, doc_id, tokens in zip(docs, ids, token_lists):
+        if len(tokens) <= max_tokens:
+            parts.append(doc)
+            part_ids.append(doc_id)
+            part_tokens.append(len(tokens))
+            part_counts[doc_id] = 1
+            continue
+
+        encoding = encoding or tiktoken.encoding_for_model(model)
+        pieces = [tokens[start:end] for start, end in _piece_bounds(tokens, max_tokens, encoding)]
+        for part, piece in enumerate(pieces):
+            parts.append(Document(page_content=encoding.decode(piece), metadata={**doc.metadata, "chunk": part}))
+            part_ids.append(chunk_id(doc_id, part))
+            part_tokens.append(len(piece))
+        part_counts[doc_id] = len(pieces)
+
+    return parts, part_ids, part_tokens, part_counts
+
+
+def pack_batches(docs: List[Document], ids: List[str], token_counts: List[int],
+                 max_tokens: int = MAX_REQUEST_TOKENS, max_inputs: int = MAX_REQUEST_INPUTS) -> List[Tuple[List[Document], List[str]]]:
+    """Fills each request up to the token and input limits, in document order."""
+    batches = []
+    batch_docs, batch_ids, batch_tokens = [], [], 0
+    for doc, doc_id, count in zip(docs, ids, token_counts):
+        if batch_docs and (batch_tokens + count > max_tokens or len(batch_docs) >= max_inputs):
+            batches.append((batch_docs, batch_ids))
+            batch_docs, batch_ids, batch_tokens = [], [], 0
+        batch_docs.append(doc)
+        batch_ids.append(doc_id)
+        batch_tokens += count
+    if batch_docs:
+        batches.append((batch_docs, batch_ids))
+    return batches
+
+
+def plan_batches(docs: List[Document], ids: List[str], model: str,
+                 max_request_tokens: int = MAX_REQUEST_TOKENS,
+                 max_request_inputs: int = MAX_REQUEST_INPUTS) -> Tuple[List[Tuple[List[Document], List[str]]], Dict[str, int]]:
+    """
+    Tokenizes, splits and packs the documents. Returns the batches and the
+    number of parts per document ID.
+    """
+    token_lists = encode_corpus([doc.page_content for doc in docs], model)
+    parts, part_ids, part_tokens, part_counts = split_documents(docs, ids, token_lists, model)
+    batches = pack_batches(parts, part_ids, part_tokens, max_request_tokens, max_request_inputs)
+
+    total_tokens = sum(part_tokens)
+    split = sum(1 for count in part_counts.values() if count > 1)
+    logging.info(
+        f"🧮 Planned {len(parts)} inputs ({total_tokens} tokens, {split} documents split) "
+        f"into {len(batches)} requests, {total_tokens / max(len(batches), 1):.0f} tokens each on average."
+    )
+    return batches, part_counts
@@ -1,11 +1,22 @@
 import json
 import hashlib
-from typing import Any, Dict, List
+import logging
+import multiprocessing
+import os
+import pickle
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from langchain_core.documents import Document
 
 
 DEBUG_MODE = False  # Set to True during development
 
+LANGUAGES = ["en", "it", "fr", "de", "ar"]
+
 
 def _load_json_file(file_path: str) -> Dict[str, Any]:
     """Safely loads JSON from a file. Returns empty dict if invalid."""
@@ -23,102 +34,6 @@ def _load_json_file(file_path: str) -> Dict[str, Any]:
     return {}
 
 
-def _get_multilingual_field(item: dict, field: str, lang: str) -> str | list:
-    """Returns field[lang] if exists, else empty string or list."""
-    value = item.get(field, {})
-    if isinstance(value, dict):
-        return value.get(lang, "")
-    elif isinstance(value, list):
-        return [entry.get(lang, "") for entry in value]
-    return ""
-
-
-def _generate_id(obj: dict, prefix: str = "doc") -> str:
-    """Generates a stable unique ID for an object."""
-    obj_str = json.dumps(obj, sort_keys=True)
-    return f"{prefix}_{hashlib.md5(obj_str.encode()).hexdigest()}"
-
-def load_exhibition_data(file_path: str) -> List[Document]:
-    """
-    Loads and processes multilingual exhibition and event data from JSON.
-    Returns a list of LangChain Document objects with text and metadata.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
-
-    documents: List[Document] = []
-    museum_name = data.get("museum", "Balzi Rossi Prehistoric Museum")
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    # --- Process Permanent Exhibitions ---
-    for exhibit in data.get("exhibitions", []):
-        base_id = exhibit.get("id", _generate_id(exhibit, prefix="exhibit"))
-
-        for lang in languages:
-            title = _get_multilingual_field(exhibit, "title", lang)
-            exhibit_type = _get_multilingual_field(exhibit, "type", lang)
-            description = _get_multilingual_field(exhibit, "description", lang)
-            features = _get_multilingual_field(exhibit, "features", lang)
-
-            content_parts = []
-            if title: content_parts.append(f"Title: {title}")
-            if exhibit_type: content_parts.append(f"Type: {exhibit_type}")
-            if description: content_parts.append(f"Description: {description}")
-            if features: content_parts.append(f"Features: {', '.join(features)}")
-
-            text_content = ". ".join(content_parts) + "." if content_parts else ""
-
-            metadata = {
-                "doc_id": base_id,
-                "doc_type": "exhibition",
-                "language": lang,
-                "museum": museum_name,
-                "title_en": exhibit.get("title", {}).get("en"),
-                "type_en": exhibit.get("type", {}).get("en"),
-                "start_date": exhibit.get("start_date"),
-                "end_date": exhibit.get("end_date"),
-                "source": exhibit.get("source"),
-                "length": len(text_content.split()),
-            }
-
-            documents.append(Document(page_content=text_content, metadata=metadata))
-
-    # --- Process Special Events ---
-    for event in data.get("special_events", []):
-        base_id = event.get("id", _generate_id(event, prefix="event"))
-
-        for lang in languages:
-            title = _get_multilingual_field(event, "title", lang)
-            event_type = _get_multilingual_field(event, "type", lang)
-            description = _get_multilingual_field(event, "description", lang)
-            highlights = _get_multilingual_field(event, "highlights", lang)
-
-            content_parts = []
-            if title: content_parts.append(f"Title: {title}")
-            if event_type: content_parts.append(f"Type: {event_type}")
-            if description: content_parts.append(f"Description: {description}")
-            if highlights: content_parts.append(f"Highlights: {', '.join(highlights)}")
-
-            text_content = ". ".join(content_parts) + "." if content_parts else ""
-
-            metadata = {
-                "doc_id": base_id,
-                "doc_type": "special_event",
-                "language": lang,
-                "museum": museum_name,
-                "title_en": event.get("title", {}).get("en"),
-                "type_en": event.get("type", {}).get("en"),
-                "start_date": event.get("start_date"),
-                "end_date": event.get("end_date"),
-                "source": event.get("source"),
-                "length": len(text_content.split()),
-            }
-
-            documents.append(Document(page_content=text_content, metadata=metadata))
-
-    return documents
-
 def _generate_id(obj: dict, prefix: str = "doc") -> str:
     """Generates a stable, hash-based ID from a JSON-serializable object.
     Ensures consistent IDs across runs and environments.
@@ -128,759 +43,910 @@ def _generate_id(obj: dict, prefix: str = "doc") -> str:
     return f"{prefix}_{hashlib.md5(obj_str.encode('utf-8')).hexdigest()}" # Explicitly encode to utf-8
 
 
-def load_artifact_data(file_path: str) -> List[Document]:
-    """
-    Loads and processes multilingual artifact data from artifact.json.
-    Creates LangChain Document objects for both main artifacts and their sub-artifacts,
-    including detailed text content and rich metadata for each language.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
+def _id_or_hash(obj: dict, prefix: str, source: Optional[dict] = None) -> str:
+    """obj["id"] if present, else a hash of `source` (default: obj itself)."""
+    return obj["id"] if "id" in obj else _generate_id(obj if source is None else source, prefix=prefix)
 
-    documents: List[Document] = []
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    for item in data:
-        main_artifact_id = item.get("id", _generate_id(item, prefix="main_artifact"))
-
-        for lang in languages:
-            # --- Main Artifact/Burial Document ---
-            name = _get_multilingual_field(item, "name", lang)
-            item_type = item.get("type")
-            period = item.get("period")
-            estimated_date = item.get("estimated_date")
-            origin = _get_multilingual_field(item, "origin", lang)
-            description = _get_multilingual_field(item, "description", lang)
-            significance = _get_multilingual_field(item, "significance", lang)
-            material = _get_multilingual_field(item, "material", lang)
-
-            content_parts = []
-            if name: content_parts.append(f"Name: {name}")
-            if item_type: content_parts.append(f"Type: {item_type}")
-            if period: content_parts.append(f"Period: {period}")
-            if estimated_date: content_parts.append(f"Estimated Date: {estimated_date}")
-            if origin: content_parts.append(f"Origin: {origin}")
-            if material:
-                if isinstance(material, list):
-                    content_parts.append(f"Material: {', '.join(material)}")
-                else:
-                    content_parts.append(f"Material: {material}")
-            if description: content_parts.append(f"Description: {description}")
-            if significance: content_parts.append(f"Significance: {significance}")
-
-            text_content = ". ".join(filter(None, content_parts)).strip()
-            if text_content:
-                text_content += "."
-
-            metadata = {
-                "doc_id": main_artifact_id,
-                "doc_type": item_type.lower().replace(" ", "_") if item_type else "artifact",
-                "language": lang,
-                "name_en": item.get("name", {}).get("en"),
-                "type_en": item.get("type") if isinstance(item.get("type"), str) else "",
-                "period_en": item.get("period") if isinstance(item.get("period"), str) else "",
-                "estimated_date": estimated_date,
-                "accession_number": item.get("accession_number"),
-                "origin_en": item.get("origin", {}).get("en") if isinstance(item.get("origin"), dict) else "",
-                "material_en": item.get("material", {}).get("en") if isinstance(item.get("material"), dict) else "",
-                "curator": item.get("curator"),
-                "source": item.get("source"),
-                "length": len(text_content.split())
-            }
-
-            documents.append(Document(page_content=text_content, metadata=metadata))
-
-            # --- Sub-Artifacts ---
-            for sub_artifact in item.get("sub_artifacts", []):
-                sub_artifact_id = sub_artifact.get("id", _generate_id(sub_artifact, prefix=f"{main_artifact_id}_sub"))
-
-                sub_name = _get_multilingual_field(sub_artifact, "name", lang)
-                sub_material = sub_artifact.get("material")
-                sub_description = _get_multilingual_field(sub_artifact, "description", lang)
-                sub_estimated_date = sub_artifact.get("estimated_date")
-
-                sub_content_parts = []
-                if sub_name: sub_content_parts.append(f"Sub-artifact Name: {sub_name}")
-                if name: sub_content_parts.append(f"(Part of: {name})")
-                if sub_material: sub_content_parts.append(f"Material: {sub_material}")
-                if sub_estimated_date: sub_content_parts.append(f"Estimated Date: {sub_estimated_date}")
-                if sub_description: sub_content_parts.append(f"Description: {sub_description}")
-
-                sub_text_content = ". ".join(filter(None, sub_content_parts)).strip()
-                if sub_text_content:
-                    sub_text_content += "."
-
-                sub_metadata = {
-                    "doc_id": sub_artifact_id,
-                    "doc_type": "sub_artifact",
-                    "language": lang,
-                    "parent_artifact_id": main_artifact_id,
-                    "parent_artifact_name_en": item.get("name", {}).get("en"),
-                    "name_en": sub_artifact.get("name", {}).get("en") if isinstance(sub_artifact.get("name"), dict) else "",
-                    "material": sub_material,
-                    "estimated_date": sub_estimated_date,
-                    "accession_number": sub_artifact.get("accession_number"),
-                    "curator": sub_artifact.get("curator"),
-                    "length": len(sub_text_content.split())
-                }
-
-                documents.append(Document(page_content=sub_text_content, metadata=sub_metadata))
 
-    return documents
+def _lookup(record: dict, path: str, default: Any = None) -> Any:
+    """Follows a dotted key path, e.g. "how_to_get_there.by_train"."""
+    *parents, last = path.split(".")
+    for key in parents:
+        record = record.get(key, {})
+        if not isinstance(record, dict):
+            return default
+    return record.get(last, default)
 
 
-def load_accessibility_data(file_path: str) -> List[Document]:
+def _variants(value: Any) -> Dict[str, Any]:
     """
-    Loads multilingual accessibility information from accessibility.json.
-    Returns one Document per language with detailed features and notes.
+    Every language variant of a multilingual value in one walk: a
+    {lang: text} dict gives the texts, a list of such dicts gives one list
+    per language, anything else is empty.
     """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
-
-    documents: List[Document] = []
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    access_data = data.get("accessibility", {})
-    base_id = data.get("id", _generate_id(access_data, prefix="accessibility"))
-
-    for lang in languages:
-        title = _get_multilingual_field(access_data, "title", lang)
-        description = _get_multilingual_field(access_data, "description", lang)
-        additional_notes = _get_multilingual_field(access_data, "additional_notes", lang)
-
-        # Extract features list
-        features = []
-        for f in access_data.get("features", []):
-            feature_text = f.get("feature", {}).get(lang, "")
-            if feature_text:
-                features.append(feature_text)
-
-        # Combine into one readable text content
-        content_parts = []
-        if title: content_parts.append(f"Title: {title}")
-        if description: content_parts.append(f"Description: {description}")
-        if features:
-            content_parts.append("Features: " + "; ".join(features))
-        if additional_notes: content_parts.append(f"Additional Notes: {additional_notes}")
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
-
-        metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "accessibility",
-            "language": lang,
-            "title_en": access_data.get("title", {}).get("en"),
-            "length": len(text_content.split())
-        }
-
-        documents.append(Document(page_content=text_content, metadata=metadata))
-
-    return documents
-
-
-def load_educational_programs_data(file_path: str) -> List[Document]:
+    if isinstance(value, dict):
+        return {lang: value.get(lang, "") for lang in LANGUAGES}
+    if isinstance(value, list):
+        columns: Dict[str, list] = {lang: [] for lang in LANGUAGES}
+        for entry in value:
+            for lang in LANGUAGES:
+                columns[lang].append(entry.get(lang, ""))
+        return columns
+    return dict.fromkeys(LANGUAGES, "")
+
+
+# ========== Declarative Loader Engine ==========
+class Part:
     """
-    Loads and processes multilingual educational programs from educational_programs.json.
-    Creates one Document per program section (school, university, public, calendar) per language.
+    One piece of a document's text. `render(record, ctx)` returns either a
+    {lang: text} dict or one text shared by all languages. `translated` says
+    whether the part is the variant's own content: True, False, or a function
+    of the record returning the languages it has content for.
     """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
+    __slots__ = ("render", "translated")
 
-    programs = data.get("educational_programs", {})
-    base_id = data.get("id", _generate_id(programs, prefix="edu_programs"))
+    def __init__(self, render: Callable, translated: Any):
+        self.render = render
+        self.translated = translated
 
-    languages = ["en", "it", "fr", "de", "ar"]
-    documents: List[Document] = []
 
-    # --- School Programs ---
-    school = programs.get("school_programs", {})
-    for lang in languages:
-        description = _get_multilingual_field(school, "description", lang)
-        features = [
-            f"Age Groups: {', '.join(school.get('age_groups', []))}" if school.get("age_groups") else "",
-            f"Languages: {', '.join(school.get('languages', []))}" if school.get("languages") else "",
-            f"Cost: {school.get('cost', '')}",
-        ]
-        booking_info = school.get("booking_info", {})
-        contact = booking_info.get("contact")
-        phone = booking_info.get("phone")
-
-        content_parts = [
-            f"Section: School Programs",
-            f"Description: {description}" if description else "",
-            *features,
-            f"Booking Contact: {contact}" if contact else "",
-            f"Phone: {phone}" if phone else ""
-        ]
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
+def text(template: str, path: str, join: str = ", ", strip: bool = False,
+         when: Optional[Callable[[dict], bool]] = None) -> Part:
+    """A multilingual field, formatted with a precompiled template; lists are joined."""
+    fmt = template.format
 
-        metadata = {
-            "doc_id": f"{base_id}_school_{lang}",
-            "doc_type": "educational_school",
-            "language": lang,
-            "section": "school_programs",
-            "length": len(text_content.split()),
-        }
+    def render(record, ctx):
+        if when is not None and not when(record):
+            return {}
+        rendered = {}
+        for lang, value in _variants(_lookup(record, path, {})).items():
+            if isinstance(value, list):
+                value = join.join(value)
+            elif strip:
+                value = value.strip()
+            if value:
+                rendered[lang] = fmt(value)
+        return rendered
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
-
-    # --- University Collaborations ---
-    uni = programs.get("university_collaborations", {})
-    for lang in languages:
-        description = _get_multilingual_field(uni, "description", lang)
-        universities = uni.get("universities", [])
-
-        uni_details = []
-        for u in universities:
-            parts = [u.get("name", "")]
-            if "departments" in u:
-                parts.append("Departments: " + ", ".join(u["departments"]))
-            if "role" in u:
-                parts.append("Role: " + u["role"])
-            uni_details.append("; ".join(filter(None, parts)))
-
-        content_parts = [
-            f"Section: University Collaborations",
-            f"Description: {description}" if description else "",
-            "Partners: " + " | ".join(uni_details) if uni_details else ""
-        ]
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
+    return Part(render, translated=True)
 
-        metadata = {
-            "doc_id": f"{base_id}_university_{lang}",
-            "doc_type": "educational_university",
-            "language": lang,
-            "section": "university_collaborations",
-            "length": len(text_content.split()),
-        }
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
+def const(template: str, path: Any) -> Part:
+    """A language-independent value, given as a key path or a function of the record."""
+    fmt = template.format
+    get = path if callable(path) else (lambda record: _lookup(record, path))
 
-    # --- Public Workshops ---
-    public = programs.get("public_workshops", {})
-    for lang in languages:
-        description = _get_multilingual_field(public, "description", lang)
+    def render(record, ctx):
+        value = get(record)
+        return fmt(value) if value else ""
 
-        content_parts = [
-            f"Section: Public Workshops",
-            f"Description: {description}" if description else "",
-        ]
+    return Part(render, translated=False)
 
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
 
-        metadata = {
-            "doc_id": f"{base_id}_public_{lang}",
-            "doc_type": "educational_public",
-            "language": lang,
-            "section": "public_workshops",
-            "length": len(text_content.split()),
-        }
+def literal(value: str) -> Part:
+    return Part(lambda record, ctx: value, translated=False)
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
 
-    # --- Events Calendar ---
-    calendar = programs.get("events_calendar", {})
-    for lang in languages:
-        note = _get_multilingual_field(calendar, "note", lang)
-
-        content_parts = [
-            f"Section: Events Calendar",
-            f"Note: {note}" if note else "",
-        ]
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
-
-        metadata = {
-            "doc_id": f"{base_id}_calendar_{lang}",
-            "doc_type": "educational_calendar",
-            "language": lang,
-            "section": "events_calendar",
-            "length": len(text_content.split()),
-        }
+def computed(render: Callable, translated: Any = True) -> Part:
+    return Part(render, translated)
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
 
-    return documents
-
-
-def load_location_data(file_path: str) -> List[Document]:
+class DocSpec:
     """
-    Loads and processes multilingual location & directions data from location_direction.json.
-    Returns one Document per language with directions, address, parking info, and landmarks.
+    How one kind of record becomes documents: where the records are, how
+    their IDs and metadata are built and which parts make up the text.
+    `children` are nested specs emitted after their parent, per language.
     """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
-
-    documents: List[Document] = []
-    base_id = data.get("id", _generate_id(data, prefix="location"))
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    location = data.get("location", {})
-    how_to = data.get("how_to_get_there", {})
-    landmarks = data.get("nearby_landmarks", {})
-    parking = data.get("parking_info", {})
-
-    latitude = location.get("latitude")
-    longitude = location.get("longitude")
-
-    for lang in languages:
-        address = _get_multilingual_field(location, "address", lang)
-        by_train = _get_multilingual_field(how_to, "by_train", lang)
-        by_car = _get_multilingual_field(how_to, "by_car", lang)
-        walking_path = _get_multilingual_field(how_to, "walking_path", lang)
-        landmark_list = landmarks.get(lang, [])
-        parking_info = parking.get(lang, "")
-
-        content_parts = [
-            f"Address: {address}" if address else "",
-            f"By Train: {by_train}" if by_train else "",
-            f"By Car: {by_car}" if by_car else "",
-            f"Walking Path: {walking_path}" if walking_path else "",
-            f"Nearby Landmarks: {', '.join(landmark_list)}" if landmark_list else "",
-            f"Parking Info: {parking_info}" if parking_info else "",
-            f"Coordinates: Latitude {latitude}, Longitude {longitude}" if latitude and longitude else ""
-        ]
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
+    __slots__ = ("doc_type", "doc_id", "parts", "records", "base_id", "metadata",
+                 "sep", "end", "strip", "length", "languages", "children", "has_translated")
+
+    def __init__(self, doc_type, doc_id: str, parts: List[Part],
+                 records: Callable = lambda data: [data],
+                 base_id: Callable = lambda record, ctx: "",
+                 metadata: Optional[Callable] = None,
+                 sep: str = ". ", end: str = ".", strip: bool = True, length: bool = True,
+                 languages: Optional[Callable] = None, children: Tuple["DocSpec", ...] = ()):
+        self.doc_type = doc_type
+        self.doc_id = doc_id
+        self.parts = parts
+        self.records = records
+        self.base_id = base_id
+        self.metadata = metadata
+        self.sep = sep
+        self.end = end
+        self.strip = strip
+        self.length = length
+        self.languages = languages
+        self.children = children
+        self.has_translated = any(part.translated for part in parts)
+
+
+def _variant_docs(spec: DocSpec, record: dict, index: int, ctx: dict) -> Tuple[str, Dict[str, Document]]:
+    """Renders every part once, then assembles one document per language with content."""
+    base = spec.base_id(record, ctx)
+    doc_type = spec.doc_type(record) if callable(spec.doc_type) else spec.doc_type
+    shared = spec.metadata(record, ctx) if spec.metadata else {}
+    rendered = [
+        (part.render(record, ctx), part.translated(record) if callable(part.translated) else part.translated)
+        for part in spec.parts
+    ]
+
+    docs: Dict[str, Document] = {}
+    for lang in (spec.languages(record) if spec.languages else LANGUAGES):
+        pieces = []
+        translated = not spec.has_translated
+        for value, counts in rendered:
+            if isinstance(value, dict):
+                value = value.get(lang, "")
+            if value:
+                pieces.append(value)
+                translated = translated or counts is True or bool(counts and lang in counts)
+        # Skip empty translations instead of emitting boilerplate-only documents
+        if not translated:
+            continue
+        content = spec.sep.join(pieces)
+        if spec.strip:
+            content = content.strip()
+        if not content:
+            continue
+        content += spec.end
 
         metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "location",
+            "doc_id": spec.doc_id.format(base=base, lang=lang, i=index),
+            "doc_type": doc_type,
             "language": lang,
-            "address_en": location.get("address", {}).get("en"),
-            "latitude": latitude,
-            "longitude": longitude,
-            "length": len(text_content.split())
+            **shared,
         }
-
-        documents.append(Document(page_content=text_content, metadata=metadata))
-
-    return documents
-
-def load_museum_collection_data(file_path: str) -> List[Document]:
-    """
-    Loads and processes multilingual museum collection data from museum_collection.json.
-    Creates one LangChain Document per language combining overview, artifacts, and exhibits.
-    """
+        if spec.length:
+            metadata["length"] = len(content.split())
+        docs[lang] = Document(page_content=content, metadata=metadata)
+    return base, docs
+
+
+def _emit(spec: DocSpec, record: dict, index: int, ctx: dict, documents: List[Document]):
+    base, docs = _variant_docs(spec, record, index, ctx)
+    child_docs = []
+    for child_spec in spec.children:
+        child_ctx = {**ctx, "parent": record, "parent_id": base}
+        for child_index, child in enumerate(child_spec.records(record)):
+            child_docs.append(_variant_docs(child_spec, child, child_index, child_ctx)[1])
+
+    for lang in (spec.languages(record) if spec.languages else LANGUAGES):
+        if lang in docs:
+            documents.append(docs[lang])
+        for variants in child_docs:
+            if lang in variants:
+                documents.append(variants[lang])
+
+
+def load_source(name: str, file_path: str) -> List[Document]:
+    """Loads one data file according to its entry in SOURCE_SPECS."""
     data = _load_json_file(file_path)
     if not data:
         return []
 
     documents: List[Document] = []
-    base_id = data.get("id", _generate_id(data, prefix="museum_collection"))
-    collections = data.get("collections", {})
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    for lang in languages:
-        overview = _get_multilingual_field(collections, "overview", lang)
-        exhibits = _get_multilingual_field(collections, "exhibits", lang)
-
-        # Process notable artifacts list
-        artifacts = collections.get("notable_artifacts", [])
-        artifact_texts = []
-        for artifact in artifacts:
-            name = _get_multilingual_field(artifact, "name", lang)
-            description = _get_multilingual_field(artifact, "description", lang)
-            if name or description:
-                artifact_texts.append(f"{name}: {description}")
-
-        content_parts = [
-            f"Section: Museum Collection Overview",
-            f"Overview: {overview}" if overview else "",
-            f"Notable Artifacts: {' | '.join(artifact_texts)}" if artifact_texts else "",
-            f"Exhibits: {exhibits}" if exhibits else ""
-        ]
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
+    ctx = {"data": data}
+    for spec in SOURCE_SPECS[name][1]:
+        for index, record in enumerate(spec.records(data)):
+            _emit(spec, record, index, ctx, documents)
+    return documents
 
-        metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "museum_collection",
-            "language": lang,
-            "overview_en": collections.get("overview", {}).get("en"),
-            "length": len(text_content.split())
-        }
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
+# ========== Source-specific renderers ==========
+def _artifact_type(record: dict) -> str:
+    item_type = record.get("type")
+    return item_type.lower().replace(" ", "_") if item_type else "artifact"
+
+
+def _part_of(record: dict, ctx: dict) -> Dict[str, str]:
+    return {lang: f"(Part of: {name})" for lang, name in _variants(ctx["parent"].get("name", {})).items() if name}
+
+
+def _accessibility_features(record: dict, ctx: dict) -> Dict[str, str]:
+    columns: Dict[str, list] = {lang: [] for lang in LANGUAGES}
+    for feature in record.get("features", []):
+        for lang, value in _variants(feature.get("feature", {})).items():
+            if value:
+                columns[lang].append(value)
+    return {lang: "Features: " + "; ".join(values) for lang, values in columns.items() if values}
+
+
+def _university_partners(record: dict, ctx: dict) -> str:
+    details = []
+    for u in record.get("universities", []):
+        parts = [u.get("name", "")]
+        if "departments" in u:
+            parts.append("Departments: " + ", ".join(u["departments"]))
+        if "role" in u:
+            parts.append("Role: " + u["role"])
+        details.append("; ".join(filter(None, parts)))
+    return "Partners: " + " | ".join(details) if details else ""
+
+
+def _coordinates(record: dict, ctx: dict) -> str:
+    latitude = record.get("location", {}).get("latitude")
+    longitude = record.get("location", {}).get("longitude")
+    return f"Coordinates: Latitude {latitude}, Longitude {longitude}" if latitude and longitude else ""
+
+
+def _notable_artifacts(record: dict, ctx: dict) -> Dict[str, str]:
+    columns: Dict[str, list] = {lang: [] for lang in LANGUAGES}
+    for artifact in record.get("notable_artifacts", []):
+        names = _variants(artifact.get("name", {}))
+        descriptions = _variants(artifact.get("description", {}))
+        for lang in LANGUAGES:
+            if names[lang] or descriptions[lang]:
+                columns[lang].append(f"{names[lang]}: {descriptions[lang]}")
+    return {lang: f"Notable Artifacts: {' | '.join(texts)}" for lang, texts in columns.items() if texts}
+
+
+def _research_projects(record: dict, ctx: dict) -> Dict[str, str]:
+    columns: Dict[str, list] = {lang: [] for lang in LANGUAGES}
+    for project in record.get("ongoing_projects", []):
+        name = project.get("name")
+        universities = project.get("collaborating_universities", [])
+        funding = project.get("funding", {})
+        start_year = project.get("start_year")
+        status = project.get("status")
+        descriptions = _variants(project.get("description", {}))
+        for lang in LANGUAGES:
+            description = descriptions[lang]
+            project_parts = [
+                f"Project: {name}" if name else "",
+                f"Description: {description}" if description else "",
+                f"Status: {status}" if status else "",
+                f"Start Year: {start_year}" if start_year else "",
+                f"Collaborating Universities: {', '.join(universities)}" if universities else "",
+                f"Funding: {funding.get('organization')} - {funding.get('amount')} ({funding.get('program')})" if funding else ""
+            ]
+            columns[lang].append(". ".join(filter(None, project_parts)))
+    return {lang: ". ".join(filter(None, texts)) for lang, texts in columns.items()}
+
+
+def _project_languages(record: dict) -> set:
+    return {
+        lang for project in record.get("ongoing_projects", [])
+        for lang, description in _variants(project.get("description", {})).items() if description
+    }
 
-    return documents
 
+def _research_metadata(record: dict, ctx: dict) -> dict:
+    projects = record.get("ongoing_projects", [])
+    return {
+        "main_project_en": projects[0].get("name") if projects else "",
+        "start_year": projects[0].get("start_year") if projects else "",
+        "status": projects[0].get("status") if projects else "",
+    }
 
 
-def load_research_data(file_path: str) -> List[Document]:
-    """
-    Loads and processes multilingual research data from research.json.
-    Returns one Document per language covering research projects, excavations, and outreach.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
+def _safety_guidelines(record: dict, ctx: dict) -> Dict[str, str]:
+    columns: Dict[str, list] = {lang: [] for lang in LANGUAGES}
+    for entry in record.get("guidelines", []):
+        for lang, point in _variants(entry.get("point", {})).items():
+            if point:
+                columns[lang].append(f"- {point}")
+    return {lang: "Guidelines:\n" + "\n".join(points) for lang, points in columns.items() if points}
 
-    documents: List[Document] = []
-    base_id = data.get("id", _generate_id(data, prefix="research"))
-    research = data.get("research", {})
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    ongoing_projects = research.get("ongoing_projects", [])
-    recent_excavations = research.get("recent_excavations", {})
-    public_engagement = research.get("public_engagement", {})
-
-    for lang in languages:
-        content_parts = []
-
-        # --- Ongoing Projects ---
-        if ongoing_projects:
-            for project in ongoing_projects:
-                name = project.get("name")
-                description = _get_multilingual_field(project, "description", lang)
-                universities = project.get("collaborating_universities", [])
-                funding = project.get("funding", {})
-                funding_org = funding.get("organization")
-                funding_amount = funding.get("amount")
-                program = funding.get("program")
-                start_year = project.get("start_year")
-                status = project.get("status")
-
-                project_parts = [
-                    f"Project: {name}" if name else "",
-                    f"Description: {description}" if description else "",
-                    f"Status: {status}" if status else "",
-                    f"Start Year: {start_year}" if start_year else "",
-                    f"Collaborating Universities: {', '.join(universities)}" if universities else "",
-                    f"Funding: {funding_org} - {funding_amount} ({program})" if funding else ""
-                ]
-                content_parts.append(". ".join(filter(None, project_parts)))
-
-        # --- Recent Excavations ---
-        excavation_available = recent_excavations.get("available", False)
-        if excavation_available:
-            excavation_desc = _get_multilingual_field(recent_excavations, "description", lang)
-            if excavation_desc:
-                content_parts.append(f"Recent Excavations: {excavation_desc}")
-
-        # --- Public Engagement ---
-        engagement_available = public_engagement.get("available", False)
-        if engagement_available:
-            engagement_desc = _get_multilingual_field(public_engagement, "description", lang)
-            if engagement_desc:
-                content_parts.append(f"Public Engagement: {engagement_desc}")
-
-        text_content = ". ".join(filter(None, content_parts)).strip()
-        if text_content:
-            text_content += "."
 
-        metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "research",
-            "language": lang,
-            "main_project_en": ongoing_projects[0].get("name") if ongoing_projects else "",
-            "start_year": ongoing_projects[0].get("start_year") if ongoing_projects else "",
-            "status": ongoing_projects[0].get("status") if ongoing_projects else "",
-            "length": len(text_content.split())
-        }
+def _emergency_contacts(record: dict, ctx: dict) -> str:
+    contacts = record.get("emergency", {}).get("contacts", [])
+    if not contacts:
+        return ""
+    return "Emergency Contacts:\n" + "\n".join(f"{contact['name']}: {contact['phone']}" for contact in contacts)
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
 
-    return documents
+def _special_features(record: dict, ctx: dict) -> Dict[str, str]:
+    columns: Dict[str, list] = {lang: [] for lang in LANGUAGES}
+    for feature_key, translations in record.items():
+        if not isinstance(translations, dict):
+            continue  # Skip malformed fields
+        # Format title from key
+        title = feature_key.replace("_", " ").title().replace(" And ", " and ")
+        for lang in LANGUAGES:
+            description = translations.get(lang, "").strip()
+            if description:
+                columns[lang].append(f"{title}: {description}")
+    return {lang: "\n\n".join(parts) for lang, parts in columns.items() if parts}
 
 
-def load_safety_info_data(file_path: str) -> List[Document]:
-    """
-    Loads multilingual visitor safety data from safety_info.json.
-    Creates one Document per language, including safety description, guidelines, and emergency contacts.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
+def _highlight(record: dict, ctx: dict) -> Dict[str, str]:
+    aspects = record.get("aspect", {})
+    comments = record.get("comment", {})
+    rendered = {}
+    for lang in LANGUAGES:
+        aspect_text = aspects.get(lang, "").strip()
+        comment_text = comments.get(lang, "").strip()
+        if aspect_text and comment_text:
+            rendered[lang] = f"{aspect_text}: {comment_text}"
+    return rendered
 
-    documents: List[Document] = []
-    base_id = data.get("id", _generate_id(data, prefix="safety"))
-    safety_info = data.get("safety_information", {})
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    guidelines = safety_info.get("guidelines", [])
-    emergency_contacts = safety_info.get("emergency", {}).get("contacts", [])
-
-    for lang in languages:
-        content_parts = []
-
-        # Title & Description
-        title = _get_multilingual_field(safety_info, "title", lang)
-        description = _get_multilingual_field(safety_info, "description", lang)
-
-        if title:
-            content_parts.append(f"Title: {title}")
-        if description:
-            content_parts.append(f"Description: {description}")
-
-        # Guidelines
-        if guidelines:
-            bullet_points = []
-            for entry in guidelines:
-                point = _get_multilingual_field(entry, "point", lang)
-                if point:
-                    bullet_points.append(f"- {point}")
-            if bullet_points:
-                content_parts.append("Guidelines:\n" + "\n".join(bullet_points))
-
-        # Emergency Contacts
-        if emergency_contacts:
-            contact_lines = []
-            for contact in emergency_contacts:
-                contact_lines.append(f"{contact['name']}: {contact['phone']}")
-            content_parts.append("Emergency Contacts:\n" + "\n".join(contact_lines))
-
-        text_content = "\n\n".join(content_parts).strip()
 
-        metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "safety_info",
-            "language": lang,
-            "length": len(text_content.split())
+def _service_highlights(record: dict, ctx: dict) -> str:
+    # Shared service info summary (non-translated parts)
+    static_features = {
+        "Accessibility": record.get("accessibility", {}),
+        "Amenities": record.get("amenities", {}),
+        "Rest Areas": record.get("rest_areas", {}),
+        "Family Friendly": record.get("family_friendly", {}),
+        "Guided Tours": {
+            k: v for k, v in record.get("guided_tours", {}).items()
+            if k not in ("description",)  # exclude multilingual description
         }
+    }
+    lines = []
+    for section, features in static_features.items():
+        for key, value in features.items():
+            if isinstance(value, bool):
+                lines.append(f"{section} – {key.replace('_', ' ').title()}: {'Yes' if value else 'No'}")
+    summary = "\n".join(lines).strip()
+    return f"Service Highlights:\n{summary}" if summary else ""
+
+
+def _root_id(prefix: str, key: Optional[str] = None, rstrip: str = ""):
+    """Base ID from the file's "id", else a hash of the whole file (or of data[key])."""
+    def base_id(record, ctx):
+        data = ctx["data"]
+        return _id_or_hash(data, prefix, data.get(key, {}) if key else None).rstrip(rstrip)
+    return base_id
+
+
+# ========== Source Specs ==========
+# Adding a data file only needs an entry here: file name and how its records map to documents.
+SOURCE_SPECS: Dict[str, Tuple[str, List[DocSpec]]] = {
+    "exhibition": ("exhibittion.json", [
+        DocSpec(
+            doc_type=doc_type,
+            doc_id="{base}",
+            records=lambda data, key=key: data.get(key, []),
+            base_id=lambda record, ctx, prefix=prefix: _id_or_hash(record, prefix),
+            parts=[
+                text("Title: {}", "title"),
+                text("Type: {}", "type"),
+                text("Description: {}", "description"),
+                text(f"{label}: {{}}", list_key),
+            ],
+            metadata=lambda record, ctx: {
+                "museum": ctx["data"].get("museum", "Balzi Rossi Prehistoric Museum"),
+                "title_en": record.get("title", {}).get("en"),
+                "type_en": record.get("type", {}).get("en"),
+                "start_date": record.get("start_date"),
+                "end_date": record.get("end_date"),
+                "source": record.get("source"),
+            },
+            strip=False,
+        )
+        for doc_type, key, prefix, label, list_key in (
+            ("exhibition", "exhibitions", "exhibit", "Features", "features"),
+            ("special_event", "special_events", "event", "Highlights", "highlights"),
+        )
+    ]),
+    "artifact": ("artifacts.json", [
+        DocSpec(
+            doc_type=_artifact_type,
+            doc_id="{base}",
+            records=lambda data: data,
+            base_id=lambda record, ctx: _id_or_hash(record, "main_artifact"),
+            parts=[
+                text("Name: {}", "name"),
+                const("Type: {}", "type"),
+                const("Period: {}", "period"),
+                const("Estimated Date: {}", "estimated_date"),
+                text("Origin: {}", "origin"),
+                text("Material: {}", "material"),
+                text("Description: {}", "description"),
+                text("Significance: {}", "significance"),
+            ],
+            metadata=lambda record, ctx: {
+                "name_en": record.get("name", {}).get("en"),
+                "type_en": record.get("type") if isinstance(record.get("type"), str) else "",
+                "period_en": record.get("period") if isinstance(record.get("period"), str) else "",
+                "estimated_date": record.get("estimated_date"),
+                "accession_number": record.get("accession_number"),
+                "origin_en": record.get("origin", {}).get("en") if isinstance(record.get("origin"), dict) else "",
+                "material_en": record.get("material", {}).get("en") if isinstance(record.get("material"), dict) else "",
+                "curator": record.get("curator"),
+                "source": record.get("source"),
+            },
+            children=(
+                DocSpec(
+                    doc_type="sub_artifact",
+                    doc_id="{base}",
+                    records=lambda parent: parent.get("sub_artifacts", []),
+                    base_id=lambda record, ctx: _id_or_hash(record, f"{ctx['parent_id']}_sub"),
+                    parts=[
+                        text("Sub-artifact Name: {}", "name"),
+                        computed(_part_of, translated=False),
+                        const("Material: {}", "material"),
+                        const("Estimated Date: {}", "estimated_date"),
+                        text("Description: {}", "description"),
+                    ],
+                    metadata=lambda record, ctx: {
+                        "parent_artifact_id": ctx["parent_id"],
+                        "parent_artifact_name_en": ctx["parent"].get("name", {}).get("en"),
+                        "name_en": record.get("name", {}).get("en") if isinstance(record.get("name"), dict) else "",
+                        "material": record.get("material"),
+                        "estimated_date": record.get("estimated_date"),
+                        "accession_number": record.get("accession_number"),
+                        "curator": record.get("curator"),
+                    },
+                ),
+            ),
+        ),
+    ]),
+    "accessibility": ("accessability.json", [
+        DocSpec(
+            doc_type="accessibility",
+            doc_id="{base}_{lang}",
+            records=lambda data: [data.get("accessibility", {})],
+            base_id=_root_id("accessibility", key="accessibility"),
+            parts=[
+                text("Title: {}", "title"),
+                text("Description: {}", "description"),
+                computed(_accessibility_features),
+                text("Additional Notes: {}", "additional_notes"),
+            ],
+            metadata=lambda record, ctx: {"title_en": record.get("title", {}).get("en")},
+        ),
+    ]),
+    "education": ("educational_programs.json", [
+        DocSpec(
+            doc_type="educational_school",
+            doc_id="{base}_school_{lang}",
+            records=lambda data: [data.get("educational_programs", {}).get("school_programs", {})],
+            base_id=_root_id("edu_programs", key="educational_programs"),
+            parts=[
+                literal("Section: School Programs"),
+                text("Description: {}", "description"),
+                const("Age Groups: {}", lambda record: ", ".join(record["age_groups"]) if record.get("age_groups") else ""),
+                const("Languages: {}", lambda record: ", ".join(record["languages"]) if record.get("languages") else ""),
+                computed(lambda record, ctx: f"Cost: {record.get('cost', '')}", translated=False),
+                const("Booking Contact: {}", "booking_info.contact"),
+                const("Phone: {}", "booking_info.phone"),
+            ],
+            metadata=lambda record, ctx: {"section": "school_programs"},
+        ),
+        DocSpec(
+            doc_type="educational_university",
+            doc_id="{base}_university_{lang}",
+            records=lambda data: [data.get("educational_programs", {}).get("university_collaborations", {})],
+            base_id=_root_id("edu_programs", key="educational_programs"),
+            parts=[
+                literal("Section: University Collaborations"),
+                text("Description: {}", "description"),
+                computed(_university_partners, translated=False),
+            ],
+            metadata=lambda record, ctx: {"section": "university_collaborations"},
+        ),
+        DocSpec(
+            doc_type="educational_public",
+            doc_id="{base}_public_{lang}",
+            records=lambda data: [data.get("educational_programs", {}).get("public_workshops", {})],
+            base_id=_root_id("edu_programs", key="educational_programs"),
+            parts=[literal("Section: Public Workshops"), text("Description: {}", "description")],
+            metadata=lambda record, ctx: {"section": "public_workshops"},
+        ),
+        DocSpec(
+            doc_type="educational_calendar",
+            doc_id="{base}_calendar_{lang}",
+            records=lambda data: [data.get("educational_programs", {}).get("events_calendar", {})],
+            base_id=_root_id("edu_programs", key="educational_programs"),
+            parts=[literal("Section: Events Calendar"), text("Note: {}", "note")],
+            metadata=lambda record, ctx: {"section": "events_calendar"},
+        ),
+    ]),
+    "location": ("location_direction.json", [
+        DocSpec(
+            doc_type="location",
+            doc_id="{base}_{lang}",
+            base_id=_root_id("location"),
+            parts=[
+                text("Address: {}", "location.address"),
+                text("By Train: {}", "how_to_get_there.by_train"),
+                text("By Car: {}", "how_to_get_there.by_car"),
+                text("Walking Path: {}", "how_to_get_there.walking_path"),
+                text("Nearby Landmarks: {}", "nearby_landmarks"),
+                text("Parking Info: {}", "parking_info"),
+                computed(_coordinates, translated=False),
+            ],
+            metadata=lambda record, ctx: {
+                "address_en": record.get("location", {}).get("address", {}).get("en"),
+                "latitude": record.get("location", {}).get("latitude"),
+                "longitude": record.get("location", {}).get("longitude"),
+            },
+        ),
+    ]),
+    "collection": ("museum_collection.json", [
+        DocSpec(
+            doc_type="museum_collection",
+            doc_id="{base}_{lang}",
+            records=lambda data: [data.get("collections", {})],
+            base_id=_root_id("museum_collection"),
+            parts=[
+                literal("Section: Museum Collection Overview"),
+                text("Overview: {}", "overview"),
+                computed(_notable_artifacts),
+                text("Exhibits: {}", "exhibits"),
+            ],
+            metadata=lambda record, ctx: {"overview_en": record.get("overview", {}).get("en")},
+        ),
+    ]),
+    "research": ("research.json", [
+        DocSpec(
+            doc_type="research",
+            doc_id="{base}_{lang}",
+            records=lambda data: [data.get("research", {})],
+            base_id=_root_id("research"),
+            parts=[
+                computed(_research_projects, translated=_project_languages),
+                text("Recent Excavations: {}", "recent_excavations.description",
+                     when=lambda record: record.get("recent_excavations", {}).get("available", False)),
+                text("Public Engagement: {}", "public_engagement.description",
+                     when=lambda record: record.get("public_engagement", {}).get("available", False)),
+            ],
+            metadata=_research_metadata,
+        ),
+    ]),
+    "safety": ("safety_info.json", [
+        DocSpec(
+            doc_type="safety_info",
+            doc_id="{base}_{lang}",
+            records=lambda data: [data.get("safety_information", {})],
+            base_id=_root_id("safety"),
+            parts=[
+                text("Title: {}", "title"),
+                text("Description: {}", "description"),
+                computed(_safety_guidelines),
+                computed(_emergency_contacts, translated=False),
+            ],
+            sep="\n\n",
+            end="",
+        ),
+    ]),
+    "features": ("special_features.json", [
+        DocSpec(
+            doc_type="special_feature",
+            doc_id="{base}_{lang}",
+            records=lambda data: [data.get("special_features", {})],
+            base_id=_root_id("special_features"),
+            parts=[computed(_special_features)],
+            sep="\n\n",
+            end="",
+        ),
+    ]),
+    "reviews": ("visitor_reviews.json", [
+        DocSpec(
+            doc_type="visitor_summary",
+            doc_id="{base}_summary_{lang}",
+            records=lambda data: [data.get("visitor_reviews_and_feedback", {})],
+            base_id=_root_id("visitor_reviews", rstrip="_"),
+            parts=[text("{}", "summary", strip=True)],
+            metadata=lambda record, ctx: {"avg_rating": record.get("average_rating")},
+            end="",
+            length=False,
+        ),
+        DocSpec(
+            doc_type="highlight",
+            doc_id="{base}_highlight_{i}_{lang}",
+            records=lambda data: data.get("visitor_reviews_and_feedback", {}).get("highlights", []),
+            base_id=_root_id("visitor_reviews", rstrip="_"),
+            parts=[computed(_highlight)],
+            metadata=lambda record, ctx: {"aspect_en": record.get("aspect", {}).get("en", "")},
+            end="",
+            length=False,
+        ),
+        DocSpec(
+            doc_type="example_review",
+            doc_id="{base}_review_{i}_{lang}",
+            records=lambda data: data.get("visitor_reviews_and_feedback", {}).get("example_reviews", []),
+            base_id=_root_id("visitor_reviews", rstrip="_"),
+            parts=[const("{}", lambda record: record.get("text", "").strip())],
+            metadata=lambda record, ctx: {"rating": record.get("rating")},
+            languages=lambda record: [record.get("language", "unknown")],
+            end="",
+            length=False,
+        ),
+    ]),
+    "services": ("visitor_servise.json", [
+        DocSpec(
+            doc_type="visitor_services",
+            doc_id="{base}_{lang}",
+            records=lambda data: [data.get("visitor_services", {})],
+            base_id=_root_id("visitor_services", rstrip="_"),
+            parts=[
+                text("General Description:\n{}", "description", strip=True),
+                text("Guided Tours:\n{}", "guided_tours.description", strip=True),
+                computed(_service_highlights, translated=False),
+            ],
+            sep="\n\n",
+            end="",
+        ),
+    ]),
+}
+
+
+# ========== Loaders ==========
+def load_exhibition_data(file_path: str) -> List[Document]:
+    """Permanent exhibitions and special events, one Document per language."""
+    return load_source("exhibition", file_path)
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
-
-    return documents
 
+def load_artifact_data(file_path: str) -> List[Document]:
+    """Main artifacts and their sub-artifacts, one Document per language."""
+    return load_source("artifact", file_path)
 
-def load_special_features_data(file_path: str) -> List[Document]:
-    """
-    Loads multilingual special feature data from special_features.json.
-    Each document includes features like landscape, caves, sea views, etc. — one per language.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
 
-    documents: List[Document] = []
-    special_data = data.get("special_features", {})
-    base_id = data.get("id", _generate_id(data, prefix="special_features"))
-    languages = ["en", "it", "fr", "de", "ar"]
+def load_accessibility_data(file_path: str) -> List[Document]:
+    """Accessibility features and notes, one Document per language."""
+    return load_source("accessibility", file_path)
 
-    for lang in languages:
-        content_parts = []
 
-        for feature_key, translations in special_data.items():
-            if not isinstance(translations, dict):
-                continue  # Skip malformed fields
+def load_educational_programs_data(file_path: str) -> List[Document]:
+    """One Document per program section (school, university, public, calendar) per language."""
+    return load_source("education", file_path)
 
-            # Get the translated description
-            description = translations.get(lang, "").strip()
-            if not description:
-                continue
 
-            # Format title from key
-            title = feature_key.replace("_", " ").title().replace(" And ", " and ")
-            content_parts.append(f"{title}: {description}")
+def load_location_data(file_path: str) -> List[Document]:
+    """Directions, address, parking info and landmarks, one Document per language."""
+    return load_source("location", file_path)
 
-        # Join all content for this language
-        text_content = "\n\n".join(content_parts).strip()
-        if not text_content:
-            continue
 
-        metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "special_feature",
-            "language": lang,
-            "length": len(text_content.split())
-        }
+def load_museum_collection_data(file_path: str) -> List[Document]:
+    """Collection overview, notable artifacts and exhibits, one Document per language."""
+    return load_source("collection", file_path)
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
 
-    return documents
+def load_research_data(file_path: str) -> List[Document]:
+    """Research projects, excavations and outreach, one Document per language."""
+    return load_source("research", file_path)
 
 
-def load_visitor_reviews_data(file_path: str) -> List[Document]:
-    """
-    Loads multilingual visitor reviews and feedback from visitor_reviews.json.
-    Generates documents for summaries, highlights, and example reviews.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
+def load_safety_info_data(file_path: str) -> List[Document]:
+    """Safety description, guidelines and emergency contacts, one Document per language."""
+    return load_source("safety", file_path)
 
-    documents: List[Document] = []
-    base_id = data.get("id", _generate_id(data, prefix="visitor_reviews")).rstrip("_")
-    reviews = data.get("visitor_reviews_and_feedback", {})
-    languages = ["en", "it", "fr", "de", "ar"]
-
-    # 1. Summary documents (one per language)
-    summary_data = reviews.get("summary", {})
-    for lang in languages:
-        summary = summary_data.get(lang, "").strip()
-        if not summary:
-            continue
 
-        documents.append(Document(
-            page_content=summary,
-            metadata={
-                "doc_id": f"{base_id}_summary_{lang}",
-                "doc_type": "visitor_summary",
-                "language": lang,
-                "avg_rating": reviews.get("average_rating")
-            }
-        ))
-
-    # 2. Highlight documents (per aspect per language)
-    for i, highlight in enumerate(reviews.get("highlights", [])):
-        aspects = highlight.get("aspect", {})
-        comments = highlight.get("comment", {})
-        for lang in languages:
-            aspect_text = aspects.get(lang, "").strip()
-            comment_text = comments.get(lang, "").strip()
-            if not aspect_text or not comment_text:
-                continue
+def load_special_features_data(file_path: str) -> List[Document]:
+    """Landscape, caves, sea views etc., one Document per language."""
+    return load_source("features", file_path)
 
-            documents.append(Document(
-                page_content=f"{aspect_text}: {comment_text}",
-                metadata={
-                    "doc_id": f"{base_id}_highlight_{i}_{lang}",
-                    "doc_type": "highlight",
-                    "language": lang,
-                    "aspect_en": aspects.get("en", "")
-                }
-            ))
-
-    # 3. Example review documents
-    for i, review in enumerate(reviews.get("example_reviews", [])):
-        text = review.get("text", "").strip()
-        if not text:
-            continue
 
-        documents.append(Document(
-            page_content=text,
-            metadata={
-                "doc_id": f"{base_id}_review_{i}_{review.get('language', 'unknown')}",
-                "doc_type": "example_review",
-                "language": review.get("language", "unknown"),
-                "rating": review.get("rating")
-            }
-        ))
+def load_visitor_reviews_data(file_path: str) -> List[Document]:
+    """Review summaries, highlights and example reviews."""
+    return load_source("reviews", file_path)
 
-    return documents
 
 def load_visitor_services_data(file_path: str) -> List[Document]:
-    """
-    Loads multilingual visitor services data from visitor_services.json.
-    Generates documents summarizing amenities, accessibility, family-friendliness, tours, and general description.
-    """
-    data = _load_json_file(file_path)
-    if not data:
-        return []
+    """Amenities, accessibility, family-friendliness and tours, one Document per language."""
+    return load_source("services", file_path)
 
-    documents: List[Document] = []
-    base_id = data.get("id", _generate_id(data, prefix="visitor_services")).rstrip("_")
-    services = data.get("visitor_services", {})
-    languages = ["en", "it", "fr", "de", "ar"]
 
-    # Compose shared service info summary (non-translated parts)
-    static_features = {
-        "Accessibility": services.get("accessibility", {}),
-        "Amenities": services.get("amenities", {}),
-        "Rest Areas": services.get("rest_areas", {}),
-        "Family Friendly": services.get("family_friendly", {}),
-        "Guided Tours": {
-            k: v for k, v in services.get("guided_tours", {}).items()
-            if k not in ("description",)  # exclude multilingual description
-        }
-    }
+SOURCE_MAP = {
+    name: (file_name, partial(load_source, name))
+    for name, (file_name, _) in SOURCE_SPECS.items()
+}
 
-    static_summary_lines = []
-    for section, features in static_features.items():
-        for key, value in features.items():
-            if isinstance(value, bool):
-                line = f"{section} – {key.replace('_', ' ').title()}: {'Yes' if value else 'No'}"
-                static_summary_lines.append(line)
 
-    static_summary = "\n".join(static_summary_lines).strip()
+# Files at least this large are parsed in a worker process in concurrent mode. The
+# Documents travel back pickled, which costs about as much as parsing them: a forked
+# worker was 2-3x slower than parsing in-process for every file from 240 KB to 4.8 MB,
+# so processes only pay off for very large files on machines with spare cores.
+PROCESS_LOADER_MIN_BYTES = int(os.getenv("LOADER_PROCESS_MIN_BYTES", str(32 * 1024 * 1024)))
+# Peak memory per source via tracemalloc; slows parsing down about tenfold, so opt-in
+LOADER_TRACE_MEMORY = os.getenv("LOADER_TRACE_MEMORY", "0") == "1"
 
-    # Build document per language
-    for lang in languages:
-        lang_parts = []
+# Compiled corpus snapshot; set CORPUS_SNAPSHOT_PATH to an empty string to disable
+CORPUS_SNAPSHOT_PATH = os.getenv("CORPUS_SNAPSHOT_PATH", str(Path(__file__).resolve().parents[1] / "output" / "corpus_snapshot.pkl"))
+SNAPSHOT_FORMAT = 1
 
-        # Add multilingual description
-        general_description = services.get("description", {}).get(lang, "").strip()
-        if general_description:
-            lang_parts.append(f"General Description:\n{general_description}")
 
-        # Add guided tours description if available
-        guided_tours_desc = services.get("guided_tours", {}).get("description", {}).get(lang, "").strip()
-        if guided_tours_desc:
-            lang_parts.append(f"Guided Tours:\n{guided_tours_desc}")
+def _file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-        # Add static features
-        if static_summary:
-            lang_parts.append(f"Service Highlights:\n{static_summary}")
 
-        text_content = "\n\n".join(lang_parts).strip()
-        if not text_content:
-            continue
+def _loader_fingerprint() -> str:
+    """Changes whenever the loader code in this module changes."""
+    return f"{SNAPSHOT_FORMAT}:{_file_sha256(__file__)}"
 
-        metadata = {
-            "doc_id": f"{base_id}_{lang}",
-            "doc_type": "visitor_services",
-            "language": lang,
-            "length": len(text_content.split())
+
+class CorpusSnapshot:
+    """
+    Parsed documents per source, pickled (protocol 5) into one file. An entry
+    is valid while its file keeps the same mtime and size, or, if those
+    changed, the same content hash. Any change to the loader code drops
+    the whole snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint = _loader_fingerprint()
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("fingerprint") == self.fingerprint:
+                self.entries = data["entries"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"⚠️ Ignoring unreadable corpus snapshot {path}: {e}")
+
+    def get(self, source: str, file_path: str) -> Optional[List[Document]]:
+        entry = self.entries.get(source)
+        if entry is None or entry["file"] != os.path.abspath(file_path):
+            return None
+        try:
+            stat = os.stat(file_path)
+            if (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["size"]):
+                # Touched but possibly unchanged (e.g. a fresh checkout)
+                if stat.st_size != entry["size"] or _file_sha256(file_path) != entry["sha256"]:
+                    return None
+                entry["mtime_ns"] = stat.st_mtime_ns
+                self.dirty = True
+        except OSError:
+            return None
+        return [Document(page_content=content, metadata=metadata) for content, metadata in entry["docs"]]
+
+    def put(self, source: str, file_path: str, docs: List[Document]):
+        try:
+            stat = os.stat(file_path)
+            sha256 = _file_sha256(file_path)
+        except OSError:
+            return
+        self.entries[source] = {
+            "file": os.path.abspath(file_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "docs": [(doc.page_content, doc.metadata) for doc in docs],
         }
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"fingerprint": self.fingerprint, "entries": self.entries}, f, protocol=5)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def _run_loader(loader_fn, file_path: str, trace_memory: bool) -> Tuple[List[Document], float, Optional[int]]:
+    """Runs one loader; returns its documents, wall-clock seconds and peak traced bytes."""
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        docs = loader_fn(file_path)
+        peak = tracemalloc.get_traced_memory()[1] if tracing else None
+    finally:
+        if tracing:
+            tracemalloc.stop()
+    return docs, time.perf_counter() - started, peak
 
-        documents.append(Document(page_content=text_content, metadata=metadata))
 
-    return documents
+def _log_loaded(source: str, docs: List[Document], seconds: float, peak: Optional[int]):
+    memory = f", {peak / 1024 / 1024:.1f} MB peak" if peak is not None else ""
+    logging.info(f"✅ Loaded {len(docs)} docs from `{source}` in {seconds * 1000:.0f} ms{memory}")
 
-import logging
-import os
 
+def iter_all_docs(selected_sources=None, base_path="data", workers: int = 1,
+                  snapshot_path: Optional[str] = CORPUS_SNAPSHOT_PATH,
+                  trace_memory: bool = LOADER_TRACE_MEMORY) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    Yields (source, documents) as each source finishes loading; failed sources
+    yield an empty list. Sources whose file is unchanged since the last run
+    come from the corpus snapshot, the rest are parsed and written back to it.
+    `trace_memory` adds each source's peak memory to the log.
+    """
+    selected_sources = selected_sources or list(SOURCE_MAP.keys())
+    snapshot = CorpusSnapshot(snapshot_path) if snapshot_path else None
+    jobs = []
+    for source in selected_sources:
+        if source not in SOURCE_MAP:
+            logging.warning(f"⚠️ Unknown source key: {source}")
+            continue
+        file_name, loader_fn = SOURCE_MAP[source]
+        file_path = os.path.join(base_path, file_name)
+        docs = snapshot.get(source, file_path) if snapshot else None
+        if docs is not None:
+            logging.info(f"✅ Loaded {len(docs)} docs from `{source}` (snapshot)")
+            yield source, docs
+        else:
+            jobs.append((source, file_path, loader_fn))
 
-def load_all_docs(selected_sources=None, base_path="data") -> List[Document]:
-    source_map = {
-        "exhibition": ("exhibittion.json", load_exhibition_data),
-        "artifact": ("artifacts.json", load_artifact_data),
-        "accessibility": ("accessability.json", load_accessibility_data),
-        "education": ("educational_programs.json", load_educational_programs_data),
-        "location": ("location_direction.json", load_location_data),
-        "collection": ("museum_collection.json", load_museum_collection_data),
-        "research": ("research.json", load_research_data),
-        "safety": ("safety_info.json", load_safety_info_data),
-        "features": ("special_features.json", load_special_features_data),
-        "reviews": ("visitor_reviews.json", load_visitor_reviews_data),
-        "services": ("visitor_servise.json", load_visitor_services_data),
-    }
+    paths = {source: file_path for source, file_path, _ in jobs}
+    for source, docs in _iter_loaded(jobs, workers, trace_memory):
+        # Empty results usually mean a missing or broken file; never cache those
+        if snapshot is not None and docs:
+            snapshot.put(source, paths[source], docs)
+        yield source, docs
 
-    selected_sources = selected_sources or list(source_map.keys())
-    all_docs = []
+    if snapshot is not None:
+        try:
+            snapshot.save()
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write corpus snapshot: {e}")
 
-    for source in selected_sources:
-        if source in source_map:
-            file_name, loader_fn = source_map[source]
-            file_path = os.path.join(base_path, file_name)
+
+def _iter_loaded(jobs, workers: int, trace_memory: bool = False) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    Runs the loaders. With workers > 1 they run concurrently: very large files
+    in worker processes, the rest in threads, which only helps when loaders
+    wait on slow storage. Memory is only traced where a loader has the heap
+    to itself (sequential mode and worker processes).
+    """
+    if not jobs:
+        return
+
+    if workers <= 1:
+        for source, file_path, loader_fn in jobs:
             try:
-                docs = loader_fn(file_path)
-                logging.info(f"✅ Loaded {len(docs)} docs from `{source}`")
-                all_docs.extend(docs)
+                docs, seconds, peak = _run_loader(loader_fn, file_path, trace_memory)
             except Exception as e:
                 logging.error(f"❌ Failed to load `{source}`: {e}")
-        else:
-            logging.warning(f"⚠️ Unknown source key: {source}")
-
+                yield source, []
+                continue
+            _log_loaded(source, docs, seconds, peak)
+            yield source, docs
+        return
+
+    def file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    # Fork so workers do not re-import the calling script; without it everything runs in threads
+    large = []
+    if "fork" in multiprocessing.get_all_start_methods() and (os.cpu_count() or 1) > 1:
+        large = [job for job in jobs if file_size(job[1]) >= PROCESS_LOADER_MIN_BYTES]
+    small = [job for job in jobs if job not in large]
+
+    processes = ProcessPoolExecutor(max_workers=min(workers, len(large)), mp_context=multiprocessing.get_context("fork")) if large else None
+    threads = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # Submit process jobs first so the fork happens before any loader thread exists
+        futures = {
+            processes.submit(_run_loader, loader_fn, file_path, trace_memory): source
+            for source, file_path, loader_fn in large
+        }
+        futures.update({
+            threads.submit(_run_loader, loader_fn, file_path, False): source
+            for source, file_path, loader_fn in small
+        })
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures[future]
+                try:
+                    docs, seconds, peak = future.result()
+                except Exception as e:
+                    logging.error(f"❌ Failed to load `{source}`: {e}")
+                    yield source, []
+                    continue
+                _log_loaded(source, docs, seconds, peak)
+                yield source, docs
+    finally:
+        threads.shutdown(cancel_futures=True)
+        if processes is not None:
+            processes.shutdown(cancel_futures=True)
+
+
+def load_all_docs(selected_sources=None, base_path="data", workers: int = 1,
+                  snapshot_path: Optional[str] = CORPUS_SNAPSHOT_PATH,
+                  trace_memory: bool = LOADER_TRACE_MEMORY) -> List[Document]:
+    all_docs = []
+    for _, docs in iter_all_docs(selected_sources, base_path, workers, snapshot_path, trace_memory):
+        all_docs.extend(docs)
     return all_docs
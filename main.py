@@ -176,64 +176,307 @@
 #     """)
 
 
-from fastapi import FastAPI, Request, Form, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, Form, UploadFile, File
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from contextlib import asynccontextmanager
+from typing import Optional
 from uuid import uuid4
+import asyncio
+import json
+import logging
 import os
+import sys
+from pathlib import Path
+
+from logic.shared_state import get_shared_state, close_shared_state
+from src.session_store import Session, create_session_store
+
+# The RAG, TTS and voice subsystems are imported inside the handlers that use
+# them, so importing this module stays cheap and a text-only worker never
+# loads (or needs) the voice stack. See test/bench_importtime.py.
+ENABLE_VOICE = os.getenv("ENABLE_VOICE", "1") == "1"
+ENABLE_TTS = os.getenv("ENABLE_TTS", "1") == "1"
+# Build the chain and open client connections at startup rather than on the first request
+RAG_WARM_UP = os.getenv("RAG_WARM_UP", "1") == "1"
+TTS_OUTPUT_DIR = str(Path(__file__).resolve().parent / "output" / "tts_output")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if RAG_WARM_UP:
+        # Compile the RAG chain once per process and open the client connections
+        from logic.retrieve_llm import get_rag_chain, warm_up
+        get_rag_chain()
+        try:
+            await asyncio.to_thread(warm_up)
+            logging.info("RAG chain built and clients warmed up.")
+        except Exception as e:
+            logging.warning(f"Warm-up request failed: {e}")
+
+    janitor = None
+    if ENABLE_TTS:
+        from src.tts_generator import run_cache_janitor
+        janitor = asyncio.create_task(run_cache_janitor())
+    yield
+    if janitor is not None:
+        janitor.cancel()
+    session_store.close()
+    close_shared_state()
+    if "logic.clients" in sys.modules:
+        from logic.clients import aclose_clients
+        await aclose_clients()
+
+app = FastAPI(lifespan=lifespan)
+
+os.makedirs(TTS_OUTPUT_DIR, exist_ok=True)
+app.mount("/static", StaticFiles(directory=TTS_OUTPUT_DIR), name="static")
+templates = Jinja2Templates(directory="templates")
 
-from src.user_voice import record_and_transcribe
-from logic.retrieve_llm import get_rag_chain
-from src.tts_generator import generate_tts_audio
+# Bounded in-memory sessions, optionally persisted to sqlite (SESSION_BACKEND=sqlite)
+# or shared between workers (STATE_BACKEND=sqlite|redis)
+session_store = create_session_store()
 
-app = FastAPI()
+# Answers shared across sessions, keyed by language, user profile and question
+_answer_cache = None
 
-app.mount("/static", StaticFiles(directory="output/tts_output"), name="static")
-templates = Jinja2Templates(directory="templates")
+def get_answer_cache():
+    global _answer_cache
+    if _answer_cache is None:
+        from logic.answer_cache import AnswerCache
+        _answer_cache = AnswerCache(shared_state=get_shared_state())
+    return _answer_cache
+
+def voice_disabled() -> JSONResponse:
+    return JSONResponse({"error": "Voice input is disabled on this server."}, status_code=503)
 
-# In-memory session store
-user_sessions = {}
+async def get_session(request: Request) -> Session:
+    return await session_store.aget_or_create(request.cookies.get("session_id"))
 
-def get_session_id(request: Request) -> str:
-    sid = request.cookies.get("session_id")
-    if not sid or sid not in user_sessions:
-        sid = str(uuid4())
-        user_sessions[sid] = {"language": "en", "chat": []}
-    return sid
+async def get_session_id(request: Request) -> str:
+    return (await get_session(request)).session_id
 
 def detect_user_state(text: str):
     return {"emotion": "curious", "tone": "friendly", "age_group": "adult"}
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.get("/", response_class=HTMLResponse)
 async def chat_interface(request: Request):
-    session_id = get_session_id(request)
+    session_id = await get_session_id(request)
     response = templates.TemplateResponse("chat.html", {"request": request, "session_id": session_id})
     response.set_cookie(key="session_id", value=session_id)
     return response
 
 @app.post("/chat")
 async def chat(request: Request, text: str = Form(...), language: str = Form(...)):
-    session_id = get_session_id(request)
-    session = user_sessions[session_id]
-    session["language"] = language
+    session = await get_session(request)
+    session.language = language
 
     # Detect emotion/tone/age
     state = detect_user_state(text)
 
-    # RAG + LLM
-    rag_chain = get_rag_chain()
-    llm_output = rag_chain.invoke({
-        "question": text,
-        "language": language,
-        **state
-    })
+    # Answer cache, then RAG + LLM on a miss
+    from logic.retrieve_llm import get_rag_chain
+    answer_cache = get_answer_cache()
+    profile = (state["emotion"], state["tone"], state["age_group"])
+    llm_output = await answer_cache.alookup(language, profile, text)
+    if llm_output is None:
+        rag_chain = get_rag_chain()
+        llm_output = await rag_chain.ainvoke({
+            "question": text,
+            "language": language,
+            **state
+        })
+        await answer_cache.astore(language, profile, text, llm_output)
 
     # TTS
-    audio_path = await generate_tts_audio(llm_output, language)
-    audio_url = f"/static/{os.path.basename(audio_path)}"
+    audio_url = None
+    if ENABLE_TTS:
+        from src.tts_generator import generate_tts_audio
+        audio_path = await generate_tts_audio(llm_output, language)
+        audio_url = f"/static/{os.path.basename(audio_path)}"
 
     # Save to history
-    session["chat"].append({"user": text, "bot": llm_output, "audio": audio_url})
+    session.add_turn(text, llm_output, audio_url)
+    await session_store.asave(session)
 
     return JSONResponse({"response": llm_output, "audio_url": audio_url})
+
+@app.post("/chat/stream")
+async def chat_stream(request: Request, text: str = Form(...), language: str = Form(...)):
+    session = await get_session(request)
+    session.language = language
+
+    # Detect emotion/tone/age
+    state = detect_user_state(text)
+    from logic.retrieve_llm import get_rag_chain
+    answer_cache = get_answer_cache()
+    profile = (state["emotion"], state["tone"], state["age_group"])
+    cached_output = await answer_cache.alookup(language, profile, text)
+
+    # Sentence-by-sentence TTS, overlapped with generation
+    tts_pipeline, audio_url = None, None
+    if ENABLE_TTS:
+        from src.tts_pipeline import SentenceTTSPipeline, register_pipeline
+        tts_pipeline = SentenceTTSPipeline(language)
+        audio_url = f"/chat/audio/{await register_pipeline(tts_pipeline)}"
+
+    async def event_stream():
+        audio_announced = False
+        try:
+            # Answer tokens as they are generated
+            if cached_output is not None:
+                llm_output = cached_output
+                if tts_pipeline is not None:
+                    tts_pipeline.feed(llm_output)
+                yield sse_event("token", {"text": llm_output})
+            else:
+                parts = []
+                rag_chain = get_rag_chain()
+                async for chunk in rag_chain.astream({
+                    "question": text,
+                    "language": language,
+                    **state
+                }):
+                    parts.append(chunk)
+                    yield sse_event("token", {"text": chunk})
+
+                    # Playback can start as soon as the first sentence is synthesizing
+                    if tts_pipeline is not None and tts_pipeline.feed(chunk) and not audio_announced:
+                        audio_announced = True
+                        yield sse_event("audio", {"audio_url": audio_url})
+                llm_output = "".join(parts)
+                await answer_cache.astore(language, profile, text, llm_output)
+
+            if tts_pipeline is not None:
+                tts_pipeline.close()
+
+            # Save to history
+            session.add_turn(text, llm_output, audio_url)
+            await session_store.asave(session)
+
+            yield sse_event("done", {"response": llm_output, "audio_url": audio_url})
+        except Exception as e:
+            logging.error(f"Streaming chat failed: {e}")
+            yield sse_event("error", {"message": "Sorry, something went wrong. Please try again."})
+        finally:
+            if tts_pipeline is not None:
+                tts_pipeline.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/chat/audio/{stream_id}")
+async def chat_audio(stream_id: str):
+    # Ordered MP3 segments of a streamed answer, sent as they are synthesized.
+    # Any worker can serve it: with a shared state, segments are read from there.
+    if not ENABLE_TTS:
+        return JSONResponse({"error": "Unknown or expired audio stream."}, status_code=404)
+    from src.tts_pipeline import get_pipeline
+    stream = await get_pipeline(stream_id)
+    if stream is None:
+        return JSONResponse({"error": "Unknown or expired audio stream."}, status_code=404)
+    return StreamingResponse(stream.stream_audio(), media_type="audio/mpeg")
+
+async def transcribe_file(file_path: str, language: str) -> dict:
+    # Decode + VAD off the event loop, then Whisper on the shared model pool
+    from src.audio_upload import decode_and_trim, remove_file
+    from src.user_voice import get_transcriber_pool
+    try:
+        audio, stats = await asyncio.to_thread(decode_and_trim, file_path)
+    finally:
+        remove_file(file_path)
+
+    if audio is None:
+        return {"text": "", "error": "No speech detected.", **stats}
+
+    text = await get_transcriber_pool().transcribe_async(audio, language=language)
+    return {"text": text.strip(), **stats, "language_used": language}
+
+@app.post("/transcribe")
+async def transcribe_upload(file: UploadFile = File(...), language: str = Form("en")):
+    if not ENABLE_VOICE:
+        return voice_disabled()
+    from src.audio_upload import UPLOAD_DIR, UploadTooLarge, save_upload, remove_file
+    file_path = os.path.join(UPLOAD_DIR, f"{uuid4().hex}.upload")
+    try:
+        await save_upload(file, file_path)
+    except UploadTooLarge as e:
+        remove_file(file_path)
+        return JSONResponse({"error": str(e)}, status_code=413)
+
+    try:
+        result = await transcribe_file(file_path, language)
+    except Exception as e:
+        logging.error(f"Transcription of uploaded audio failed: {e}")
+        return JSONResponse({"error": "Could not decode or transcribe the audio."}, status_code=400)
+    return JSONResponse(result)
+
+@app.post("/transcribe/chunk")
+async def transcribe_chunk(
+    chunk: UploadFile = File(...),
+    index: int = Form(...),
+    final: bool = Form(False),
+    upload_id: Optional[str] = Form(None),
+    language: str = Form("en"),
+):
+    if not ENABLE_VOICE:
+        return voice_disabled()
+    from src.audio_upload import MAX_UPLOAD_BYTES, UploadTooLarge, save_upload, get_upload_registry
+
+    # Chunks must arrive in order; the first one (index 0, without upload_id) opens the upload
+    if not upload_id and index != 0:
+        return JSONResponse({"error": "Unexpected chunk index.", "expected_index": 0}, status_code=409)
+    uploads = get_upload_registry()
+    upload = await uploads.get(upload_id) if upload_id else await uploads.start()
+    if upload is None:
+        return JSONResponse({"error": "Unknown or expired upload_id."}, status_code=404)
+
+    # Each index is claimed once in the shared state before it is appended, so a
+    # duplicate is rejected on any worker and the next chunk waits for this one
+    if not await uploads.claim(upload, index):
+        return JSONResponse(
+            {"error": "Unexpected chunk index.", "expected_index": upload.next_index}, status_code=409
+        )
+    try:
+        written = await save_upload(chunk, upload.file_path, mode="ab", limit=MAX_UPLOAD_BYTES - upload.size)
+    except UploadTooLarge as e:
+        await uploads.discard(upload)
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except Exception:
+        # A partially appended chunk leaves the file unusable
+        await uploads.discard(upload)
+        raise
+
+    if not final:
+        await uploads.advance(upload, written)
+        return JSONResponse({"upload_id": upload.upload_id, "received": index})
+
+    await uploads.discard(upload, keep_file=True)
+    try:
+        result = await transcribe_file(upload.file_path, language)
+    except Exception as e:
+        logging.error(f"Transcription of chunked upload {upload.upload_id} failed: {e}")
+        return JSONResponse({"error": "Could not decode or transcribe the audio."}, status_code=400)
+    return JSONResponse({"upload_id": upload.upload_id, **result})
+
+@app.get("/cache/stats")
+async def cache_stats():
+    from logic.clients import get_embeddings
+    return JSONResponse({
+        "answers": get_answer_cache().stats(),
+        "embeddings": get_embeddings().stats(),
+        "sessions": session_store.stats(),
+    })
+
+@app.get("/voice/stats")
+async def voice_stats():
+    if not ENABLE_VOICE or "src.user_voice" not in sys.modules:
+        return JSONResponse({"transcriber_pool": {}})
+    from src.user_voice import transcriber_pool_stats
+    return JSONResponse({"transcriber_pool": transcriber_pool_stats()})
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import av
+import numpy as np
+
+from logic.shared_state import MemoryState, get_shared_state
+from src.user_voice import RATE, VADSegmenter
+
+# Folder for uploads while they are received and decoded; shared by all workers
+UPLOAD_DIR = str(Path(__file__).resolve().parents[1] / "output" / "uploads")
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+UPLOAD_READ_SIZE = 1024 * 1024
+# Chunked uploads not finished within this time are discarded
+CHUNKED_UPLOAD_TTL_S = 300
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def iter_pcm_chunks(file_path: str) -> Iterator[bytes]:
+    """
+    Decodes any audio container ffmpeg understands (webm/opus, ogg, mp4, wav...)
+    and yields 16 kHz mono int16 PCM one decoded frame at a time.
+    """
+    with av.open(file_path) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=RATE)
+        for frame in container.decode(stream):
+            for out_frame in resampler.resample(frame):
+                yield out_frame.to_ndarray().tobytes()
+        for out_frame in resampler.resample(None):
+            yield out_frame.to_ndarray().tobytes()
+
+
+def decode_and_trim(file_path: str) -> Tuple[Optional[np.ndarray], dict]:
+    """
+    Streams the decoded PCM through the VAD so only speech frames are kept
+    in memory and passed on to Whisper.
+    """
+    segmenter = VADSegmenter()
+    for pcm_bytes in iter_pcm_chunks(file_path):
+        segmenter.feed(pcm_bytes)
+    audio = segmenter.finish()
+
+    frame_seconds = segmenter.frame_bytes / 2 / RATE
+    stats = {
+        "duration_seconds": round(segmenter.total_frames * frame_seconds, 2),
+        "speech_seconds": round(len(audio) / RATE, 2) if audio is not None else 0.0,
+    }
+    return audio, stats
+
+
+async def save_upload(upload, file_path: Optional[str] = None, mode: str = "wb", limit: int = MAX_UPLOAD_BYTES) -> int:
+    """Copies a FastAPI UploadFile to disk in blocks; returns the number of bytes written."""
+    file_path = file_path or os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}.upload")
+    written = 0
+    # File I/O runs in worker threads so a slow disk never blocks the event loop
+    f = await asyncio.to_thread(open, file_path, mode)
+    try:
+        while True:
+            block = await upload.read(UPLOAD_READ_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > limit:
+                raise UploadTooLarge(f"Upload exceeds {limit} bytes")
+            await asyncio.to_thread(f.write, block)
+    finally:
+        await asyncio.to_thread(f.close)
+    return written
+
+
+def remove_file(file_path: str):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+# ========== Chunked Uploads ==========
+# Shared-state namespaces for upload progress and for claimed chunk indexes
+UPLOAD_NAMESPACE = "upload"
+CHUNK_NAMESPACE = "upload_chunk"
+
+
+class ChunkedUpload:
+    __slots__ = ("upload_id", "file_path", "next_index", "size")
+
+    def __init__(self, upload_id: str, next_index: int = 0, size: int = 0):
+        self.upload_id = upload_id
+        # Derived from the id, so every worker appends to the same file
+        self.file_path = os.path.join(UPLOAD_DIR, f"{upload_id}.part")
+        self.next_index = next_index
+        self.size = size
+
+    def to_json(self) -> str:
+        return json.dumps({"next_index": self.next_index, "size": self.size})
+
+
+class ChunkedUploadRegistry:
+    """
+    Progress of chunked uploads in the shared state (or in this process with
+    STATE_BACKEND=memory); the parts are appended in UPLOAD_DIR. Each chunk
+    index is claimed atomically before it is written, so a duplicate is
+    rejected whichever worker it reaches.
+    """
+
+    def __init__(self, state=None, ttl_s: float = CHUNKED_UPLOAD_TTL_S):
+        self.state = state if state is not None else MemoryState()
+        self.ttl_s = ttl_s
+
+    async def start(self) -> ChunkedUpload:
+        await asyncio.to_thread(self._purge_stale_parts)
+        upload = ChunkedUpload(uuid.uuid4().hex)
+        await self._save(upload)
+        return upload
+
+    async def get(self, upload_id: str) -> Optional[ChunkedUpload]:
+        value = await asyncio.to_thread(self.state.get, UPLOAD_NAMESPACE, upload_id)
+        if value is None:
+            return None
+        record = json.loads(value)
+        return ChunkedUpload(upload_id, record["next_index"], record["size"])
+
+    async def claim(self, upload: ChunkedUpload, index: int) -> bool:
+        """True if this caller may write chunk `index`; each index is granted once."""
+        if index != upload.next_index:
+            return False
+        return await asyncio.to_thread(self.state.add, CHUNK_NAMESPACE, f"{upload.upload_id}:{index}", "1", self.ttl_s)
+
+    async def advance(self, upload: ChunkedUpload, written: int):
+        """Records a written chunk, which lets the next index be claimed."""
+        upload.next_index += 1
+        upload.size += written
+        await self._save(upload)
+
+    async def discard(self, upload: ChunkedUpload, keep_file: bool = False):
+        await asyncio.to_thread(self.state.delete, UPLOAD_NAMESPACE, upload.upload_id)
+        if not keep_file:
+            remove_file(upload.file_path)
+
+    async def _save(self, upload: ChunkedUpload):
+        await asyncio.to_thread(self.state.set, UPLOAD_NAMESPACE, upload.upload_id, upload.to_json(), self.ttl_s)
+
+    def _purge_stale_parts(self):
+        # Parts of uploads that expired in any worker, found by their age on disk
+        cutoff = time.time() - self.ttl_s
+        for entry in os.scandir(UPLOAD_DIR):
+            try:
+                if entry.name.endswith(".part") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+_registry: Optional[ChunkedUploadRegistry] = None
+
+
+def get_upload_registry() -> ChunkedUploadRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ChunkedUploadRegistry(get_shared_state())
+    return _registry
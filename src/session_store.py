@@ -0,0 +1,317 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from logic.shared_state import STATE_BACKEND, get_shared_state
+
+# Sessions kept in memory, idle time before a session expires, and turns kept per session
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(6 * 3600)))
+SESSION_HISTORY_MAX_TURNS = int(os.getenv("SESSION_HISTORY_MAX_TURNS", "20"))
+# "memory", "sqlite" to persist sessions across restarts, or "shared" to share them
+# between workers through the STATE_BACKEND (the default when one is configured)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory" if STATE_BACKEND == "memory" else "shared").lower()
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", str(OUTPUT_DIR / "sessions.sqlite"))
+SESSION_FLUSH_INTERVAL_S = float(os.getenv("SESSION_FLUSH_INTERVAL_S", "2"))
+
+
+class Turn:
+    __slots__ = ("user", "bot", "audio", "time")
+
+    def __init__(self, user: str, bot: str, audio: Optional[str] = None, time_s: Optional[float] = None):
+        self.user = user
+        self.bot = bot
+        self.audio = audio
+        self.time = time_s if time_s is not None else time.time()
+
+    def to_dict(self) -> dict:
+        return {"user": self.user, "bot": self.bot, "audio": self.audio, "time": self.time}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Turn":
+        return cls(data["user"], data["bot"], data.get("audio"), data.get("time"))
+
+
+class Session:
+    __slots__ = ("session_id", "language", "turns", "last_seen")
+
+    def __init__(self, session_id: str, language: str = "en", turns: Iterable[Turn] = (),
+                 last_seen: Optional[float] = None, max_turns: int = SESSION_HISTORY_MAX_TURNS):
+        self.session_id = session_id
+        self.language = language
+        # Oldest turns fall off once the cap is reached
+        self.turns = deque(turns, maxlen=max_turns)
+        self.last_seen = last_seen if last_seen is not None else time.time()
+
+    def add_turn(self, user: str, bot: str, audio: Optional[str] = None):
+        self.turns.append(Turn(user, bot, audio))
+
+    def to_record(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "language": self.language,
+            "turns": [turn.to_dict() for turn in self.turns],
+            "last_seen": self.last_seen,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict, max_turns: int = SESSION_HISTORY_MAX_TURNS) -> "Session":
+        return cls(
+            record["session_id"],
+            record.get("language", "en"),
+            (Turn.from_dict(turn) for turn in record.get("turns", [])),
+            record.get("last_seen"),
+            max_turns,
+        )
+
+
+class SqliteSessionBackend:
+    """
+    Write-behind persistence: saves only mark a session dirty, and a
+    background thread writes the dirty sessions every `flush_interval_s`
+    and deletes expired rows. Requests never wait on a write.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH, ttl_s: float = SESSION_TTL_S,
+                 flush_interval_s: float = SESSION_FLUSH_INTERVAL_S):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.flush_interval_s = flush_interval_s
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, record TEXT NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+        self._db_lock = threading.Lock()
+
+        self._dirty: Dict[str, dict] = {}
+        self._dirty_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def load(self, session_id: str) -> Optional[dict]:
+        with self._dirty_lock:
+            record = self._dirty.get(session_id)
+        if record is not None:
+            return record
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT record FROM sessions WHERE session_id = ? AND last_seen >= ?",
+                (session_id, time.time() - self.ttl_s),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, record: dict):
+        with self._dirty_lock:
+            self._dirty[record["session_id"]] = record
+
+    def flush(self):
+        with self._dirty_lock:
+            records, self._dirty = list(self._dirty.values()), {}
+        with self._db_lock:
+            if records:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sessions (session_id, record, last_seen) VALUES (?, ?, ?)",
+                    [(r["session_id"], json.dumps(r, ensure_ascii=False), r["last_seen"]) for r in records],
+                )
+            self._db.execute("DELETE FROM sessions WHERE last_seen < ?", (time.time() - self.ttl_s,))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.warning(f"Session write-behind failed: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval_s + 1)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+
+class SharedSessionBackend:
+    """
+    Sessions in the shared state (sqlite file or Redis), read and written
+    through on every request so any worker can serve any visitor.
+    """
+
+    shared = True
+
+    def __init__(self, state, ttl_s: float = SESSION_TTL_S):
+        self.state = state
+        self.ttl_s = ttl_s
+
+    def load(self, session_id: str) -> Optional[dict]:
+        value = self.state.get("session", session_id)
+        return json.loads(value) if value else None
+
+    def save(self, record: dict):
+        self.state.set("session", record["session_id"], json.dumps(record, ensure_ascii=False), self.ttl_s)
+
+    def close(self):
+        pass  # The shared state is closed by its owner
+
+
+class SessionStore:
+    """
+    In-memory LRU of sessions with an idle TTL, optionally backed by a
+    persistent store that is consulted on a memory miss. A shared backend
+    is the source of truth instead: other workers may have changed the
+    session, so it is loaded on every request and never kept in memory.
+    """
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES, ttl_s: float = SESSION_TTL_S,
+                 max_turns: int = SESSION_HISTORY_MAX_TURNS, backend=None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.max_turns = max_turns
+        self.backend = backend
+        self.shared = getattr(backend, "shared", False)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.created = 0
+        self.evictions = 0
+
+    def _is_expired(self, session: Session, now: float) -> bool:
+        return now - session.last_seen > self.ttl_s
+
+    def _insert(self, session: Session):
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def _get_cached(self, session_id: str, now: float) -> Optional[Session]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if self._is_expired(session, now):
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            self.hits += 1
+            return session
+
+    def _load(self, session_id: str, now: float) -> Optional[Session]:
+        record = self.backend.load(session_id)
+        if record is None:
+            return None
+        session = Session.from_record(record, self.max_turns)
+        if not self.shared and self._is_expired(session, now):
+            return None
+        session.last_seen = now
+        with self._lock:
+            self.loads += 1
+            if not self.shared:
+                # Another request may have loaded it meanwhile; keep the first copy
+                session = self._sessions.setdefault(session_id, session)
+                self._insert(session)
+        return session
+
+    def get(self, session_id: Optional[str]) -> Optional[Session]:
+        if not session_id:
+            return None
+        now = time.time()
+        if not self.shared:
+            session = self._get_cached(session_id, now)
+            if session is not None or self.backend is None:
+                return session
+        return self._load(session_id, now)
+
+    async def aget(self, session_id: Optional[str]) -> Optional[Session]:
+        """Async `get`: a backend load runs in a worker thread, off the event loop."""
+        if not session_id:
+            return None
+        now = time.time()
+        if not self.shared:
+            session = self._get_cached(session_id, now)
+            if session is not None or self.backend is None:
+                return session
+        return await asyncio.to_thread(self._load, session_id, now)
+
+    def _new(self, language: str) -> Session:
+        session = Session(str(uuid.uuid4()), language, max_turns=self.max_turns)
+        with self._lock:
+            if not self.shared:
+                self._insert(session)
+            self.created += 1
+        return session
+
+    def create(self, language: str = "en") -> Session:
+        session = self._new(language)
+        self.save(session)
+        return session
+
+    async def acreate(self, language: str = "en") -> Session:
+        session = self._new(language)
+        await self.asave(session)
+        return session
+
+    def get_or_create(self, session_id: Optional[str]) -> Session:
+        return self.get(session_id) or self.create()
+
+    async def aget_or_create(self, session_id: Optional[str]) -> Session:
+        return await self.aget(session_id) or await self.acreate()
+
+    def save(self, session: Session):
+        """Records a change; with a backend the write happens in the background."""
+        if self.backend is not None:
+            self.backend.save(session.to_record())
+
+    async def asave(self, session: Session):
+        """Async `save`: shared writes run in a worker thread; sqlite ones are already write-behind."""
+        if self.shared:
+            await asyncio.to_thread(self.backend.save, session.to_record())
+        else:
+            self.save(session)
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "hits": self.hits,
+                "loaded": self.loads,
+                "created": self.created,
+                "evicted": self.evictions,
+                "backend": type(self.backend).__name__ if self.backend is not None else "memory",
+            }
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "sqlite":
+        return SessionStore(backend=SqliteSessionBackend())
+    if backend == "shared":
+        state = get_shared_state()
+        if state is not None:
+            return SessionStore(backend=SharedSessionBackend(state))
+        logging.warning("SESSION_BACKEND=shared needs a STATE_BACKEND; keeping sessions in memory only.")
+        return SessionStore()
+    if backend != "memory":
+        logging.warning(f"Unknown SESSION_BACKEND '{backend}', keeping sessions in memory only.")
+    return SessionStore()
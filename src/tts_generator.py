@@ -1,12 +1,18 @@
-
-
 import asyncio
 import edge_tts
+import hashlib
+import json
+import logging
+import time
 import uuid
 import os
+from pathlib import Path
 
-# Folder to save temporary audio files
-OUTPUT_DIR = "output/tts_output"
+from logic.clients import tts_options
+
+# Folder to save temporary audio files; anchored to the repository so every
+# worker reads and writes the same files whatever its working directory
+OUTPUT_DIR = str(Path(__file__).resolve().parents[1] / "output" / "tts_output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Default voice mapping by language
@@ -17,31 +23,150 @@ VOICE_MAP = {
     "de": "de-DE-KatjaNeural",
     "ar": "ar-EG-SalmaNeural"
 }
+DEFAULT_VOICE = "en-US-JennyNeural"
+
+# Synthesis parameters (part of the cache key)
+TTS_RATE = "+0%"
+TTS_VOLUME = "+0%"
+TTS_PITCH = "+0Hz"
+
+# Disk quota for the audio cache, enforced by the janitor
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "500")) * 1024 * 1024
+TTS_CACHE_MAX_AGE_S = float(os.getenv("TTS_CACHE_MAX_AGE_S", str(7 * 24 * 3600)))
+TTS_JANITOR_INTERVAL_S = float(os.getenv("TTS_JANITOR_INTERVAL_S", "600"))
+STALE_PART_FILE_AGE_S = 3600
+
+# Cap on concurrent edge-tts connections across all requests of this process
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "6"))
+
+# Synthesis tasks currently running, by cache key
+_inflight: dict = {}
+_tts_slots = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+
+
+def tts_cache_key(text: str, voice: str, rate: str = TTS_RATE, volume: str = TTS_VOLUME, pitch: str = TTS_PITCH) -> str:
+    payload = json.dumps([text, voice, rate, volume, pitch], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _synthesize(text: str, voice: str, filepath: str) -> str:
+    # Write to a temporary file so readers never see a partial MP3
+    tmp_path = f"{filepath}.{uuid.uuid4().hex}.part"
+    try:
+        async with _tts_slots:
+            communicate = edge_tts.Communicate(
+                text=text, voice=voice, rate=TTS_RATE, volume=TTS_VOLUME, pitch=TTS_PITCH, **tts_options()
+            )
+            await communicate.save(tmp_path)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return filepath
+
 
 async def _generate_tts_audio_async(text: str, language: str) -> str:
     # Choose appropriate voice based on language
-    voice = VOICE_MAP.get(language, "en-US-JennyNeural")
+    voice = VOICE_MAP.get(language, DEFAULT_VOICE)
 
-    # Unique filename
-    filename = f"{uuid.uuid4()}.mp3"
-    filepath = os.path.join(OUTPUT_DIR, filename)
+    # Content-addressed filename: same text and voice -> same file
+    key = tts_cache_key(text, voice)
+    filepath = os.path.join(OUTPUT_DIR, f"{key}.mp3")
 
-    communicate = edge_tts.Communicate(text=text, voice=voice)
-    await communicate.save(filepath)
+    if os.path.exists(filepath):
+        # Refresh mtime so the janitor evicts least recently used files first
+        try:
+            os.utime(filepath)
+            return filepath
+        except FileNotFoundError:
+            pass  # Evicted between the check and the touch
+
+    # Deduplicate concurrent requests for the same audio
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_synthesize(text, voice, filepath))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # Shield so one cancelled caller does not abort synthesis for the others
+    return await asyncio.shield(task)
 
-    return filepath
 
 async def generate_tts_audio(text: str, language: str = "en") -> str:
     """
     Generates TTS audio for the given text in the specified language.
-    Returns the path to the saved MP3 file.
+    Returns the path to the saved MP3 file, reusing a cached file when the
+    same text was already synthesized with the same voice.
     """
     filepath = await _generate_tts_audio_async(text, language)
     return filepath
 
 
+def enforce_cache_quota(max_bytes: int = TTS_CACHE_MAX_BYTES, max_age_s: float = TTS_CACHE_MAX_AGE_S) -> dict:
+    """
+    Deletes cached MP3s unused for longer than `max_age_s`, then the least
+    recently used ones until the folder fits in `max_bytes`.
+    """
+    now = time.time()
+    busy = {f"{key}.mp3" for key in _inflight}
+    files = []
+    removed = 0
+
+    for entry in os.scandir(OUTPUT_DIR):
+        if not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+
+        if entry.name.endswith(".part"):
+            # Leftovers from crashed syntheses
+            if now - stat.st_mtime > STALE_PART_FILE_AGE_S:
+                removed += _remove_file(entry.path)
+            continue
+        if not entry.name.endswith(".mp3") or entry.name in busy:
+            continue
+
+        if now - stat.st_mtime > max_age_s:
+            removed += _remove_file(entry.path)
+        else:
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_bytes = sum(size for _, size, _ in files)
+    files.sort()
+    for _, size, path in files:
+        if total_bytes <= max_bytes:
+            break
+        if _remove_file(path):
+            removed += 1
+            total_bytes -= size
+
+    return {"removed": removed, "files": len(files), "bytes": total_bytes}
+
+
+def _remove_file(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+async def run_cache_janitor(interval_s: float = TTS_JANITOR_INTERVAL_S):
+    """Background task that keeps the audio cache within its quota."""
+    while True:
+        try:
+            result = await asyncio.to_thread(enforce_cache_quota)
+            if result["removed"]:
+                logging.info(f"TTS cache janitor removed {result['removed']} files ({result['bytes']} bytes kept).")
+        except Exception as e:
+            logging.warning(f"TTS cache janitor failed: {e}")
+        await asyncio.sleep(interval_s)
+
+
 if __name__ == "__main__":
     sample_text = "Hello and welcome"
     lang = "en"
-    path = generate_tts_audio(sample_text, lang)
+    path = asyncio.run(generate_tts_audio(sample_text, lang))
     print(f"TTS audio saved at: {path}")
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from typing import AsyncIterator, List, Optional
+
+from logic.shared_state import get_shared_state
+from src.tts_generator import generate_tts_audio
+
+# How many sentences may be synthesized at the same time per answer
+TTS_PIPELINE_CONCURRENCY = int(os.getenv("TTS_PIPELINE_CONCURRENCY", "3"))
+# Sentences shorter than this are merged with the next one
+MIN_SENTENCE_CHARS = 12
+# How long a finished pipeline stays available on the audio endpoint
+PIPELINE_TTL_S = 600
+AUDIO_CHUNK_SIZE = 64 * 1024
+# Shared-state namespace holding the ready segments of each stream
+STREAM_NAMESPACE = "tts_stream"
+# How often a worker serving another worker's stream checks for new segments
+STREAM_POLL_INTERVAL_S = 0.2
+
+# Latin and Arabic sentence punctuation (incl. Arabic question mark and full stop)
+_SENTENCE_END = re.compile(r"[.!?…؟۔]+[\"'”’»)\]]*(?=\s)|\n+")
+
+# Words ending with a dot that do not end a sentence
+ABBREVIATIONS = {
+    "en": {"mr", "mrs", "ms", "dr", "st", "vs", "e.g", "i.e", "approx", "no", "ca", "c"},
+    "it": {"sig", "sig.ra", "dott", "prof", "ecc", "es", "ca", "n"},
+    "fr": {"m", "mme", "mlle", "dr", "env", "av", "ex", "n°", "p.ex"},
+    "de": {"dr", "prof", "z.b", "bzw", "ca", "nr", "usw", "d.h", "chr"},
+    "ar": set(),
+}
+
+
+class SentenceSplitter:
+    """
+    Cuts a stream of text chunks into complete sentences, language-aware.
+    """
+
+    def __init__(self, language: str = "en", min_chars: int = MIN_SENTENCE_CHARS):
+        self.language = language
+        self.min_chars = min_chars
+        self._abbreviations = ABBREVIATIONS.get(language, ABBREVIATIONS["en"])
+        self._buffer = ""
+
+    def _is_abbreviation(self, text: str, end: int) -> bool:
+        # Only a single trailing dot can belong to an abbreviation
+        if text[end - 1] != "." or (end > 1 and text[end - 2] in ".!?…"):
+            return False
+        words = text[:end - 1].split()
+        if not words:
+            return False
+        word = words[-1].lower()
+        # Initials such as "J." are not sentence ends either
+        if len(word) == 1 and word.isalpha() and self.language != "ar":
+            return True
+        return word in self._abbreviations
+
+    def feed(self, text: str) -> List[str]:
+        """Adds a chunk and returns the sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            end = match.end()
+            if match.group().strip() and self._is_abbreviation(self._buffer, end):
+                continue
+            sentence = self._buffer[start:end].strip()
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Returns whatever text is left once the stream has ended."""
+        tail = self._buffer.strip()
+        self._buffer = ""
+        return tail or None
+
+
+class SegmentStream:
+    """Ordered MP3 segments of one answer; subclasses provide `iter_segments`."""
+
+    def iter_segments(self) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def stream_audio(self, chunk_size: int = AUDIO_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yields the concatenated MP3 bytes of all segments."""
+        async for path in self.iter_segments():
+            data = await asyncio.to_thread(_read_file, path)
+            for i in range(0, len(data), chunk_size):
+                yield data[i:i + chunk_size]
+
+
+class SentenceTTSPipeline(SegmentStream):
+    """
+    Synthesizes an answer sentence by sentence while the LLM is still
+    generating it. Segments are synthesized with bounded concurrency and
+    read back in order, so playback can start after the first sentence.
+    """
+
+    def __init__(self, language: str = "en", max_concurrency: int = TTS_PIPELINE_CONCURRENCY):
+        self.language = language
+        self.created = time.monotonic()
+        self.closed = False
+        self._splitter = SentenceSplitter(language)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._segments: List[asyncio.Task] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def feed(self, text: str) -> int:
+        """Adds streamed text; returns how many sentences were scheduled."""
+        sentences = self._splitter.feed(text)
+        for sentence in sentences:
+            self._schedule(sentence)
+        return len(sentences)
+
+    def close(self):
+        if self.closed:
+            return
+        tail = self._splitter.flush()
+        if tail:
+            self._schedule(tail)
+        self.closed = True
+        self._changed.set()
+
+    def _schedule(self, sentence: str):
+        self._segments.append(asyncio.ensure_future(self._synthesize(sentence)))
+        self._changed.set()
+
+    async def _synthesize(self, sentence: str) -> str:
+        async with self._semaphore:
+            return await generate_tts_audio(sentence, self.language)
+
+    async def iter_segments(self) -> AsyncIterator[str]:
+        """Yields the MP3 path of each sentence, in order, as soon as it is ready."""
+        index = 0
+        while True:
+            if index < len(self._segments):
+                try:
+                    yield await asyncio.shield(self._segments[index])
+                except Exception as e:
+                    logging.warning(f"TTS failed for sentence {index}: {e}")
+                index += 1
+            elif self.closed:
+                return
+            else:
+                self._changed.clear()
+                await self._changed.wait()
+
+
+class SharedSegmentStream(SegmentStream):
+    """
+    A stream synthesized by another worker, read back from the segment paths
+    that worker publishes in the shared state.
+    """
+
+    def __init__(self, state, stream_id: str, poll_interval_s: float = STREAM_POLL_INTERVAL_S):
+        self.state = state
+        self.stream_id = stream_id
+        self.poll_interval_s = poll_interval_s
+
+    async def iter_segments(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            value = await asyncio.to_thread(self.state.get, STREAM_NAMESPACE, self.stream_id)
+            if value is None:
+                return
+            record = json.loads(value)
+            for path in record["segments"][index:]:
+                yield path
+                index += 1
+            if record["closed"]:
+                return
+            await asyncio.sleep(self.poll_interval_s)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# ========== Pipeline Registry ==========
+class PipelineRegistry:
+    """
+    Streams by id for the /chat/audio endpoint. Pipelines run in the worker
+    that answered /chat/stream; with a shared state each one also publishes
+    its ready segment paths there, so any worker can serve its audio.
+    """
+
+    def __init__(self, state=None, ttl_s: float = PIPELINE_TTL_S):
+        self.state = state
+        self.ttl_s = ttl_s
+        self._pipelines: dict = {}
+        self._publishers: set = set()
+
+    async def register(self, pipeline: SentenceTTSPipeline) -> str:
+        now = time.monotonic()
+        for stream_id in [sid for sid, p in self._pipelines.items() if now - p.created > self.ttl_s]:
+            del self._pipelines[stream_id]
+
+        stream_id = uuid.uuid4().hex
+        self._pipelines[stream_id] = pipeline
+        if self.state is not None:
+            # Published before the id is handed out, so no worker can miss the stream
+            await self._publish(stream_id, [], closed=False)
+            task = asyncio.ensure_future(self._publish_segments(stream_id, pipeline))
+            self._publishers.add(task)
+            task.add_done_callback(self._publishers.discard)
+        return stream_id
+
+    async def get(self, stream_id: str) -> Optional[SegmentStream]:
+        pipeline = self._pipelines.get(stream_id)
+        if pipeline is not None:
+            if time.monotonic() - pipeline.created <= self.ttl_s:
+                return pipeline
+            del self._pipelines[stream_id]
+            return None
+        if self.state is None:
+            return None
+        if await asyncio.to_thread(self.state.get, STREAM_NAMESPACE, stream_id) is None:
+            return None
+        return SharedSegmentStream(self.state, stream_id)
+
+    async def _publish(self, stream_id: str, segments: List[str], closed: bool):
+        value = json.dumps({"segments": segments, "closed": closed})
+        await asyncio.to_thread(self.state.set, STREAM_NAMESPACE, stream_id, value, self.ttl_s)
+
+    async def _publish_segments(self, stream_id: str, pipeline: SentenceTTSPipeline):
+        segments = []
+        try:
+            async for path in pipeline.iter_segments():
+                segments.append(path)
+                await self._publish(stream_id, segments, closed=False)
+            await self._publish(stream_id, segments, closed=True)
+        except Exception as e:
+            logging.warning(f"Could not publish TTS stream {stream_id}: {e}")
+
+
+_registry: Optional[PipelineRegistry] = None
+
+
+def get_pipeline_registry() -> PipelineRegistry:
+    global _registry
+    if _registry is None:
+        _registry = PipelineRegistry(get_shared_state())
+    return _registry
+
+
+async def register_pipeline(pipeline: SentenceTTSPipeline) -> str:
+    return await get_pipeline_registry().register(pipeline)
+
+
+async def get_pipeline(stream_id: str) -> Optional[SegmentStream]:
+    return await get_pipeline_registry().get(stream_id)
@@ -1,15 +1,19 @@
 # user_voice.py
-import pyaudio
 import numpy as np
 import webrtcvad
 import collections
+import dataclasses
+import inspect
 import time
 import os
-import sys
-from typing import Optional
+import queue
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
 # --- Configuration ---
-FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 CHUNK_DURATION_MS = 30
@@ -18,21 +22,48 @@ VAD_AGGRESSIVENESS = 3
 PADDING_DURATION_MS = 300
 VOICE_BUFFER_FRAMES = int(PADDING_DURATION_MS / CHUNK_DURATION_MS)
 SILENCE_TIMEOUT_S = 5.0
+MAX_RECORD_DURATION = 30  # seconds (safety guard)
+MAX_RECORD_FRAMES = int(MAX_RECORD_DURATION * 1000 / CHUNK_DURATION_MS)
+RING_FRAMES = VOICE_BUFFER_FRAMES * 2
 WHISPER_MODEL_SIZE = "base"
 WHISPER_DEVICE = "cpu"
 WHISPER_COMPUTE_TYPE = "int8"
-
-try:
-    from faster_whisper import WhisperModel
-except ImportError:
-    print("Error: faster-whisper not installed. Please run 'pip install faster-whisper'")
-    sys.exit(1)
+# Model instances kept in memory, and parallel transcriptions each one accepts
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "1"))
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "2"))
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+# Micro-batching of concurrent transcriptions (off unless WHISPER_BATCHING=1)
+WHISPER_BATCHING = os.getenv("WHISPER_BATCHING", "0") == "1"
+WHISPER_BATCH_MAX_SIZE = int(os.getenv("WHISPER_BATCH_MAX_SIZE", "8"))
+WHISPER_BATCH_MAX_WAIT_MS = float(os.getenv("WHISPER_BATCH_MAX_WAIT_MS", "50"))
+
+# faster-whisper and pyaudio are imported on first use, so importing this
+# module (e.g. for VADSegmenter) never requires the full voice stack
+if TYPE_CHECKING:
+    from faster_whisper.tokenizer import Tokenizer
+    from faster_whisper.transcribe import TranscriptionOptions
+
+
+def _require_faster_whisper():
+    try:
+        import faster_whisper
+    except ImportError as e:
+        raise ImportError("faster-whisper not installed. Please run 'pip install faster-whisper'") from e
+    return faster_whisper
 
 
 class Transcriber:
-    def __init__(self, model_size: str = "base", device: str = "cpu", compute_type: str = "int8"):
+    def __init__(self, model_size: str = "base", device: str = "cpu", compute_type: str = "int8",
+                 num_workers: int = 1, cpu_threads: int = 0):
+        WhisperModel = _require_faster_whisper().WhisperModel
         print(f"Loading Faster Whisper model '{model_size}' on {device} with {compute_type} compute type...")
-        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        self.model = WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            num_workers=num_workers,
+            cpu_threads=cpu_threads
+        )
         print("Faster Whisper model loaded.")
 
     def transcribe(self, audio_data: np.ndarray, language: Optional[str] = None) -> str:
@@ -47,14 +78,371 @@ class Transcriber:
         return "".join([seg.text for seg in segments]).strip()
 
 
+# Same decoding settings BatchedInferencePipeline.transcribe uses by default
+# (faster-whisper 1.1). BatchingTranscriber.check_support verifies they still
+# match the installed TranscriptionOptions.
+BATCH_OPTIONS = dict(
+    beam_size=5,
+    best_of=5,
+    patience=1,
+    length_penalty=1,
+    repetition_penalty=1,
+    no_repeat_ngram_size=0,
+    log_prob_threshold=-1.0,
+    no_speech_threshold=0.6,
+    compression_ratio_threshold=2.4,
+    condition_on_previous_text=False,
+    prompt_reset_on_temperature=0.5,
+    temperatures=[0.0],
+    initial_prompt=None,
+    prefix=None,
+    suppress_blank=True,
+    without_timestamps=True,
+    max_initial_timestamp=0.0,
+    word_timestamps=False,
+    prepend_punctuations="\"'“¿([{-",
+    append_punctuations="\"'.。,，!！?？:：”)]}、",
+    max_new_tokens=None,
+    clip_timestamps=[],
+    hallucination_silence_threshold=None,
+    hotwords=None,
+)
+
+
+def _option_fields(options_cls) -> set:
+    # A dataclass since faster-whisper 1.1, a NamedTuple before
+    if dataclasses.is_dataclass(options_cls):
+        return {field.name for field in dataclasses.fields(options_cls)}
+    return set(getattr(options_cls, "_fields", ()))
+
+
+def _version(module) -> str:
+    return getattr(module, "__version__", "?")
+
+
+class BatchingTranscriber:
+    """
+    Collects utterances that arrive within `max_wait_ms` of each other and
+    decodes them together with faster-whisper's batched inference. Each
+    caller gets its own result back through a future. A request waits at
+    most `max_wait_ms` plus one batch decode before it starts running.
+    """
+
+    def __init__(self, transcriber: Transcriber, max_batch_size: int = WHISPER_BATCH_MAX_SIZE,
+                 max_wait_ms: float = WHISPER_BATCH_MAX_WAIT_MS):
+        self.check_support()
+        self.transcriber = transcriber
+        self.model = transcriber.model
+        self.pipeline = _require_faster_whisper().BatchedInferencePipeline(model=self.model)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+
+        # Metrics
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+        self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio_data: np.ndarray, language: Optional[str] = None) -> Future:
+        future = Future()
+        self._queue.put((audio_data, language, future))
+        return future
+
+    def transcribe(self, audio_data: np.ndarray, language: Optional[str] = None) -> str:
+        return self.submit(audio_data, language).result()
+
+    def _collect_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+            # One tokenizer per batch, so group by language
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+
+            for language, items in groups.items():
+                try:
+                    texts = self._transcribe_group([audio for audio, _, _ in items], language)
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), text in zip(items, texts):
+                    future.set_result(text)
+
+    @staticmethod
+    def check_support():
+        """
+        Raises RuntimeError unless the installed faster-whisper has the batched
+        internals this class drives (they are not public API and may change).
+        """
+        faster_whisper = _require_faster_whisper()
+        try:
+            from faster_whisper import audio, tokenizer, transcribe
+        except ImportError as e:
+            raise RuntimeError(f"faster-whisper {_version(faster_whisper)} lacks batched inference: {e}") from e
+        required = [
+            (faster_whisper, "BatchedInferencePipeline"), (audio, "pad_or_trim"), (tokenizer, "Tokenizer"),
+            (transcribe, "TranscriptionOptions"), (transcribe, "get_suppressed_tokens"),
+        ]
+        missing = [f"{module.__name__}.{name}" for module, name in required if not hasattr(module, name)]
+        if not missing and not hasattr(faster_whisper.BatchedInferencePipeline, "forward"):
+            missing = ["BatchedInferencePipeline.forward"]
+        if missing:
+            raise RuntimeError(f"faster-whisper {_version(faster_whisper)} lacks {', '.join(missing)}")
+
+        params = list(inspect.signature(faster_whisper.BatchedInferencePipeline.forward).parameters)[1:]
+        if params != ["features", "tokenizer", "chunks_metadata", "options"]:
+            raise RuntimeError(f"unexpected BatchedInferencePipeline.forward{tuple(params)} "
+                               f"in faster-whisper {_version(faster_whisper)}")
+        fields = _option_fields(transcribe.TranscriptionOptions)
+        expected = set(BATCH_OPTIONS) | {"suppress_tokens", "multilingual"}
+        if fields != expected:
+            raise RuntimeError(f"TranscriptionOptions fields changed in faster-whisper {_version(faster_whisper)} "
+                               f"(new {sorted(fields - expected)}, removed {sorted(expected - fields)})")
+
+    def _options(self, tokenizer: "Tokenizer", multilingual: bool) -> "TranscriptionOptions":
+        from faster_whisper.transcribe import TranscriptionOptions, get_suppressed_tokens
+        return TranscriptionOptions(
+            **BATCH_OPTIONS,
+            suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+            multilingual=multilingual,
+        )
+
+    def _transcribe_group(self, audios: list, language: Optional[str]) -> list:
+        feature_extractor = self.model.feature_extractor
+        max_samples = feature_extractor.chunk_length * feature_extractor.sampling_rate
+
+        texts = [""] * len(audios)
+        batch_indexes = []
+        for i, audio in enumerate(audios):
+            if audio is None or audio.size == 0:
+                continue
+            if audio.size > max_samples:
+                # Longer than one Whisper window: decode on its own
+                texts[i] = self.transcriber.transcribe(audio, language=language)
+            else:
+                batch_indexes.append(i)
+
+        if not batch_indexes:
+            return texts
+
+        is_multilingual = self.model.model.is_multilingual
+        if not is_multilingual:
+            language = "en"
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        tokenizer = Tokenizer(self.model.hf_tokenizer, is_multilingual, task="transcribe", language=language or "en")
+        options = self._options(tokenizer, multilingual=language is None and is_multilingual)
+
+        features = np.stack([
+            pad_or_trim(feature_extractor(audios[i])[..., :-1]) for i in batch_indexes
+        ])
+        chunks_metadata = [
+            {"start_time": 0.0, "end_time": audios[i].size / feature_extractor.sampling_rate}
+            for i in batch_indexes
+        ]
+        outputs = self.pipeline.forward(features, tokenizer, chunks_metadata, options)
+
+        for i, segments in zip(batch_indexes, outputs):
+            texts[i] = "".join(segment["text"] for segment in segments).strip()
+        return texts
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "waiting": self._queue.qsize(),
+            }
+
+
+class TranscriberPool:
+    """
+    Long-lived Whisper models shared by every transcription in the process.
+    Each model is checked out once per worker slot, so at most
+    pool_size * num_workers transcriptions run at the same time; the rest
+    wait in the executor queue. With batching enabled, requests are instead
+    handed to one BatchingTranscriber per model.
+    """
+
+    def __init__(self, pool_size: int = WHISPER_POOL_SIZE, num_workers: int = WHISPER_NUM_WORKERS,
+                 model_size: str = WHISPER_MODEL_SIZE, device: str = WHISPER_DEVICE,
+                 compute_type: str = WHISPER_COMPUTE_TYPE, cpu_threads: int = WHISPER_CPU_THREADS,
+                 batching: bool = WHISPER_BATCHING):
+        self.pool_size = max(1, pool_size)
+        self.num_workers = max(1, num_workers)
+        if batching:
+            try:
+                BatchingTranscriber.check_support()
+            except RuntimeError as e:
+                print(f"Whisper batching disabled, transcribing one request per worker: {e}")
+                batching = False
+        self._slots = queue.Queue()
+        self.batchers = []
+        for _ in range(self.pool_size):
+            transcriber = Transcriber(model_size, device, compute_type,
+                                      num_workers=self.num_workers, cpu_threads=cpu_threads)
+            if batching:
+                self.batchers.append(BatchingTranscriber(transcriber))
+            else:
+                for _ in range(self.num_workers):
+                    self._slots.put(transcriber)
+        self._next_batcher = itertools.count()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool_size * self.num_workers,
+            thread_name_prefix="whisper"
+        )
+
+        # Metrics
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_inference_s = 0.0
+        self.max_inference_s = 0.0
+        self.last_inference_s = 0.0
+
+    def _pick_batcher(self) -> BatchingTranscriber:
+        return self.batchers[next(self._next_batcher) % len(self.batchers)]
+
+    def _start(self) -> float:
+        with self._lock:
+            self.running += 1
+        return time.perf_counter()
+
+    def _finish(self, start: float, ok: bool):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.running -= 1
+            self.last_inference_s = elapsed
+            self.max_inference_s = max(self.max_inference_s, elapsed)
+            if ok:
+                self.completed += 1
+                self.total_inference_s += elapsed
+            else:
+                self.failed += 1
+
+    def transcribe(self, audio_data: np.ndarray, language: Optional[str] = None) -> str:
+        """Blocking transcription on a pooled model."""
+        if self.batchers:
+            worker = self._pick_batcher()
+        else:
+            worker = self._slots.get()
+        start = self._start()
+        ok = False
+        try:
+            text = worker.transcribe(audio_data, language=language)
+            ok = True
+            return text
+        finally:
+            self._finish(start, ok)
+            if not self.batchers:
+                self._slots.put(worker)
+
+    def _run_queued(self, audio_data: np.ndarray, language: Optional[str]) -> str:
+        with self._lock:
+            self.queued -= 1
+        return self.transcribe(audio_data, language)
+
+    async def transcribe_async(self, audio_data: np.ndarray, language: Optional[str] = None) -> str:
+        """Runs the transcription on the pool's threads without blocking the event loop."""
+        if self.batchers:
+            # The batcher thread does the work; just wait for its future
+            start = self._start()
+            ok = False
+            try:
+                text = await asyncio.wrap_future(self._pick_batcher().submit(audio_data, language))
+                ok = True
+                return text
+            finally:
+                self._finish(start, ok)
+
+        with self._lock:
+            self.queued += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_queued, audio_data, language)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": self.pool_size,
+                "workers_per_model": self.num_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_inference_s": round(self.total_inference_s / self.completed, 3) if self.completed else 0.0,
+                "max_inference_s": round(self.max_inference_s, 3),
+                "last_inference_s": round(self.last_inference_s, 3),
+                "batching": [batcher.stats() for batcher in self.batchers],
+            }
+
+
+_transcriber_pool: Optional[TranscriberPool] = None
+_transcriber_pool_lock = threading.Lock()
+
+
+def get_transcriber_pool() -> TranscriberPool:
+    """Returns the process-wide model pool, loading the models on first use."""
+    global _transcriber_pool
+    if _transcriber_pool is None:
+        with _transcriber_pool_lock:
+            if _transcriber_pool is None:
+                _transcriber_pool = TranscriberPool()
+    return _transcriber_pool
+
+
+def transcriber_pool_stats() -> dict:
+    """Pool metrics, or an empty dict if no model has been loaded yet."""
+    return _transcriber_pool.stats() if _transcriber_pool is not None else {}
+
+
 class AudioRecorder:
     def __init__(self):
+        import pyaudio
         self.audio = pyaudio.PyAudio()
         self.vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
         self.stream = None
-        self.ring_buffer = collections.deque(maxlen=VOICE_BUFFER_FRAMES * 2)
         self.triggered = False
-        self.recorded_frames = []
+
+        # Pre-trigger ring of the last RING_FRAMES frames, with a running voiced count
+        self.ring_frames = np.zeros((RING_FRAMES, CHUNK_SIZE), dtype=np.int16)
+        self.ring_speech = np.zeros(RING_FRAMES, dtype=bool)
+        self.ring_start = 0
+        self.ring_len = 0
+        self.num_voiced = 0
+
+        # Utterance buffers sized for the longest recording, allocated once
+        self.capacity = (MAX_RECORD_FRAMES + RING_FRAMES) * CHUNK_SIZE
+        self.pcm_buffer = np.empty(self.capacity, dtype=np.int16)
+        self.float_buffer = np.empty(self.capacity, dtype=np.float32)
+        self.num_samples = 0
 
         print(f"AudioRecorder initialized: Rate={RATE}Hz, Chunk={CHUNK_SIZE} samples ({CHUNK_DURATION_MS}ms)")
         print(f"VAD Aggressiveness: {VAD_AGGRESSIVENESS}, Silence Timeout: {SILENCE_TIMEOUT_S}s")
@@ -62,7 +450,7 @@ class AudioRecorder:
     def _open_stream(self):
         if self.stream is None:
             self.stream = self.audio.open(
-                format=FORMAT,
+                format=self.audio.get_format_from_width(2),  # 16-bit PCM
                 channels=CHANNELS,
                 rate=RATE,
                 input=True,
@@ -77,14 +465,54 @@ class AudioRecorder:
             self.stream = None
             print("Audio stream closed.")
 
+    def _reset(self):
+        self.ring_start = 0
+        self.ring_len = 0
+        self.num_voiced = 0
+        self.num_samples = 0
+        self.triggered = False
+
+    def _ring_push(self, samples: np.ndarray, is_speech: bool):
+        if self.ring_len == RING_FRAMES:
+            # Overwrite the oldest frame
+            if self.ring_speech[self.ring_start]:
+                self.num_voiced -= 1
+            index = self.ring_start
+            self.ring_start = (self.ring_start + 1) % RING_FRAMES
+        else:
+            index = (self.ring_start + self.ring_len) % RING_FRAMES
+            self.ring_len += 1
+        self.ring_frames[index] = samples
+        self.ring_speech[index] = is_speech
+        if is_speech:
+            self.num_voiced += 1
+
+    def _append_samples(self, samples: np.ndarray) -> bool:
+        end = self.num_samples + len(samples)
+        if end > self.capacity:
+            return False
+        self.pcm_buffer[self.num_samples:end] = samples
+        self.num_samples = end
+        return True
+
+    def _flush_ring(self):
+        # Copy ring frames oldest-first into the utterance buffer
+        for offset in range(self.ring_len):
+            self._append_samples(self.ring_frames[(self.ring_start + offset) % RING_FRAMES])
+        self.ring_start = 0
+        self.ring_len = 0
+        self.num_voiced = 0
+
     def record_utterance(self) -> Optional[np.ndarray]:
+        """
+        Records one utterance and returns it as float32 samples. The returned
+        array is a view into a reusable buffer and stays valid until the next
+        call to record_utterance.
+        """
         self._open_stream()
-        self.ring_buffer.clear()
-        self.recorded_frames.clear()
-        self.triggered = False
+        self._reset()
         last_speech_time = time.time()
         start_time = time.time()
-        MAX_RECORD_DURATION = 30  # seconds (safety guard)
 
         print("Listening for speech...")
 
@@ -101,25 +529,23 @@ class AudioRecorder:
                     break
 
                 is_speech = self.vad.is_speech(frame_bytes, RATE)
-                self.ring_buffer.append((frame_bytes, is_speech))
+                samples = np.frombuffer(frame_bytes, dtype=np.int16)
 
                 if not self.triggered:
-                    num_voiced = len([f for f, speech in self.ring_buffer if speech])
-                    if num_voiced > VOICE_BUFFER_FRAMES * 0.75:
+                    self._ring_push(samples, is_speech)
+                    if self.num_voiced > VOICE_BUFFER_FRAMES * 0.75:
                         print("Speech detected. Starting recording utterance.")
                         self.triggered = True
-                        for f_bytes, _ in self.ring_buffer:
-                            self.recorded_frames.append(f_bytes)
-                        self.ring_buffer.clear()
+                        self._flush_ring()
                         last_speech_time = time.time()
                 else:
-                    self.recorded_frames.append(frame_bytes)
+                    if not self._append_samples(samples):
+                        print("Max recording duration reached.")
+                        break
                     if is_speech:
                         last_speech_time = time.time()
                     elif time.time() - last_speech_time > SILENCE_TIMEOUT_S:
                         print(f"Silence for {SILENCE_TIMEOUT_S}s detected. Ending utterance.")
-                        for f_bytes, _ in self.ring_buffer:
-                            self.recorded_frames.append(f_bytes)
                         break
 
         except KeyboardInterrupt:
@@ -129,12 +555,14 @@ class AudioRecorder:
         finally:
             self._close_stream()
 
-        if not self.recorded_frames:
+        if not self.num_samples:
             print("No significant speech utterance recorded.")
             return None
 
-        audio_data_int16 = np.frombuffer(b''.join(self.recorded_frames), dtype=np.int16)
-        audio_data_float32 = audio_data_int16.astype(np.float32) / 32768.0
+        # int16 -> float32 in place into the reusable buffer
+        audio_data_float32 = self.float_buffer[:self.num_samples]
+        np.multiply(self.pcm_buffer[:self.num_samples], np.float32(1.0 / 32768.0),
+                    out=audio_data_float32, dtype=np.float32)
 
         print(f"Recorded utterance duration: {len(audio_data_float32) / RATE:.2f} seconds")
         return audio_data_float32
@@ -144,15 +572,70 @@ class AudioRecorder:
         print("PyAudio terminated.")
 
 
+class VADSegmenter:
+    """
+    Streaming speech trimmer for already-recorded audio. Uses the same 30 ms
+    webrtcvad framing, ring buffer and trigger ratio as AudioRecorder, but
+    keeps every speech segment (with padding) instead of stopping at the
+    first long silence. Feed 16 kHz mono int16 PCM in chunks of any size.
+    """
+
+    def __init__(self):
+        self.vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        self.frame_bytes = CHUNK_SIZE * 2
+        self.ring_buffer = collections.deque(maxlen=VOICE_BUFFER_FRAMES * 2)
+        self.num_voiced = 0
+        self.triggered = False
+        self.speech_frames = []
+        self.total_frames = 0
+        self._pending = bytearray()
+
+    def _process_frame(self, frame_bytes: bytes):
+        self.total_frames += 1
+        is_speech = self.vad.is_speech(frame_bytes, RATE)
+
+        # Keep a running count of voiced frames in the ring instead of rescanning it
+        if len(self.ring_buffer) == self.ring_buffer.maxlen and self.ring_buffer[0][1]:
+            self.num_voiced -= 1
+        self.ring_buffer.append((frame_bytes, is_speech))
+        if is_speech:
+            self.num_voiced += 1
+
+        if not self.triggered:
+            if self.num_voiced > VOICE_BUFFER_FRAMES * 0.75:
+                self.triggered = True
+                self.speech_frames.extend(f_bytes for f_bytes, _ in self.ring_buffer)
+                self.ring_buffer.clear()
+                self.num_voiced = 0
+        else:
+            self.speech_frames.append(frame_bytes)
+            num_unvoiced = len(self.ring_buffer) - self.num_voiced
+            if num_unvoiced > self.ring_buffer.maxlen * 0.9:
+                # End of a speech segment; the ring already holds its trailing padding
+                self.triggered = False
+                self.ring_buffer.clear()
+                self.num_voiced = 0
+
+    def feed(self, pcm_bytes: bytes):
+        self._pending.extend(pcm_bytes)
+        usable = len(self._pending) - len(self._pending) % self.frame_bytes
+        for offset in range(0, usable, self.frame_bytes):
+            self._process_frame(bytes(self._pending[offset:offset + self.frame_bytes]))
+        del self._pending[:usable]
+
+    def finish(self) -> Optional[np.ndarray]:
+        """Returns the kept speech as float32 samples, or None if there was none."""
+        if not self.speech_frames:
+            return None
+        audio_data_int16 = np.frombuffer(b''.join(self.speech_frames), dtype=np.int16)
+        return audio_data_int16.astype(np.float32) / 32768.0
+
+
 # --- Externally callable function ---
 def record_and_transcribe(language: str = "en") -> dict:
+    recorder = AudioRecorder()
     try:
-        recorder = AudioRecorder()
-        transcriber = Transcriber(
-            model_size=WHISPER_MODEL_SIZE,
-            device=WHISPER_DEVICE,
-            compute_type=WHISPER_COMPUTE_TYPE
-        )
+        transcriber = get_transcriber_pool()
 
         audio = recorder.record_utterance()
         if audio is None:
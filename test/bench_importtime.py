@@ -0,0 +1,72 @@
+# bench_importtime.py
+# Cold-start check for text-only workers: runs `python -X importtime -c "import main"`
+# and fails when importing main.py takes longer than the budget.
+#
+#   python test/bench_importtime.py [--budget_ms 600] [--runs 5] [--top 15]
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "600"))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# "import time:  self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure(env: dict) -> list:
+    """One cold import of main; returns (cumulative_us, self_us, depth, module) per import line."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ import main failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget for main.py")
+    parser.add_argument("--budget_ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5, help="Best of N cold imports")
+    parser.add_argument("--top", type=int, default=15, help="Slowest direct imports to list")
+    args = parser.parse_args()
+
+    # Text-only worker: no voice stack, no TTS
+    env = {**os.environ, "ENABLE_VOICE": "0", "ENABLE_TTS": "0", "PYTHONDONTWRITEBYTECODE": "1"}
+    best = None
+    for _ in range(args.runs):
+        rows = measure(env)
+        # importtime prints a module after everything it imported
+        end = next(i for i, row in enumerate(rows) if row[3] == "main" and row[2] == 0)
+        start = end
+        while start > 0 and rows[start - 1][2] > 0:
+            start -= 1
+        if best is None or rows[end][0] < best[0]:
+            best = (rows[end][0], rows[start:end])
+
+    total_us, rows = best
+    print(f"⏱️ import main: {total_us / 1000:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)\n")
+    top_level = sorted((row for row in rows if row[2] == 1), reverse=True)[:args.top]
+    for cumulative_us, _, _, module in top_level:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    heavy = {"src.user_voice", "faster_whisper", "pyaudio", "edge_tts", "langchain_openai", "langchain_astradb"}
+    loaded = sorted(heavy & {module for _, _, _, module in rows})
+    if loaded:
+        print(f"\n⚠️ Loaded at import time: {', '.join(loaded)}")
+
+    if total_us / 1000 > args.budget_ms or loaded:
+        sys.exit(1)
+    print("\n✅ Within budget.")
+
+
+if __name__ == "__main__":
+    main()
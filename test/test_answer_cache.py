@@ -0,0 +1,104 @@
+# test_answer_cache.py
+# Offline checks for the answer cache.
+import time
+
+import pytest
+
+from logic import answer_cache
+from logic.answer_cache import AnswerCache, bump_corpus_version, content_words, normalize_question, question_key
+
+
+@pytest.fixture(autouse=True)
+def corpus_version_file(tmp_path, monkeypatch):
+    path = tmp_path / "corpus_version"
+    monkeypatch.setattr(answer_cache, "CORPUS_VERSION_FILE", str(path))
+    return path
+
+
+def make_cache(**kwargs) -> AnswerCache:
+    return AnswerCache(**kwargs)
+
+
+def test_normalize_question_folds_case_and_punctuation():
+    assert normalize_question("  When does the Museum OPEN?! ") == "when does the museum open"
+
+
+def test_content_words_ignore_stopwords():
+    assert content_words("when does the museum open") == content_words("when does museum open")
+    assert content_words("is the museum open on monday") != content_words("is the museum open on tuesday")
+
+
+def test_question_key_ignores_stopwords_and_word_order():
+    assert question_key("When does the Museum open?") == question_key("museum open, when")
+    assert question_key("Is the museum open on Monday?") != question_key("Is the museum open on Tuesday?")
+    # Only stopwords: the normalized text is the key
+    assert question_key("Is it?") == "is it"
+
+
+def test_exact_hit():
+    cache = make_cache()
+    cache.store("en", ("adult",), "When does the museum open?", "At 8:30.")
+
+    assert cache.lookup("en", ("adult",), "when does the museum open") == "At 8:30."
+    assert cache.stats()["hits"] == 1
+
+
+def test_hit_on_stopword_and_word_order_variant():
+    cache = make_cache()
+    cache.store("en", ("adult",), "When does the museum open?", "At 8:30.")
+
+    assert cache.lookup("en", ("adult",), "The museum, when does it open") == "At 8:30."
+
+
+def test_different_content_word_is_a_miss():
+    cache = make_cache()
+    cache.store("en", ("adult",), "Is the museum open on Monday?", "No, it is closed on Mondays.")
+
+    assert cache.lookup("en", ("adult",), "Is the museum open on Tuesday?") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_language_and_profile_are_part_of_the_key():
+    cache = make_cache()
+    cache.store("en", ("adult",), "Where can I park?", "Behind the museum.")
+
+    assert cache.lookup("it", ("adult",), "Where can I park?") is None
+    assert cache.lookup("en", ("child",), "Where can I park?") is None
+
+
+def test_entries_expire_after_ttl():
+    cache = make_cache(ttl_s=0.05)
+    cache.store("en", (), "Where can I park?", "Behind the museum.")
+    time.sleep(0.1)
+
+    assert cache.lookup("en", (), "Where can I park?") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    cache.store("en", (), "When does the museum open?", "At 8:30.")
+    cache.store("en", (), "Where can I park?", "Behind the museum.")
+    # Touch the first entry so the second becomes the oldest
+    cache.lookup("en", (), "When does the museum open?")
+    cache.store("en", (), "Is the museum open on Monday?", "No.")
+
+    assert cache.lookup("en", (), "When does the museum open?") == "At 8:30."
+    assert cache.lookup("en", (), "Where can I park?") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_corpus_version_change_clears_entries():
+    cache = make_cache()
+    cache.store("en", (), "Where can I park?", "Behind the museum.")
+
+    version = bump_corpus_version()
+
+    assert cache.lookup("en", (), "Where can I park?") is None
+    assert cache.stats()["corpus_version"] == version
+
+
+def test_default_corpus_version_file_is_anchored_to_the_repo_root():
+    repo_root = answer_cache.OUTPUT_DIR.parent
+    assert (repo_root / "logic" / "answer_cache.py").is_file()
+    assert answer_cache.OUTPUT_DIR.name == "output"
@@ -0,0 +1,112 @@
+# test_chunked_upload.py
+# Offline checks for the chunked /transcribe/chunk endpoint; transcription is faked.
+import asyncio
+import os
+
+import httpx
+import pytest
+
+import main
+from logic.shared_state import SqliteState
+from src import audio_upload
+from src.audio_upload import ChunkedUploadRegistry
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_upload, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_upload, "_registry", ChunkedUploadRegistry())
+    monkeypatch.setattr(main, "ENABLE_VOICE", True)
+    received = []
+
+    async def fake_transcribe_file(file_path, language):
+        with open(file_path, "rb") as f:
+            received.append(f.read())
+        audio_upload.remove_file(file_path)
+        return {"text": "ok", "language_used": language}
+
+    monkeypatch.setattr(main, "transcribe_file", fake_transcribe_file)
+    return received
+
+
+async def post_chunk(client, index, data, upload_id=None, final=False):
+    fields = {"index": str(index), "final": str(final).lower()}
+    if upload_id:
+        fields["upload_id"] = upload_id
+    return await client.post("/transcribe/chunk", data=fields, files={"chunk": ("c.webm", data)})
+
+
+def run(scenario):
+    async def wrapper():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client)
+    return asyncio.run(wrapper())
+
+
+def test_chunks_are_appended_in_order(upload_dir):
+    async def scenario(client):
+        first = (await post_chunk(client, 0, b"aa")).json()
+        await post_chunk(client, 1, b"bb", first["upload_id"])
+        return (await post_chunk(client, 2, b"cc", first["upload_id"], final=True)).json()
+
+    result = run(scenario)
+    assert result["text"] == "ok"
+    assert upload_dir == [b"aabbcc"]
+    assert audio_upload._registry.state.get(audio_upload.UPLOAD_NAMESPACE, result["upload_id"]) is None
+
+
+def test_first_chunk_must_have_index_zero(tmp_path):
+    async def scenario(client):
+        return await post_chunk(client, 3, b"xx")
+
+    response = run(scenario)
+    assert response.status_code == 409
+    assert response.json()["expected_index"] == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_copies_of_a_chunk_are_appended_once(upload_dir):
+    async def scenario(client):
+        upload_id = (await post_chunk(client, 0, b"aa")).json()["upload_id"]
+        copies = await asyncio.gather(*(post_chunk(client, 1, b"bb", upload_id) for _ in range(3)))
+        await post_chunk(client, 2, b"cc", upload_id, final=True)
+        return copies
+
+    statuses = sorted(response.status_code for response in run(scenario))
+    assert statuses == [200, 409, 409]
+    assert upload_dir == [b"aabbcc"]
+
+
+def test_unknown_upload_id():
+    async def scenario(client):
+        return await post_chunk(client, 1, b"xx", "missing")
+
+    assert run(scenario).status_code == 404
+
+
+def test_upload_continues_on_another_worker(upload_dir, tmp_path, monkeypatch):
+    # Two workers: separate registries over one shared state file
+    state = SqliteState(str(tmp_path / "shared_state.sqlite"))
+    workers = [ChunkedUploadRegistry(state), ChunkedUploadRegistry(state)]
+
+    async def post_on(worker, client, *args, **kwargs):
+        monkeypatch.setattr(audio_upload, "_registry", workers[worker])
+        return await post_chunk(client, *args, **kwargs)
+
+    async def scenario(client):
+        upload_id = (await post_on(0, client, 0, b"aa")).json()["upload_id"]
+        second = await post_on(1, client, 1, b"bb", upload_id)
+        duplicate = await post_on(0, client, 1, b"bb", upload_id)
+        final = await post_on(1, client, 2, b"cc", upload_id, final=True)
+        return second, duplicate, final
+
+    try:
+        second, duplicate, final = run(scenario)
+    finally:
+        state.close()
+    assert second.status_code == 200
+    assert duplicate.status_code == 409
+    assert duplicate.json()["expected_index"] == 2
+    assert final.json()["text"] == "ok"
+    assert upload_dir == [b"aabbcc"]
@@ -0,0 +1,79 @@
+# test_context_packer.py
+# Offline checks for context packing. tiktoken needs to download its BPE files,
+# so a one-token-per-character encoding stands in for it.
+import pytest
+from langchain_core.documents import Document
+
+from logic import context_packer
+from logic.context_packer import ELLIPSIS, SEPARATOR, pack_context, select_hits
+
+
+class CharEncoding:
+    def encode_ordinary(self, text):
+        return [ord(ch) for ch in text]
+
+    def encode_ordinary_batch(self, texts):
+        return [self.encode_ordinary(text) for text in texts]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+@pytest.fixture(autouse=True)
+def char_encoding(monkeypatch):
+    monkeypatch.setattr(context_packer, "_encoding", CharEncoding())
+
+
+def doc(doc_id: str, text: str, score=None, language: str = "en") -> Document:
+    metadata = {"doc_id": doc_id, "language": language}
+    if score is not None:
+        metadata["score"] = score
+    return Document(page_content=text, metadata=metadata)
+
+
+def sentences(prefix: str, count: int) -> str:
+    return " ".join(f"{prefix} sentence number {i}." for i in range(count))
+
+
+def test_select_hits_dedupes_and_drops_weak_hits_but_keeps_the_best():
+    docs = [
+        doc("a", "first", score=0.4),
+        doc("a", "first again", score=0.9),
+        doc("b", "weak", score=0.5),
+        doc("c", "lexical only"),
+        doc("a", "other language", score=0.8, language="it"),
+    ]
+    kept = select_hits(docs, min_score=0.6)
+    assert [d.page_content for d in kept] == ["first", "lexical only", "other language"]
+
+
+def test_short_context_is_kept_verbatim():
+    docs = [doc("a", "Alpha."), doc("b", "Beta.")]
+    assert pack_context(docs, budget=1000, doc_max_tokens=600, min_score=0) == "Alpha." + SEPARATOR + "Beta."
+
+
+@pytest.mark.parametrize("budget", [60, 100, 150, 257, 400, 1000])
+def test_packed_context_never_exceeds_the_budget(budget):
+    docs = [doc(str(i), sentences(f"Doc{i}", 20), score=0.9) for i in range(5)]
+    context = pack_context(docs, budget=budget, doc_max_tokens=300, min_score=0)
+    assert context
+    assert len(CharEncoding().encode_ordinary(context)) <= budget
+
+
+def test_long_documents_are_trimmed_to_their_share_at_a_sentence_end():
+    text = sentences("Long", 30)
+    context = pack_context([doc("a", text)], budget=1000, doc_max_tokens=200, min_score=0)
+
+    assert len(context) <= 200
+    assert context.endswith("." + ELLIPSIS)
+    assert text.startswith(context[:-len(ELLIPSIS)])
+
+
+def test_documents_that_no_longer_fit_are_dropped():
+    docs = [doc("a", "x" * 200), doc("b", "y" * 200)]
+    context = pack_context(docs, budget=220, doc_max_tokens=200, min_score=0)
+    assert context == "x" * 200
+
+
+def test_empty_input():
+    assert pack_context([]) == ""
@@ -0,0 +1,123 @@
+# test_doc_specs.py
+# Offline checks for the declarative loader engine (DocSpec / SOURCE_SPECS).
+import json
+import os
+
+import pytest
+
+from logic import utils
+from logic.utils import DocSpec, const, literal, load_source, text
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+TOY_DATA = {
+    "museum": "Toy Museum",
+    "items": [
+        {
+            "id": "bone_tool",
+            "name": {"en": "Bone tool", "it": "Strumento in osso", "fr": "", "de": "", "ar": ""},
+            "period": "Gravettian",
+            "parts": [
+                {"id": "tip", "name": {"en": "Tip", "it": "Punta"}},
+            ],
+        },
+        {
+            # No id: the document ID is a stable hash of the record
+            "name": {"en": "Shell necklace"},
+            "tags": [{"en": "shell"}, {"en": "ornament"}],
+            "period": "",
+        },
+    ],
+}
+
+TOY_SPEC = DocSpec(
+    doc_type="toy",
+    doc_id="{base}",
+    records=lambda data: data["items"],
+    base_id=lambda record, ctx: utils._id_or_hash(record, "toy"),
+    parts=[
+        text("Name: {}", "name"),
+        text("Tags: {}", "tags", join=" / "),
+        const("Period: {}", "period"),
+        literal("Museum item"),
+    ],
+    metadata=lambda record, ctx: {"museum": ctx["data"]["museum"]},
+    children=(
+        DocSpec(
+            doc_type="toy_part",
+            doc_id="{base}_{lang}",
+            records=lambda parent: parent.get("parts", []),
+            base_id=lambda record, ctx: f"{ctx['parent_id']}_{record['id']}",
+            parts=[text("Part: {}", "name")],
+        ),
+    ),
+)
+
+
+@pytest.fixture
+def toy_source(tmp_path, monkeypatch):
+    path = tmp_path / "toy.json"
+    path.write_text(json.dumps(TOY_DATA), encoding="utf-8")
+    monkeypatch.setitem(utils.SOURCE_SPECS, "toy", ("toy.json", [TOY_SPEC]))
+    return str(path)
+
+
+def test_one_document_per_translated_language(toy_source):
+    docs = [d for d in load_source("toy", toy_source) if d.metadata["doc_type"] == "toy"]
+    by_id_lang = {(d.metadata["doc_id"], d.metadata["language"]): d for d in docs}
+
+    # Languages with only shared, untranslated parts are skipped
+    assert sorted(lang for doc_id, lang in by_id_lang if doc_id == "bone_tool") == ["en", "it"]
+    assert by_id_lang["bone_tool", "en"].page_content == "Name: Bone tool. Period: Gravettian. Museum item."
+    assert by_id_lang["bone_tool", "it"].page_content == "Name: Strumento in osso. Period: Gravettian. Museum item."
+
+
+def test_list_fields_are_joined_and_empty_values_dropped(toy_source):
+    necklace = next(
+        d for d in load_source("toy", toy_source)
+        if d.metadata["doc_id"] != "bone_tool" and d.metadata["language"] == "en"
+        and d.metadata["doc_type"] == "toy"
+    )
+    assert necklace.page_content == "Name: Shell necklace. Tags: shell / ornament. Museum item."
+
+
+def test_metadata_and_length(toy_source):
+    doc = next(d for d in load_source("toy", toy_source) if d.metadata["doc_id"] == "bone_tool")
+    assert doc.metadata["museum"] == "Toy Museum"
+    assert doc.metadata["length"] == len(doc.page_content.split())
+
+
+def test_records_without_id_get_a_stable_hash(toy_source):
+    first = [d.metadata["doc_id"] for d in load_source("toy", toy_source)]
+    second = [d.metadata["doc_id"] for d in load_source("toy", toy_source)]
+    hashed = [doc_id for doc_id in first if doc_id.startswith("toy_")]
+    assert hashed and first == second
+
+
+def test_children_follow_their_parent_in_each_language(toy_source):
+    order = [(d.metadata["doc_id"], d.metadata["language"]) for d in load_source("toy", toy_source)]
+    assert order[:4] == [
+        ("bone_tool", "en"), ("bone_tool_tip_en", "en"),
+        ("bone_tool", "it"), ("bone_tool_tip_it", "it"),
+    ]
+
+
+def test_unreadable_file_yields_no_documents(tmp_path, monkeypatch):
+    broken = tmp_path / "toy.json"
+    broken.write_text("{not json", encoding="utf-8")
+    monkeypatch.setitem(utils.SOURCE_SPECS, "toy", ("toy.json", [TOY_SPEC]))
+    assert load_source("toy", str(broken)) == []
+    assert load_source("toy", str(tmp_path / "missing.json")) == []
+
+
+def test_artifacts_keep_sub_artifacts_linked_to_their_parent():
+    docs = load_source("artifact", os.path.join(DATA_PATH, "artifacts.json"))
+    parents = {d.metadata["doc_id"] for d in docs if d.metadata["doc_type"] != "sub_artifact"}
+    subs = [d for d in docs if d.metadata["doc_type"] == "sub_artifact"]
+
+    assert subs
+    assert all(d.metadata["parent_artifact_id"] in parents for d in subs)
+    assert all("(Part of: " in d.page_content for d in subs)
+    # Document IDs are unique per language
+    keys = [(d.metadata["doc_id"], d.metadata["language"]) for d in docs]
+    assert len(keys) == len(set(keys))
@@ -0,0 +1,119 @@
+# test_embed_manifest.py
+# Offline checks for the ingestion manifest: stable IDs and the incremental plan.
+import json
+
+from langchain_core.documents import Document
+
+from logic.ingest_manifest import (
+    assign_ids, content_hash, load_manifest, plan_changes, removed_part_ids, save_manifest, stale_part_ids
+)
+
+
+def doc(doc_id: str, language: str, text: str, doc_type: str = "exhibition") -> Document:
+    return Document(page_content=text, metadata={"doc_id": doc_id, "language": language, "doc_type": doc_type})
+
+
+EXHIBITIONS = [
+    doc("grimaldi", "en", "The Grimaldi caves."),
+    doc("grimaldi", "it", "Le grotte dei Balzi Rossi."),
+    doc("venus", "en", "The Venus figurines."),
+]
+
+
+def ingest(loaded, manifest):
+    """What embed.py records after a fully successful run."""
+    changed, changed_ids, removed, current = plan_changes(loaded, manifest)
+    manifest = {doc_id: entry for doc_id, entry in manifest.items() if doc_id not in removed}
+    manifest.update({doc_id: current[doc_id] for doc_id in changed_ids})
+    return changed, changed_ids, removed, manifest
+
+
+def test_ids_are_stable_and_distinct_per_language():
+    ids = assign_ids("exhibition", EXHIBITIONS)
+    assert ids == assign_ids("exhibition", list(EXHIBITIONS))
+    assert len(set(ids)) == 3
+    # Same metadata in another source is another document
+    assert assign_ids("artifact", EXHIBITIONS[:1]) != ids[:1]
+
+
+def test_exact_duplicates_get_ordinal_ids():
+    ids = assign_ids("exhibition", [EXHIBITIONS[0], EXHIBITIONS[0]])
+    assert len(set(ids)) == 2
+    assert ids[0] == assign_ids("exhibition", EXHIBITIONS)[0]
+
+
+def test_content_hash_covers_text_and_metadata():
+    base = content_hash(EXHIBITIONS[0])
+    assert base == content_hash(doc("grimaldi", "en", "The Grimaldi caves."))
+    assert base != content_hash(doc("grimaldi", "en", "The Grimaldi caves!"))
+    assert base != content_hash(doc("grimaldi", "en", "The Grimaldi caves.", doc_type="artifact"))
+
+
+def test_first_run_adds_everything_and_a_rerun_nothing():
+    changed, changed_ids, removed, manifest = ingest({"exhibition": EXHIBITIONS}, {})
+    assert changed == EXHIBITIONS
+    assert removed == []
+
+    changed, changed_ids, removed, _ = ingest({"exhibition": EXHIBITIONS}, manifest)
+    assert changed == changed_ids == removed == []
+
+
+def test_mutated_doc_set_plans_updates_adds_and_removals():
+    _, first_ids, _, manifest = ingest({"exhibition": EXHIBITIONS}, {})
+    grimaldi_en, grimaldi_it, venus_en = first_ids
+
+    edited = [
+        doc("grimaldi", "en", "The Grimaldi caves, updated."),
+        EXHIBITIONS[1],
+        doc("venus", "it", "Le Veneri."),
+    ]
+    changed, changed_ids, removed, current = plan_changes({"exhibition": edited}, manifest)
+
+    assert [d.page_content for d in changed] == ["The Grimaldi caves, updated.", "Le Veneri."]
+    assert changed_ids[0] == grimaldi_en
+    assert removed == [venus_en]
+    assert current[grimaldi_it] is manifest[grimaldi_it]
+
+
+def test_sources_that_did_not_load_keep_their_entries():
+    _, _, _, manifest = ingest({"exhibition": EXHIBITIONS, "review": [doc("r1", "en", "Great!", "review")]}, {})
+
+    _, _, removed, _ = plan_changes({"review": [doc("r1", "en", "Great!", "review")]}, manifest)
+    assert removed == []
+
+
+def test_unchanged_docs_keep_their_recorded_part_count():
+    _, ids, _, manifest = ingest({"exhibition": EXHIBITIONS}, {})
+    manifest[ids[0]]["chunks"] = 3
+
+    _, _, _, current = plan_changes({"exhibition": EXHIBITIONS}, manifest)
+    assert current[ids[0]]["chunks"] == 3
+
+
+def test_removed_and_stale_parts():
+    manifest = {"a": {"chunks": 3}, "b": {}}
+    assert removed_part_ids(["a", "b"], manifest) == ["a", "a:1", "a:2", "b"]
+
+    # "a" now splits into one part and "c" is new: only a's trailing parts are stale
+    current = {"a": {}, "c": {"chunks": 2}}
+    assert stale_part_ids(["a", "c"], manifest, current) == ["a:1", "a:2"]
+    assert stale_part_ids(["a"], manifest, {"a": {"chunks": 4}}) == []
+
+
+def test_manifest_sections_are_kept_per_vector_store(tmp_path):
+    path = str(tmp_path / "ingest_manifest.json")
+    save_manifest({"id1": {"source": "exhibition", "hash": "h"}}, "astra:collection", path)
+    save_manifest({"id2": {"source": "artifact", "hash": "h"}}, "local:/index", path)
+
+    assert load_manifest("astra:collection", path) == {"id1": {"source": "exhibition", "hash": "h"}}
+    assert load_manifest("local:/index", path) == {"id2": {"source": "artifact", "hash": "h"}}
+    assert load_manifest("other", path) == {}
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"astra:collection", "local:/index"}
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    path = tmp_path / "ingest_manifest.json"
+    path.write_text("{broken", encoding="utf-8")
+    assert load_manifest("astra:collection", str(path)) == {}
+    assert load_manifest("astra:collection", str(tmp_path / "missing.json")) == {}
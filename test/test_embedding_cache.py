@@ -0,0 +1,122 @@
+# test_embedding_cache.py
+# Offline checks for the two-tier embedding cache, with a fake provider.
+import asyncio
+import threading
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from logic.embedding_cache import CachedEmbeddings
+
+
+class FakeProvider(Embeddings):
+    """Embeds a text as [length, first code point] and records every request."""
+
+    def __init__(self):
+        self.requests = []
+
+    def _vector(self, text):
+        return [float(len(text)), float(ord(text[0]))]
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.requests.append([text])
+        return self._vector(text)
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "embedding_cache.sqlite")
+
+
+def make_cache(db_path=None, memory_items=100, model="text-embedding-3-small", dimensions=2):
+    return CachedEmbeddings(FakeProvider(), model, dimensions, db_path=db_path, memory_items=memory_items)
+
+
+def test_batch_sends_only_its_distinct_misses(db_path):
+    cache = make_cache(db_path)
+    cache.embed_documents(["alpha", "beta"])
+
+    vectors = cache.embed_documents(["alpha", " gamma ", "gamma", "beta", "delta"])
+
+    assert cache.underlying.requests == [["alpha", "beta"], ["gamma", "delta"]]
+    assert vectors == [[5.0, 97.0], [5.0, 103.0], [5.0, 103.0], [4.0, 98.0], [5.0, 100.0]]
+    assert cache.missing(["alpha", "epsilon", "epsilon"]) == ["epsilon"]
+
+
+def test_memory_tier_is_an_lru():
+    cache = make_cache(memory_items=2)
+    cache.embed_documents(["a", "b"])
+    cache.embed_query("a")  # "b" is now the least recently used
+    cache.embed_query("c")
+
+    cache.embed_query("a")
+    cache.embed_query("b")
+
+    assert cache.underlying.requests == [["a", "b"], ["c"], ["b"]]
+    assert cache.stats()["memory_items"] == 2
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_sqlite_tier_persists_across_instances(db_path):
+    make_cache(db_path).embed_documents(["Venus figurines", "Triple burial"])
+
+    restarted = make_cache(db_path)
+    assert restarted.embed_documents(["Triple burial", "Venus figurines"]) == [[13.0, 84.0], [15.0, 86.0]]
+    assert restarted.underlying.requests == []
+    assert restarted.stats()["disk_hits"] == 2
+
+
+def test_keys_include_model_and_dimensions(db_path):
+    make_cache(db_path).embed_query("hello")
+    other = make_cache(db_path, dimensions=512)
+    other.embed_query("hello")
+    assert other.underlying.requests == [["hello"]]
+
+
+def test_put_stores_vectors_computed_elsewhere(db_path):
+    cache = make_cache(db_path)
+    cache.put(["precomputed"], [[1.0, 2.0]])
+    assert make_cache(db_path).embed_query("precomputed") == [1.0, 2.0]
+
+
+class ThreadRecordingCache(CachedEmbeddings):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.io_threads = []
+
+    def _lookup_disk(self, keys):
+        self.io_threads.append(threading.current_thread())
+        return super()._lookup_disk(keys)
+
+    def _store(self, items):
+        self.io_threads.append(threading.current_thread())
+        super()._store(items)
+
+
+def test_async_calls_do_sqlite_io_off_the_event_loop(db_path):
+    make_cache(db_path).embed_query("on disk")
+    cache = ThreadRecordingCache(FakeProvider(), "text-embedding-3-small", 2, db_path=db_path)
+
+    async def run():
+        documents = await cache.aembed_documents(["on disk", "new"])
+        query = await cache.aembed_query("new")
+        return threading.current_thread(), documents, query
+
+    loop_thread, documents, query = asyncio.run(run())
+
+    assert documents == [[7.0, 111.0], [3.0, 110.0]]
+    assert query == [3.0, 110.0]
+    assert cache.underlying.requests == [["new"]]
+    # One disk lookup and one store for the batch; the query was a memory hit
+    assert len(cache.io_threads) == 2
+    assert loop_thread not in cache.io_threads
@@ -0,0 +1,160 @@
+# test_ingest_engine.py
+# Offline checks for the ingestion engine: rate-limit parsing, the AIMD limiter,
+# the checkpoint journal and retries, with a fake OpenAI client and vector store.
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+from langchain_core.documents import Document
+
+from logic import ingest_engine
+from logic.ingest_engine import (
+    AdaptiveLimiter, CheckpointJournal, IngestEngine, parse_duration, rate_limit_headroom, retry_after,
+)
+
+
+def test_parse_duration():
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("1.5") == 1.5
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("1h2m3s") == 3723
+    assert parse_duration("soon") is None
+    assert parse_duration(None) is None
+
+
+def test_rate_limit_headroom_takes_the_tighter_limit():
+    headers = {
+        "x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "50",
+        "x-ratelimit-limit-tokens": "1000", "x-ratelimit-remaining-tokens": "50",
+    }
+    assert rate_limit_headroom(headers) == 0.05
+    assert rate_limit_headroom({}) is None
+
+
+def test_retry_after_takes_the_longest_wait():
+    assert retry_after({"retry-after": "2", "x-ratelimit-reset-tokens": "6m0s"}) == 360
+    assert retry_after({}) is None
+    assert retry_after(None) is None
+
+
+def test_limiter_grows_additively_and_halves_on_throttle():
+    limiter = AdaptiveLimiter(initial=2, maximum=8)
+    for _ in range(10):
+        limiter.on_success(headroom=None)
+    assert 4 <= limiter.limit <= 5
+
+    limiter.on_throttle(wait_s=None)
+    assert 2 <= limiter.limit <= 2.5
+
+    for _ in range(10):
+        limiter.on_throttle(wait_s=None)
+    assert limiter.limit == 1
+
+
+def test_limiter_backs_off_on_low_headroom_and_respects_maximum():
+    limiter = AdaptiveLimiter(initial=4, maximum=4)
+    limiter.on_success(headroom=0.5)
+    assert limiter.limit == 4
+    limiter.on_success(headroom=0.01)
+    assert limiter.limit == 3
+
+
+def test_limiter_caps_in_flight_requests():
+    async def run():
+        limiter = AdaptiveLimiter(initial=2, maximum=2)
+        in_flight, peak = 0, 0
+
+        async def request():
+            nonlocal in_flight, peak
+            await limiter.acquire()
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            await limiter.release()
+
+        await asyncio.gather(*(request() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+
+def test_journal_replays_only_its_scope_and_survives_a_torn_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    CheckpointJournal("astra:a", path).append({"id1": {"hash": "x"}})
+    CheckpointJournal("astra:b", path).append({"id2": {"hash": "y"}})
+    CheckpointJournal("astra:a", path).append({"id3": {"hash": "z"}})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"scope": "astra:a", "entr')
+
+    assert CheckpointJournal("astra:a", path).replay() == {"id1": {"hash": "x"}, "id3": {"hash": "z"}}
+    CheckpointJournal("astra:a", path).clear()
+    assert CheckpointJournal("astra:a", path).replay() == {}
+
+
+class FakeEmbeddings:
+    model = "text-embedding-3-small"
+    dimensions = 3
+
+    def __init__(self):
+        self.cache = {}
+
+    def missing(self, texts):
+        return [text for text in texts if text not in self.cache]
+
+    def put(self, texts, vectors):
+        self.cache.update(zip(texts, vectors))
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.ids = []
+
+    def add_documents(self, docs, ids):
+        self.ids.extend(ids)
+
+
+class FakeClient:
+    """Throttles the first call, then answers every batch."""
+
+    def __init__(self, throttles: int = 1):
+        self.throttles = throttles
+        self.calls = 0
+        self.embeddings = SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create))
+
+    async def create(self, model, dimensions, input):
+        self.calls += 1
+        if self.throttles:
+            self.throttles -= 1
+            response = httpx.Response(429, headers={"retry-after": "0"}, request=httpx.Request("POST", "https://api.test"))
+            raise openai.RateLimitError("throttled", response=response, body=None)
+        data = [SimpleNamespace(index=i, embedding=[float(i), 0.0, 1.0]) for i in range(len(input))]
+        parsed = SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=len(input)))
+        return SimpleNamespace(headers={}, parse=lambda: parsed)
+
+    async def close(self):
+        pass
+
+
+def test_engine_retries_throttled_batches_and_reports_progress(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest_engine, "backoff_delay", lambda attempt: 0)
+    client = FakeClient(throttles=1)
+    vectorstore = FakeVectorStore()
+    done = []
+    engine = IngestEngine(
+        FakeEmbeddings(), vectorstore, dead_letter_path=str(tmp_path / "dead.jsonl"),
+        on_batch_done=done.extend, client_factory=lambda **kwargs: client,
+    )
+    batches = [
+        ([Document(page_content="first"), Document(page_content="second")], ["a", "b"]),
+        ([Document(page_content="third")], ["c"]),
+    ]
+
+    uploaded = asyncio.run(engine.run(batches))
+
+    assert sorted(uploaded) == ["a", "b", "c"]
+    assert sorted(vectorstore.ids) == ["a", "b", "c"]
+    assert sorted(done) == ["a", "b", "c"]
+    assert client.calls == 3
+    assert engine.dead_letters == 0
@@ -0,0 +1,79 @@
+# test_lexical_index.py
+# Offline checks for the tokenizer, the BM25 index and reciprocal rank fusion.
+import os
+
+from langchain_core.documents import Document
+
+from logic.lexical_index import LEXICAL_DATA_PATH, LexicalIndex, doc_key, fold, reciprocal_rank_fusion, tokenize
+
+
+def doc(doc_id: str, text: str, language: str = "en", **metadata) -> Document:
+    return Document(page_content=text, metadata={"doc_id": doc_id, "language": language, "doc_type": "artifact", **metadata})
+
+
+DOCS = [
+    doc("venus", "Title: Venus Figurines. Small carved figurines of ivory and steatite.",
+        accession_number="BR-VF-COLL-001"),
+    doc("burial", "Title: Triple Burial. Three Gravettian skeletons buried with shell ornaments."),
+    doc("hours", "Opening hours: the museum opens at 8:30 and closes at 19:30.", doc_type="practical"),
+    doc("venus_it", "Titolo: Veneri. Piccole statuette in avorio e steatite.", language="it"),
+    doc("cafe", "Café and bookshop near the entrance."),
+]
+
+
+def test_fold_removes_case_and_accents():
+    assert fold("Café ÉTÉ") == "cafe ete"
+    assert fold("مُتْحَف") == "متحف"
+
+
+def test_tokenize_keeps_compound_identifiers_whole_and_split():
+    assert tokenize("See BR-VF-001, please.") == ["see", "br-vf-001", "br", "vf", "001", "please"]
+    assert tokenize("approx. 3.5 km") == ["approx", "3.5", "3", "5", "km"]
+
+
+def test_bm25_ranks_matching_documents_first():
+    index = LexicalIndex(DOCS)
+    hits = index.search("ivory figurines", "en", k=3)
+    assert hits[0][0].metadata["doc_id"] == "venus"
+    assert all(score > 0 for _, score in hits)
+    assert [d.metadata["doc_id"] for d, _ in index.search("shell skeletons", "en")][:1] == ["burial"]
+
+
+def test_search_stays_within_the_language_partition():
+    index = LexicalIndex(DOCS)
+    assert [d.metadata["doc_id"] for d, _ in index.search("steatite", "it")] == ["venus_it"]
+    assert index.search("steatite", "de") == []
+    assert len(index) == len(DOCS)
+
+
+def test_accent_insensitive_search():
+    index = LexicalIndex(DOCS)
+    assert index.search("cafe", "en")[0][0].metadata["doc_id"] == "cafe"
+
+
+def test_exact_match_on_title_and_accession_number():
+    index = LexicalIndex(DOCS)
+    assert [d.metadata["doc_id"] for d in index.exact_match("triple burial", "en")] == ["burial"]
+    assert [d.metadata["doc_id"] for d in index.exact_match("Tell me about BR-VF-COLL-001", "en")] == ["venus"]
+    # Ordinary words alone never trigger the exact path
+    assert index.exact_match("tell me about the burial", "en") == []
+
+
+def test_rrf_rewards_documents_ranked_by_both_lists():
+    a, b, c, d = (doc(name, name) for name in "abcd")
+    fused = reciprocal_rank_fusion([a, b, c], [c, d, a], k=3)
+    assert [x.metadata["doc_id"] for x in fused] == ["a", "c", "b"]
+
+
+def test_rrf_keeps_the_first_copy_of_a_document():
+    vector_copy = doc("a", "a", score=0.9)
+    lexical_copy = doc("a", "a")
+    fused = reciprocal_rank_fusion([vector_copy], [lexical_copy], k=5)
+    assert fused == [vector_copy]
+    assert fused[0].metadata["score"] == 0.9
+    assert doc_key(vector_copy) == doc_key(lexical_copy)
+
+
+def test_default_corpus_path_is_anchored_to_the_repo_root():
+    assert os.path.isabs(LEXICAL_DATA_PATH)
+    assert os.path.isfile(os.path.join(LEXICAL_DATA_PATH, "artifacts.json"))
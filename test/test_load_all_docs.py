@@ -0,0 +1,108 @@
+# test_load_all_docs.py
+# Offline checks for load_all_docs / iter_all_docs on the bundled data files.
+import logging
+import os
+import shutil
+
+import pytest
+
+from logic import utils
+from logic.utils import SOURCE_MAP, iter_all_docs, load_all_docs
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def contents(docs):
+    return sorted((doc.page_content, doc.metadata.get("doc_id") or "") for doc in docs)
+
+
+def test_every_source_loads():
+    loaded = dict(iter_all_docs(base_path=DATA_PATH, snapshot_path=None))
+    assert set(loaded) == set(SOURCE_MAP)
+    assert all(loaded.values())
+
+
+def test_concurrent_loading_returns_the_same_documents():
+    sequential = load_all_docs(base_path=DATA_PATH, snapshot_path=None)
+    concurrent = load_all_docs(base_path=DATA_PATH, snapshot_path=None, workers=4)
+    assert contents(concurrent) == contents(sequential)
+
+
+def test_missing_file_yields_an_empty_source(tmp_path):
+    shutil.copy(os.path.join(DATA_PATH, SOURCE_MAP["research"][0]), tmp_path)
+
+    loaded = dict(iter_all_docs(["research", "safety"], base_path=str(tmp_path), snapshot_path=None))
+
+    assert loaded["research"]
+    assert loaded["safety"] == []
+
+
+def test_memory_is_only_traced_on_request(monkeypatch, caplog):
+    calls = []
+    run_loader = utils._run_loader
+
+    def recording_run_loader(loader_fn, file_path, trace_memory):
+        calls.append(trace_memory)
+        return run_loader(loader_fn, file_path, trace_memory)
+
+    monkeypatch.setattr(utils, "_run_loader", recording_run_loader)
+
+    with caplog.at_level(logging.INFO):
+        load_all_docs(["research"], base_path=DATA_PATH, snapshot_path=None)
+        load_all_docs(["research"], base_path=DATA_PATH, snapshot_path=None, trace_memory=True)
+
+    assert calls == [False, True]
+    loaded_lines = [r.getMessage() for r in caplog.records if "Loaded" in r.getMessage()]
+    assert "peak" not in loaded_lines[0]
+    assert "MB peak" in loaded_lines[1]
+
+
+@pytest.mark.parametrize("source", sorted(SOURCE_MAP))
+def test_documents_carry_language_and_doc_type(source):
+    docs = load_all_docs([source], base_path=DATA_PATH, snapshot_path=None)
+    for doc in docs:
+        assert doc.page_content.strip()
+        assert doc.metadata.get("language")
+        assert doc.metadata.get("doc_type")
+
+
+def test_snapshot_serves_unchanged_files_and_reparses_changed_ones(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    for source in ("research", "safety"):
+        shutil.copy(os.path.join(DATA_PATH, SOURCE_MAP[source][0]), data)
+    snapshot = str(tmp_path / "snapshot.pkl")
+
+    first = load_all_docs(["research", "safety"], base_path=str(data), snapshot_path=snapshot)
+    assert os.path.exists(snapshot)
+
+    parsed = []
+    run_loader = utils._run_loader
+
+    def recording_run_loader(loader_fn, file_path, trace_memory):
+        parsed.append(os.path.basename(file_path))
+        return run_loader(loader_fn, file_path, trace_memory)
+
+    monkeypatch.setattr(utils, "_run_loader", recording_run_loader)
+
+    second = load_all_docs(["research", "safety"], base_path=str(data), snapshot_path=snapshot)
+    assert parsed == []
+    assert contents(second) == contents(first)
+
+    # Same content with a new mtime is still served from the snapshot; new content is parsed
+    research_file = data / SOURCE_MAP["research"][0]
+    os.utime(research_file, ns=(0, 0))
+    load_all_docs(["research"], base_path=str(data), snapshot_path=snapshot)
+    assert parsed == []
+
+    research_file.write_text(research_file.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    load_all_docs(["research"], base_path=str(data), snapshot_path=snapshot)
+    assert parsed == [SOURCE_MAP["research"][0]]
+
+
+def test_snapshot_from_other_loader_code_is_ignored(tmp_path, monkeypatch):
+    snapshot = str(tmp_path / "snapshot.pkl")
+    load_all_docs(["research"], base_path=DATA_PATH, snapshot_path=snapshot)
+
+    monkeypatch.setattr(utils, "_loader_fingerprint", lambda: "changed")
+    assert utils.CorpusSnapshot(snapshot).entries == {}
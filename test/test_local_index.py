@@ -0,0 +1,173 @@
+# test_local_index.py
+# Offline checks for the in-process vector index, with fake embeddings.
+import os
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from logic import local_index
+from logic.local_index import LocalVectorIndex
+
+TEXTS = [
+    ("Venus figurines carved in ivory", {"language": "en", "doc_type": "artifact", "doc_id": "venus"}),
+    ("Opening hours and tickets", {"language": "en", "doc_type": "practical", "doc_id": "hours"}),
+    ("Guided tours for schools", {"language": "en", "doc_type": "education", "doc_id": "tours"}),
+    ("Veneri scolpite in avorio", {"language": "it", "doc_type": "artifact", "doc_id": "venus"}),
+    ("Orari di apertura e biglietti", {"language": "it", "doc_type": "practical", "doc_id": "hours"}),
+]
+
+
+@pytest.fixture
+def index():
+    texts = [text for text, _ in TEXTS]
+    metadatas = [metadata for _, metadata in TEXTS]
+    ids = [f"{m['doc_id']}_{m['language']}" for m in metadatas]
+    return LocalVectorIndex.from_texts(texts, DeterministicFakeEmbedding(size=64), metadatas, ids=ids)
+
+
+def ids_of(hits):
+    return [doc.id for doc, _ in hits]
+
+
+def test_language_filter_searches_one_partition(index):
+    hits = index.similarity_search_with_score("Venus figurines carved in ivory", k=10, filter={"language": "it"})
+    assert sorted(ids_of(hits)) == ["hours_it", "venus_it"]
+
+    hits = index.similarity_search_with_score("Venus figurines carved in ivory", k=1, filter={"language": "en"})
+    assert ids_of(hits) == ["venus_en"]
+    assert hits[0][1] == pytest.approx(1.0)
+    assert index.similarity_search("anything", filter={"language": "de"}) == []
+
+
+def test_in_and_equality_filters(index):
+    query = "Opening hours and tickets"
+    hits = index.similarity_search_with_score(
+        query, k=10, filter={"language": "en", "doc_type": {"$in": ["practical", "education"]}})
+    assert sorted(ids_of(hits)) == ["hours_en", "tours_en"]
+
+    hits = index.similarity_search_with_score(query, k=10, filter={"doc_type": "practical"})
+    assert sorted(ids_of(hits)) == ["hours_en", "hours_it"]
+    hits = index.similarity_search_with_score(query, k=10, filter={"doc_type": {"$eq": "artifact"}})
+    assert sorted(ids_of(hits)) == ["venus_en", "venus_it"]
+
+
+def test_scores_are_on_astras_zero_to_one_scale(index):
+    hits = index.similarity_search_with_score("Guided tours for schools", k=10)
+    scores = [score for _, score in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0.0 <= score <= 1.0 for score in scores)
+
+
+def test_upsert_replaces_by_id(index):
+    index.add_texts(["Opening hours changed for the summer"],
+                    [{"language": "en", "doc_type": "practical", "doc_id": "hours"}], ids=["hours_en"])
+
+    assert len(index) == len(TEXTS)
+    assert index.get_by_ids(["hours_en"])[0].page_content == "Opening hours changed for the summer"
+    hits = index.similarity_search_with_score("Opening hours changed for the summer", k=1, filter={"language": "en"})
+    assert ids_of(hits) == ["hours_en"]
+    assert hits[0][1] == pytest.approx(1.0)
+
+
+def test_delete_by_id(index):
+    assert index.delete(["venus_en", "missing"]) is True
+    assert index.delete(["missing"]) is False
+
+    assert len(index) == len(TEXTS) - 1
+    assert index.get_by_ids(["venus_en"]) == []
+    hits = index.similarity_search_with_score("Venus figurines carved in ivory", k=10, filter={"language": "en"})
+    assert "venus_en" not in ids_of(hits)
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def test_ivf_recall_against_brute_force(monkeypatch):
+    vectors = clustered_vectors(3000, 32, clusters=30)
+    queries = clustered_vectors(50, 32, clusters=30, seed=1)
+    texts = [str(i) for i in range(len(vectors))]
+    metadatas = [{"language": "en"} for _ in texts]
+
+    def build():
+        index = LocalVectorIndex(DeterministicFakeEmbedding(size=32))
+        index.add_embeddings(texts, vectors, metadatas, ids=texts)
+        return index
+
+    brute = build()
+    brute._get_partitions()  # Partitions are built lazily
+    monkeypatch.setattr(local_index, "IVF_MIN_PARTITION_SIZE", 1000)
+    ivf = build()
+    assert ivf._get_partitions()["en"].lists is not None
+    assert brute._get_partitions()["en"].lists is None
+
+    found = expected = 0
+    for query in queries:
+        exact = set(ids_of(brute.similarity_search_with_score_by_vector(query, k=10)))
+        approx = set(ids_of(ivf.similarity_search_with_score_by_vector(query, k=10)))
+        found += len(exact & approx)
+        expected += len(exact)
+    assert found / expected >= 0.9
+
+
+def test_snapshot_round_trip_with_mmap(index, tmp_path):
+    path = str(tmp_path / "local_index")
+    index.save(path)
+    loaded = LocalVectorIndex.load(index.embedding, path)
+
+    assert isinstance(loaded._partitions["en"].vectors, np.memmap)
+    query = "Veneri scolpite in avorio"
+    expected = ids_of(index.similarity_search_with_score(query, k=3))
+    assert ids_of(loaded.similarity_search_with_score(query, k=3)) == expected
+    assert loaded.get_by_ids(["tours_en"])[0].metadata["doc_type"] == "education"
+
+    # A loaded snapshot can be modified and saved again
+    loaded.delete(["tours_en"])
+    loaded.add_texts(["Sale of books"], [{"language": "fr"}], ids=["books_fr"])
+    loaded.save(path)
+    reloaded = LocalVectorIndex.load(index.embedding, path)
+    assert len(reloaded) == len(TEXTS)
+    hits = reloaded.similarity_search_with_score("Sale of books", k=1, filter={"language": "fr"})
+    assert ids_of(hits) == ["books_fr"]
+
+
+def test_save_swaps_the_snapshot_atomically(index, tmp_path):
+    path = str(tmp_path / "local_index")
+    index.save(path)
+    first_dir = os.path.realpath(path)
+    reader = LocalVectorIndex.load(index.embedding, path)
+
+    index.delete(["hours_it"])
+    index.save(path)
+
+    # `path` now points at a fresh directory and the old one is gone
+    assert os.path.islink(path)
+    assert os.path.realpath(path) != first_dir
+    assert not os.path.exists(first_dir)
+    assert sorted(os.listdir(tmp_path)) == sorted(["local_index", os.path.basename(os.path.realpath(path))])
+    # A reader that mapped the old snapshot keeps working
+    assert len(reader.similarity_search("Orari di apertura e biglietti", k=5, filter={"language": "it"})) == 2
+    assert len(LocalVectorIndex.load(index.embedding, path)) == len(TEXTS) - 1
+
+
+def test_interrupted_save_keeps_the_previous_snapshot(index, tmp_path, monkeypatch):
+    path = str(tmp_path / "local_index")
+    index.save(path)
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(local_index.json, "dump", failing_dump)
+    index.delete(["hours_it"])
+    with pytest.raises(OSError):
+        index.save(path)
+    monkeypatch.undo()
+
+    assert len(LocalVectorIndex.load(index.embedding, path)) == len(TEXTS)
+
+
+def test_missing_snapshot_loads_empty(tmp_path):
+    assert len(LocalVectorIndex.load(DeterministicFakeEmbedding(size=8), str(tmp_path / "none"))) == 0
@@ -0,0 +1,89 @@
+# test_query_router.py
+# Offline checks for the doc_type router, trained on the bundled corpus. The
+# labelled questions below are the calibration set for ROUTER_MIN_CONFIDENCE
+# and ROUTER_KEYWORD_WEIGHT.
+import os
+
+import pytest
+
+from logic.query_router import COLLECTION, ROUTES, QueryRouter, keyword_routes
+from logic.utils import load_all_docs
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Collection questions (or ones that used to be misrouted by prefix keywords): never narrowed
+UNROUTED = [
+    ("Tell me about the projectile points", "en"),
+    ("How did the figurines feel to the touch?", "en"),
+    ("Is there a costume for the Venus?", "en"),
+    ("What training did hunters have?", "en"),
+    ("What business did they trade?", "en"),
+    ("Which caves are open to see?", "en"),
+    ("What do archaeologists say about the burials?", "en"),
+    ("Puoi mostrarmi i reperti?", "it"),
+    ("Tell me about the Venus figurines", "en"),
+    ("What is the triple burial?", "en"),
+]
+
+ROUTED = [
+    ("How much is a ticket?", "en", "practical"),
+    ("Is the museum wheelchair accessible?", "en", "practical"),
+    ("Where can I park?", "en", "practical"),
+    ("What are the opening hours?", "en", "practical"),
+    ("Quanto costa il biglietto?", "it", "practical"),
+    ("Wie viel kostet der Eintritt?", "de", "practical"),
+    ("ما هو سعر التذكرة؟", "ar", "practical"),
+    ("Any upcoming exhibitions?", "en", "events"),
+    ("Are there workshops for schools?", "en", "education"),
+    ("Y a-t-il des ateliers pour les écoles ?", "fr", "education"),
+    ("Is it worth visiting?", "en", "reviews"),
+    ("What do visitors think of the museum?", "en", "reviews"),
+]
+
+
+@pytest.fixture(scope="module")
+def router():
+    return QueryRouter(load_all_docs(base_path=DATA_PATH, snapshot_path=None))
+
+
+@pytest.mark.parametrize("question", [
+    "projectile points", "feel", "costume", "training", "business", "open to see", "say about",
+    "Puoi mostrarmi i reperti?", "la costa ligure",
+])
+def test_keywords_match_whole_words_only(question):
+    assert keyword_routes(question) == []
+
+
+@pytest.mark.parametrize("question, route", [
+    ("Tickets, please", "practical"),
+    ("Are there buses?", "practical"),
+    ("Quanto costa?", "practical"),
+    ("Öffnungszeiten", "practical"),
+    ("وبالتذاكر", "practical"),
+    ("Ci sono mostre?", "events"),
+    ("Les écoles", "education"),
+])
+def test_keywords_match_inflections_and_clitics(question, route):
+    assert keyword_routes(question) == [route]
+
+
+@pytest.mark.parametrize("question, language", UNROUTED)
+def test_collection_and_ambiguous_questions_are_not_narrowed(router, question, language):
+    assert router.route(question, language) is None
+
+
+@pytest.mark.parametrize("question, language, route", ROUTED)
+def test_practical_questions_are_routed(router, question, language, route):
+    assert router.route(question, language) == tuple(sorted(ROUTES[route]))
+
+
+def test_keyword_hit_is_only_evidence(router):
+    question = "Tell me about the ivory figurines from the Grimaldi caves research"
+    assert keyword_routes(question) == ["education"]
+    probabilities = router.probabilities(question, "en")
+    assert max(probabilities, key=probabilities.get) == COLLECTION
+    assert router.route(question, "en") is None
+
+
+def test_unknown_language_is_not_routed(router):
+    assert router.route("How much is a ticket?", "xx") is None
@@ -0,0 +1,106 @@
+# test_retrieve_llm.py
+# Offline checks for retrieval planning, with a fake vector store and router.
+import asyncio
+import threading
+
+import pytest
+from langchain_core.documents import Document
+
+from logic import retrieve_llm
+
+PRACTICAL = ("location", "visitor_services")
+
+
+def hit(doc_id: str, doc_type: str, score: float):
+    return Document(page_content=doc_id, metadata={"doc_id": doc_id, "doc_type": doc_type, "language": "en"}), score
+
+
+class FakeVectorStore:
+    def __init__(self, routed_hits, all_hits):
+        self.routed_hits = routed_hits
+        self.all_hits = all_hits
+        self.filters = []
+
+    def similarity_search_with_relevance_scores(self, question, k, filter):
+        self.filters.append(filter)
+        return list(self.routed_hits if "doc_type" in filter else self.all_hits)[:k]
+
+    async def asimilarity_search_with_relevance_scores(self, question, k, filter):
+        return self.similarity_search_with_relevance_scores(question, k, filter)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(retrieve_llm, "HYBRID_SEARCH", False)
+    monkeypatch.setattr(retrieve_llm, "route_query", lambda question, language: PRACTICAL)
+
+    def install(routed_hits, all_hits):
+        fake = FakeVectorStore(routed_hits, all_hits)
+        monkeypatch.setattr(retrieve_llm, "get_vectorstore", lambda: fake)
+        return fake
+
+    return install
+
+
+def retrieve_both_ways(inputs):
+    return retrieve_llm.retrieve_context(inputs), asyncio.run(retrieve_llm.aretrieve_context(inputs))
+
+
+def ids(docs):
+    return [doc.metadata["doc_id"] for doc in docs]
+
+
+def test_confident_routed_search_is_used_as_is(store):
+    fake = store([hit("parking", "location", 0.9)], [hit("venus", "artifact", 0.95)])
+
+    for docs in retrieve_both_ways({"question": "Where can I park?", "language": "en"}):
+        assert ids(docs) == ["parking"]
+        assert docs[0].metadata["score"] == 0.9
+    assert all(f["doc_type"] == {"$in": list(PRACTICAL)} for f in fake.filters)
+
+
+def test_weak_routed_hits_are_merged_with_an_unfiltered_search(store):
+    fake = store(
+        [hit("parking", "location", 0.4)],
+        [hit("points", "artifact", 0.85), hit("parking", "location", 0.4)],
+    )
+
+    for docs in retrieve_both_ways({"question": "Tell me about the projectile points", "language": "en"}):
+        assert ids(docs) == ["points", "parking"]
+    assert {"language": "en"} in fake.filters
+
+
+def test_empty_routed_search_falls_back_to_all_doc_types(store):
+    store([], [hit("venus", "artifact", 0.8)])
+
+    for docs in retrieve_both_ways({"question": "Any costume?", "language": "en"}):
+        assert ids(docs) == ["venus"]
+
+
+def test_unrouted_questions_search_once(store, monkeypatch):
+    monkeypatch.setattr(retrieve_llm, "route_query", lambda question, language: None)
+    fake = store([], [hit("venus", "artifact", 0.3)])
+
+    docs = retrieve_llm.retrieve_context({"question": "Venus?", "language": "en"})
+
+    assert ids(docs) == ["venus"]
+    assert fake.filters == [{"language": "en"}]
+
+
+def test_async_planning_runs_off_the_event_loop(store, monkeypatch):
+    store([hit("parking", "location", 0.9)], [])
+    plan_search = retrieve_llm._plan_search
+    threads = []
+
+    def recording_plan_search(inputs):
+        threads.append(threading.current_thread())
+        return plan_search(inputs)
+
+    monkeypatch.setattr(retrieve_llm, "_plan_search", recording_plan_search)
+
+    async def run():
+        await retrieve_llm.aretrieve_context({"question": "Where can I park?", "language": "en"})
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert threads and threads[0] is not loop_thread
@@ -0,0 +1,78 @@
+# test_session_store.py
+# Offline checks for the session store and its sqlite write-behind backend.
+import time
+
+from src import session_store
+from src.session_store import Session, SessionStore, SqliteSessionBackend
+
+
+def test_get_or_create_returns_the_same_session():
+    store = SessionStore()
+    session = store.get_or_create(None)
+    assert store.get_or_create(session.session_id) is session
+    assert store.get("unknown") is None
+    assert store.stats()["created"] == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_entries=2)
+    first, second = store.create(), store.create()
+    assert store.get(first.session_id) is first
+    store.create()
+
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id) is first
+    assert store.stats()["evicted"] == 1
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(ttl_s=60)
+    session = store.create()
+    session.last_seen = time.time() - 61
+    assert store.get(session.session_id) is None
+
+
+def test_history_keeps_the_latest_turns():
+    session = Session("s", max_turns=2)
+    for i in range(3):
+        session.add_turn(f"q{i}", f"a{i}")
+    assert [turn.user for turn in session.turns] == ["q1", "q2"]
+
+    restored = Session.from_record(session.to_record(), max_turns=2)
+    assert [(turn.user, turn.bot) for turn in restored.turns] == [("q1", "a1"), ("q2", "a2")]
+
+
+def test_sqlite_sessions_survive_a_restart(tmp_path):
+    path = str(tmp_path / "sessions.sqlite")
+    store = SessionStore(backend=SqliteSessionBackend(path, flush_interval_s=60))
+    session = store.create("it")
+    session.add_turn("Quanto costa?", "Dieci euro.")
+    store.save(session)
+    # Unflushed writes are already visible to loads
+    assert store.backend.load(session.session_id)["turns"][0]["user"] == "Quanto costa?"
+    store.close()
+
+    restarted = SessionStore(backend=SqliteSessionBackend(path, flush_interval_s=60))
+    try:
+        loaded = restarted.get(session.session_id)
+        assert loaded.language == "it"
+        assert [(turn.user, turn.bot) for turn in loaded.turns] == [("Quanto costa?", "Dieci euro.")]
+        assert restarted.get(session.session_id) is loaded
+        assert restarted.stats()["loaded"] == 1
+    finally:
+        restarted.close()
+
+
+def test_expired_rows_are_not_loaded(tmp_path):
+    path = str(tmp_path / "sessions.sqlite")
+    backend = SqliteSessionBackend(path, ttl_s=60, flush_interval_s=60)
+    try:
+        backend.save(Session("old", last_seen=time.time() - 120).to_record())
+        backend.flush()
+        assert backend.load("old") is None
+    finally:
+        backend.close()
+
+
+def test_default_database_is_anchored_to_the_repo_root():
+    assert (session_store.OUTPUT_DIR.parent / "src" / "session_store.py").is_file()
@@ -0,0 +1,128 @@
+# test_shared_state.py
+# Offline checks for the sqlite shared state and the caches and sessions built on it.
+import asyncio
+import threading
+import time
+
+import pytest
+
+from logic import answer_cache, shared_state
+from logic.answer_cache import AnswerCache
+from logic.shared_state import MemoryState, SqliteState
+from src.session_store import SessionStore, SharedSessionBackend
+
+
+class RecordingState(SqliteState):
+    """Records the thread each read and write runs on."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, namespace, key):
+        self.threads.append(threading.current_thread())
+        return super().get(namespace, key)
+
+    def set(self, namespace, key, value, ttl_s=None):
+        self.threads.append(threading.current_thread())
+        super().set(namespace, key, value, ttl_s)
+
+
+@pytest.fixture
+def state(tmp_path):
+    state = RecordingState(str(tmp_path / "shared_state.sqlite"))
+    yield state
+    state.close()
+
+
+@pytest.fixture(autouse=True)
+def corpus_version_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_cache, "CORPUS_VERSION_FILE", str(tmp_path / "corpus_version"))
+
+
+def test_values_are_namespaced_and_deletable(state):
+    state.set("answer", "k", "one")
+    state.set("session", "k", "two")
+    assert state.get("answer", "k") == "one"
+    state.delete("answer", "k")
+    assert state.get("answer", "k") is None
+    assert state.get("session", "k") == "two"
+
+
+@pytest.mark.parametrize("make_state", [MemoryState, None])
+def test_add_only_sets_absent_or_expired_keys(make_state, state):
+    state = make_state() if make_state else state
+    assert state.add("upload_chunk", "u:1", "1", ttl_s=0.05)
+    assert not state.add("upload_chunk", "u:1", "1", ttl_s=0.05)
+    assert state.get("upload_chunk", "u:1") == "1"
+    time.sleep(0.06)
+    assert state.add("upload_chunk", "u:1", "2")
+    assert state.get("upload_chunk", "u:1") == "2"
+
+
+def test_values_expire_after_their_ttl(state):
+    state.set("answer", "k", "v", ttl_s=0.01)
+    state.set("answer", "forever", "v")
+    time.sleep(0.02)
+    assert state.get("answer", "k") is None
+    assert state.get("answer", "forever") == "v"
+
+
+def test_two_connections_see_the_same_file(state):
+    other = SqliteState(state.path)
+    try:
+        other.set("answer", "k", "from another worker")
+        assert state.get("answer", "k") == "from another worker"
+    finally:
+        other.close()
+
+
+def test_workers_share_sessions(state):
+    first = SessionStore(backend=SharedSessionBackend(state))
+    second = SessionStore(backend=SharedSessionBackend(state))
+
+    session = first.create("fr")
+    session.add_turn("Bonjour", "Bonjour !")
+    first.save(session)
+
+    loaded = second.get(session.session_id)
+    assert loaded.language == "fr"
+    assert [(turn.user, turn.bot) for turn in loaded.turns] == [("Bonjour", "Bonjour !")]
+    assert second.stats()["sessions"] == 0
+
+
+def test_workers_share_exact_answers(state):
+    first = AnswerCache(shared_state=state)
+    second = AnswerCache(shared_state=state)
+
+    first.store("en", ("adult",), "Where can I park?", "In the lot by the station.")
+    answer = second.lookup("en", ("adult",), "where can i park")
+
+    assert answer == "In the lot by the station."
+    assert second.stats()["shared_hits"] == 1
+
+
+def test_async_paths_run_shared_io_off_the_event_loop(state):
+    sessions = SessionStore(backend=SharedSessionBackend(state))
+    cache = AnswerCache(shared_state=state)
+
+    async def run():
+        session = await sessions.aget_or_create(None)
+        session.add_turn("Hi", "Hello!")
+        await sessions.asave(session)
+        loaded = await sessions.aget(session.session_id)
+        await cache.astore("en", ("adult",), "Hi", "Hello!")
+        answer = await AnswerCache(shared_state=state).alookup("en", ("adult",), "hi")
+        return threading.current_thread(), loaded, answer
+
+    loop_thread, loaded, answer = asyncio.run(run())
+
+    assert [turn.bot for turn in loaded.turns] == ["Hello!"]
+    assert answer == "Hello!"
+    assert state.threads and loop_thread not in state.threads
+
+
+def test_memory_backend_has_no_shared_state(monkeypatch):
+    monkeypatch.setattr(shared_state, "STATE_BACKEND", "memory")
+    assert shared_state.get_shared_state() is None
+    assert (shared_state.OUTPUT_DIR.parent / "logic" / "shared_state.py").is_file()
@@ -0,0 +1,97 @@
+# test_token_planner.py
+# Offline checks for the embedding batch planner. tiktoken needs to download its
+# BPE files, so a one-token-per-character encoding stands in for it.
+import pytest
+from langchain_core.documents import Document
+
+from logic import token_planner
+from logic.token_planner import chunk_id, pack_batches, plan_batches, split_documents
+
+
+class CharEncoding:
+    def encode_ordinary_batch(self, texts):
+        return [[ord(ch) for ch in text] for text in texts]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+    def decode_single_token_bytes(self, token):
+        return chr(token).encode("utf-8")
+
+
+class ByteEncoding:
+    """One token per UTF-8 byte, so tokens can split a character like BPE tokens do."""
+
+    def encode_ordinary_batch(self, texts):
+        return [list(text.encode("utf-8")) for text in texts]
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+    def decode_single_token_bytes(self, token):
+        return bytes([token])
+
+
+@pytest.fixture(autouse=True)
+def char_encoding(monkeypatch):
+    monkeypatch.setattr(token_planner.tiktoken, "encoding_for_model", lambda model: CharEncoding())
+
+
+def doc(text: str, **metadata) -> Document:
+    return Document(page_content=text, metadata=metadata)
+
+
+def test_chunk_id_keeps_the_first_part_unchanged():
+    assert chunk_id("doc-1", 0) == "doc-1"
+    assert chunk_id("doc-1", 2) == "doc-1:2"
+
+
+def test_long_documents_are_split_not_truncated():
+    docs = [doc("abcdefghij", doc_id="long"), doc("xyz", doc_id="short")]
+    token_lists = CharEncoding().encode_ordinary_batch([d.page_content for d in docs])
+
+    parts, ids, tokens, counts = split_documents(docs, ["long", "short"], token_lists, "model", max_tokens=4)
+
+    assert [p.page_content for p in parts] == ["abcd", "efgh", "ij", "xyz"]
+    assert ids == ["long", "long:1", "long:2", "short"]
+    assert tokens == [4, 4, 2, 3]
+    assert counts == {"long": 3, "short": 1}
+    assert [p.metadata.get("chunk") for p in parts] == [0, 1, 2, None]
+    assert parts[1].metadata["doc_id"] == "long"
+
+
+def test_batches_respect_token_and_input_limits():
+    docs = [doc(str(i)) for i in range(6)]
+    ids = [f"id{i}" for i in range(6)]
+
+    by_tokens = pack_batches(docs, ids, [4, 4, 4, 1, 1, 9], max_tokens=8, max_inputs=10)
+    assert [batch_ids for _, batch_ids in by_tokens] == [["id0", "id1"], ["id2", "id3", "id4"], ["id5"]]
+
+    by_inputs = pack_batches(docs, ids, [1] * 6, max_tokens=100, max_inputs=4)
+    assert [batch_ids for _, batch_ids in by_inputs] == [["id0", "id1", "id2", "id3"], ["id4", "id5"]]
+
+
+def test_plan_batches_keeps_document_order():
+    docs = [doc("a" * 5), doc("b" * 20), doc("c" * 5)]
+
+    batches, counts = plan_batches(docs, ["a", "b", "c"], "model", max_request_tokens=10)
+
+    flat_ids = [doc_id for _, batch_ids in batches for doc_id in batch_ids]
+    assert flat_ids == ["a", "b", "c"]
+    assert counts == {"a": 1, "b": 1, "c": 1}
+
+
+@pytest.mark.parametrize("text", [
+    "المتحف مفتوح كل يوم من التاسعة صباحا حتى السابعة مساء، والتذاكر متاحة عند المدخل.",
+    "Grotte 🦴🗿 dei Balzi Rossi 🏛️ – aperte 🙂",
+])
+def test_splits_never_cut_a_multibyte_character(monkeypatch, text):
+    monkeypatch.setattr(token_planner.tiktoken, "encoding_for_model", lambda model: ByteEncoding())
+    token_lists = ByteEncoding().encode_ordinary_batch([text])
+
+    parts, _, tokens, counts = split_documents([doc(text)], ["long"], token_lists, "model", max_tokens=7)
+
+    assert counts["long"] > 1
+    assert all("\ufffd" not in part.page_content for part in parts)
+    assert "".join(part.page_content for part in parts) == text
+    assert max(tokens) <= 7 and sum(tokens) == len(text.encode("utf-8"))
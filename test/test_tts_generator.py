@@ -0,0 +1,109 @@
+# test_tts_generator.py
+# Offline checks for the content-addressed TTS cache, with a fake edge-tts.
+import asyncio
+import os
+import time
+
+import pytest
+
+from src import tts_generator
+from src.tts_generator import enforce_cache_quota, generate_tts_audio, tts_cache_key
+
+
+class FakeCommunicate:
+    calls = []
+    fail = False
+
+    def __init__(self, text, voice, **options):
+        self.text = text
+        self.voice = voice
+        FakeCommunicate.calls.append((text, voice))
+
+    async def save(self, path):
+        with open(path, "wb") as f:
+            f.write(b"ID3")
+        await asyncio.sleep(0.01)
+        if FakeCommunicate.fail:
+            raise ConnectionError("edge-tts unavailable")
+        with open(path, "ab") as f:
+            f.write(self.text.encode("utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def fake_tts(tmp_path, monkeypatch):
+    FakeCommunicate.calls = []
+    FakeCommunicate.fail = False
+    monkeypatch.setattr(tts_generator.edge_tts, "Communicate", FakeCommunicate)
+    monkeypatch.setattr(tts_generator, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(tts_generator, "tts_options", lambda: {})
+    monkeypatch.setattr(tts_generator, "_tts_slots", asyncio.Semaphore(2))
+    return tmp_path
+
+
+def test_cache_key_depends_on_text_voice_and_parameters():
+    key = tts_cache_key("Hello", "en-US-JennyNeural")
+    assert key == tts_cache_key("Hello", "en-US-JennyNeural")
+    assert key != tts_cache_key("Hello", "it-IT-ElsaNeural")
+    assert key != tts_cache_key("Hello!", "en-US-JennyNeural")
+    assert key != tts_cache_key("Hello", "en-US-JennyNeural", rate="+10%")
+
+
+def test_repeated_text_reuses_the_cached_file(fake_tts):
+    first = asyncio.run(generate_tts_audio("Welcome to the caves.", "en"))
+    second = asyncio.run(generate_tts_audio("Welcome to the caves.", "en"))
+
+    key = tts_cache_key("Welcome to the caves.", "en-US-JennyNeural")
+    assert first == second == os.path.join(str(fake_tts), f"{key}.mp3")
+    assert len(FakeCommunicate.calls) == 1
+    asyncio.run(generate_tts_audio("Welcome to the caves.", "it"))
+    assert FakeCommunicate.calls[-1] == ("Welcome to the caves.", "it-IT-ElsaNeural")
+
+
+def test_concurrent_identical_requests_share_one_synthesis():
+    async def run():
+        return await asyncio.gather(*(generate_tts_audio("Same answer.", "en") for _ in range(5)))
+
+    paths = asyncio.run(run())
+    assert len(set(paths)) == 1
+    assert FakeCommunicate.calls == [("Same answer.", "en-US-JennyNeural")]
+    assert tts_generator._inflight == {}
+
+
+def test_failed_synthesis_leaves_no_files(fake_tts):
+    FakeCommunicate.fail = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(generate_tts_audio("Broken.", "en"))
+
+    assert os.listdir(fake_tts) == []
+    assert tts_generator._inflight == {}
+
+
+def write_cached(directory, name, size, age_s):
+    path = os.path.join(str(directory), name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    mtime = time.time() - age_s
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_quota_evicts_old_files_then_least_recently_used(fake_tts):
+    write_cached(fake_tts, "expired.mp3", 10, age_s=1000)
+    write_cached(fake_tts, "oldest.mp3", 100, age_s=300)
+    write_cached(fake_tts, "older.mp3", 100, age_s=200)
+    write_cached(fake_tts, "recent.mp3", 100, age_s=100)
+
+    result = enforce_cache_quota(max_bytes=250, max_age_s=500)
+
+    assert sorted(os.listdir(fake_tts)) == ["older.mp3", "recent.mp3"]
+    assert result["removed"] == 2
+    assert result["bytes"] == 200
+
+
+def test_quota_removes_only_stale_part_files(fake_tts):
+    write_cached(fake_tts, "a.mp3.1.part", 10, age_s=tts_generator.STALE_PART_FILE_AGE_S + 10)
+    write_cached(fake_tts, "b.mp3.2.part", 10, age_s=1)
+
+    enforce_cache_quota(max_bytes=1000, max_age_s=10_000)
+
+    assert os.listdir(fake_tts) == ["b.mp3.2.part"]
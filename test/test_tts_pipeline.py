@@ -0,0 +1,116 @@
+# test_tts_pipeline.py
+# Offline checks for sentence splitting and ordered per-sentence synthesis.
+import asyncio
+
+from logic.shared_state import SqliteState
+from src import tts_pipeline
+from src.tts_pipeline import PipelineRegistry, SentenceSplitter, SentenceTTSPipeline
+
+
+def split_stream(chunks, language="en"):
+    splitter = SentenceSplitter(language)
+    sentences = []
+    for chunk in chunks:
+        sentences.extend(splitter.feed(chunk))
+    tail = splitter.flush()
+    return sentences + ([tail] if tail else [])
+
+
+def test_sentences_split_across_chunks():
+    chunks = ["The caves are open to", "day. Guided tours start at ", "ten! Do you want ", "tickets?"]
+    assert split_stream(chunks) == [
+        "The caves are open today.",
+        "Guided tours start at ten!",
+        "Do you want tickets?",
+    ]
+
+
+def test_abbreviations_and_initials_do_not_end_a_sentence():
+    text = "Ask Dr. Rossi about the finds. They were described by J. Smith in 1900."
+    assert split_stream([text]) == [
+        "Ask Dr. Rossi about the finds.",
+        "They were described by J. Smith in 1900.",
+    ]
+
+
+def test_language_specific_abbreviations():
+    text = "Vedi ad es. la grotta principale. È aperta tutti i giorni."
+    assert split_stream([text], "it") == [
+        "Vedi ad es. la grotta principale.",
+        "È aperta tutti i giorni.",
+    ]
+
+
+def test_arabic_question_mark_ends_a_sentence():
+    text = "هل المتحف مفتوح اليوم؟ نعم، من التاسعة صباحا."
+    assert split_stream([text], "ar") == ["هل المتحف مفتوح اليوم؟", "نعم، من التاسعة صباحا."]
+
+
+def test_short_sentences_are_merged_with_the_next():
+    assert split_stream(["Yes. The museum opens at nine."]) == ["Yes. The museum opens at nine."]
+
+
+def test_sentence_waits_for_following_whitespace():
+    splitter = SentenceSplitter("en")
+    # "3." could still become "3.5", so nothing is emitted yet
+    assert splitter.feed("The site is about 3.") == []
+    assert splitter.feed("5 km away. ") == ["The site is about 3.5 km away."]
+
+
+def test_pipeline_yields_segments_in_order(monkeypatch):
+    async def fake_tts(sentence, language):
+        # Later sentences finish first
+        await asyncio.sleep(0.03 if sentence.startswith("First") else 0)
+        return f"{language}:{sentence}"
+
+    monkeypatch.setattr(tts_pipeline, "generate_tts_audio", fake_tts)
+
+    async def run():
+        pipeline = SentenceTTSPipeline("en", max_concurrency=2)
+        pipeline.feed("First sentence here. Second sentence here. Third one")
+        pipeline.close()
+        return [path async for path in pipeline.iter_segments()]
+
+    assert asyncio.run(run()) == [
+        "en:First sentence here.",
+        "en:Second sentence here.",
+        "en:Third one",
+    ]
+
+
+def test_stream_is_served_by_another_worker(tmp_path, monkeypatch):
+    async def fake_tts(sentence, language):
+        path = tmp_path / f"{sentence[:5]}.mp3"
+        path.write_bytes(sentence.encode())
+        return str(path)
+
+    monkeypatch.setattr(tts_pipeline, "generate_tts_audio", fake_tts)
+    # Two workers: separate registries over one shared state file
+    state = SqliteState(str(tmp_path / "shared_state.sqlite"))
+    owner, other = PipelineRegistry(state), PipelineRegistry(state)
+
+    async def run():
+        pipeline = SentenceTTSPipeline("en")
+        stream_id = await owner.register(pipeline)
+        stream = await other.get(stream_id)
+        assert stream is not None and stream is not pipeline
+        stream.poll_interval_s = 0.01
+
+        async def answer():
+            pipeline.feed("First sentence here. ")
+            await asyncio.sleep(0.05)
+            pipeline.feed("Second sentence here.")
+            pipeline.close()
+
+        chunks, _ = await asyncio.gather(collect(stream.stream_audio()), answer())
+        return b"".join(chunks), await other.get("missing")
+
+    async def collect(iterator):
+        return [chunk async for chunk in iterator]
+
+    try:
+        audio, missing = asyncio.run(run())
+    finally:
+        state.close()
+    assert audio == b"First sentence here.Second sentence here."
+    assert missing is None
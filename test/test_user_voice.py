@@ -0,0 +1,150 @@
+# test_user_voice.py
+# Offline checks for the VAD capture path. The microphone is a fake pyaudio
+# stream fed with synthetic 16 kHz int16 PCM; webrtcvad runs for real.
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from src import user_voice
+from src.user_voice import CHUNK_SIZE, RATE, RING_FRAMES, AudioRecorder, VADSegmenter
+
+FRAME_BYTES = CHUNK_SIZE * 2
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(RATE * seconds), dtype=np.int16)
+
+
+def voice(seconds: float) -> np.ndarray:
+    # A harmonic-rich 150 Hz buzz, which webrtcvad classifies as speech
+    t = np.arange(int(RATE * seconds)) / RATE
+    return sum(3000 / k * np.sin(2 * np.pi * 150 * k * t) for k in range(1, 20)).astype(np.int16)
+
+
+def frames_of(pcm: np.ndarray) -> list:
+    data = pcm.tobytes()
+    return [data[i:i + FRAME_BYTES] for i in range(0, len(data) - FRAME_BYTES + 1, FRAME_BYTES)]
+
+
+class FakeStream:
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read(self, size, exception_on_overflow=True):
+        if not self.frames:
+            raise IOError("end of fake stream")
+        return self.frames.pop(0)
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def microphone(monkeypatch):
+    """Installs a fake pyaudio whose streams play the PCM set on the returned object."""
+    mic = types.SimpleNamespace(pcm=silence(0))
+
+    class FakePyAudio:
+        def open(self, **kwargs):
+            return FakeStream(frames_of(mic.pcm))
+
+        def get_format_from_width(self, width):
+            return width
+
+        def terminate(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "pyaudio", types.SimpleNamespace(PyAudio=FakePyAudio))
+    return mic
+
+
+def test_ring_keeps_the_latest_frames_oldest_first(microphone):
+    recorder = AudioRecorder()
+    total = RING_FRAMES + 5
+    for i in range(total):
+        recorder._ring_push(np.full(CHUNK_SIZE, i, dtype=np.int16), is_speech=i % 2 == 0)
+
+    assert recorder.ring_len == RING_FRAMES
+    kept = range(total - RING_FRAMES, total)
+    assert recorder.num_voiced == sum(1 for i in kept if i % 2 == 0)
+
+    recorder._flush_ring()
+    frames = recorder.pcm_buffer[:recorder.num_samples].reshape(-1, CHUNK_SIZE)
+    assert list(frames[:, 0]) == list(kept)
+    assert recorder.ring_len == recorder.num_voiced == 0
+
+
+def test_utterance_starts_with_padding_and_is_converted_in_place(microphone):
+    microphone.pcm = np.concatenate([silence(1), voice(1), silence(0.5)])
+    recorder = AudioRecorder()
+
+    audio = recorder.record_utterance()
+
+    assert audio.dtype == np.float32
+    assert np.shares_memory(audio, recorder.float_buffer)
+    pcm = recorder.pcm_buffer[:recorder.num_samples]
+    np.testing.assert_array_equal(audio, pcm.astype(np.float32) / 32768.0)
+    # The pre-trigger ring adds silent padding before the first voiced frame
+    assert not audio[:CHUNK_SIZE].any()
+    assert len(audio) > RATE
+
+
+def test_buffers_are_reused_between_utterances(microphone):
+    microphone.pcm = np.concatenate([silence(0.5), voice(0.5)])
+    recorder = AudioRecorder()
+    float_buffer = recorder.float_buffer
+
+    first = recorder.record_utterance()
+    second = recorder.record_utterance()
+
+    # Both results are views into the same buffer, allocated once
+    assert recorder.float_buffer is float_buffer
+    assert np.shares_memory(first, second)
+
+
+def test_silence_records_nothing(microphone):
+    microphone.pcm = silence(1)
+    assert AudioRecorder().record_utterance() is None
+
+
+def segment(pcm: np.ndarray, chunk_bytes: int = 4096):
+    segmenter = VADSegmenter()
+    data = pcm.tobytes()
+    for i in range(0, len(data), chunk_bytes):
+        segmenter.feed(data[i:i + chunk_bytes])
+    return segmenter, segmenter.finish()
+
+
+def test_segmenter_trims_silence_but_keeps_padding():
+    pcm = np.concatenate([silence(2), voice(1), silence(2)])
+    segmenter, audio = segment(pcm)
+
+    assert segmenter.total_frames == len(pcm) // CHUNK_SIZE
+    padding = RING_FRAMES * CHUNK_SIZE
+    assert RATE < len(audio) <= RATE + 2 * padding
+    assert not audio[:CHUNK_SIZE].any()
+
+
+def test_segmenter_keeps_every_speech_segment_and_drops_the_gap():
+    pcm = np.concatenate([voice(1), silence(3), voice(1)])
+    _, audio = segment(pcm)
+
+    # Most of the 3 s gap is gone; each segment keeps its padding
+    assert 2 * RATE < len(audio) < len(pcm) - 1.5 * RATE
+
+
+def test_segmenter_result_does_not_depend_on_chunk_size():
+    pcm = np.concatenate([silence(0.5), voice(1), silence(1)])
+    _, whole = segment(pcm, chunk_bytes=len(pcm) * 2)
+    _, pieces = segment(pcm, chunk_bytes=777)
+    np.testing.assert_array_equal(whole, pieces)
+
+
+def test_segmenter_returns_none_without_speech():
+    assert segment(silence(1))[1] is None
+    assert user_voice.VADSegmenter().finish() is None
@@ -0,0 +1,120 @@
+# test_whisper_batching.py
+# Offline checks for micro-batched transcription. faster-whisper is replaced
+# by a stub package whose "model" transcribes audio as its sample count.
+import dataclasses
+import sys
+import types
+from concurrent.futures import wait
+
+import numpy as np
+import pytest
+
+from src.user_voice import BATCH_OPTIONS, BatchingTranscriber, Transcriber, TranscriberPool
+
+
+class FeatureExtractor:
+    chunk_length = 1
+    sampling_rate = 100
+
+    def __call__(self, audio):
+        # One extra frame, which the batcher drops like Whisper's last frame
+        return np.full((1, 3), audio.size)
+
+
+class StubWhisperModel:
+    def __init__(self, model_size, **kwargs):
+        self.feature_extractor = FeatureExtractor()
+        self.model = types.SimpleNamespace(is_multilingual=True)
+        self.hf_tokenizer = None
+
+    def transcribe(self, audio, beam_size, language):
+        return [types.SimpleNamespace(text=f" long {audio.size} {language}")], None
+
+
+class StubBatchedInferencePipeline:
+    batches = []
+
+    def __init__(self, model):
+        self.model = model
+
+    def forward(self, features, tokenizer, chunks_metadata, options):
+        StubBatchedInferencePipeline.batches.append((tokenizer.language, len(features)))
+        return [[{"text": f" {int(f[0, 0])} {tokenizer.language}"}] for f in features]
+
+
+class StubTokenizer:
+    def __init__(self, hf_tokenizer, multilingual, task, language):
+        self.language = language
+
+
+def install_faster_whisper(monkeypatch, option_fields):
+    package = types.ModuleType("faster_whisper")
+    package.__version__ = "stub"
+    package.WhisperModel = StubWhisperModel
+    package.BatchedInferencePipeline = StubBatchedInferencePipeline
+    audio = types.ModuleType("faster_whisper.audio")
+    audio.pad_or_trim = lambda features: features
+    tokenizer = types.ModuleType("faster_whisper.tokenizer")
+    tokenizer.Tokenizer = StubTokenizer
+    transcribe = types.ModuleType("faster_whisper.transcribe")
+    transcribe.TranscriptionOptions = dataclasses.make_dataclass("TranscriptionOptions", option_fields)
+    transcribe.get_suppressed_tokens = lambda tokenizer, tokens: []
+    for module in (audio, tokenizer, transcribe):
+        setattr(package, module.__name__.rsplit(".", 1)[1], module)
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.setitem(sys.modules, "faster_whisper", package)
+    StubBatchedInferencePipeline.batches = []
+
+
+SUPPORTED_FIELDS = sorted(BATCH_OPTIONS) + ["suppress_tokens", "multilingual"]
+
+
+@pytest.fixture
+def faster_whisper(monkeypatch):
+    install_faster_whisper(monkeypatch, SUPPORTED_FIELDS)
+
+
+def samples(n):
+    return np.ones(n, dtype=np.float32)
+
+
+def test_concurrent_requests_are_batched_and_split_per_caller(faster_whisper):
+    batcher = BatchingTranscriber(Transcriber(), max_batch_size=8, max_wait_ms=200)
+    requests = [(samples(10), "en"), (samples(0), "en"), (samples(30), "it"), (samples(20), "en"),
+                (samples(250), "en")]
+
+    futures = [batcher.submit(audio, language) for audio, language in requests]
+    wait(futures, timeout=5)
+
+    assert [f.result() for f in futures] == ["10 en", "", "30 it", "20 en", "long 250 en"]
+    # One tokenizer per language; empty audio is skipped and audio longer than a window decodes alone
+    assert sorted(StubBatchedInferencePipeline.batches) == [("en", 2), ("it", 1)]
+    assert batcher.stats()["batches"] == 1
+    assert batcher.stats()["largest_batch"] == len(requests)
+
+
+def test_batch_size_is_capped(faster_whisper):
+    batcher = BatchingTranscriber(Transcriber(), max_batch_size=2, max_wait_ms=200)
+    futures = [batcher.submit(samples(n), "en") for n in (1, 2, 3)]
+    wait(futures, timeout=5)
+
+    assert [f.result() for f in futures] == ["1 en", "2 en", "3 en"]
+    assert batcher.stats()["largest_batch"] == 2
+
+
+def test_pool_falls_back_when_faster_whisper_internals_changed(monkeypatch):
+    install_faster_whisper(monkeypatch, SUPPORTED_FIELDS + ["new_required_option"])
+    with pytest.raises(RuntimeError, match="new_required_option"):
+        BatchingTranscriber.check_support()
+
+    pool = TranscriberPool(pool_size=1, num_workers=1, batching=True)
+
+    assert pool.batchers == []
+    assert pool.transcribe(samples(5), language="en") == "long 5 en"
+    assert StubBatchedInferencePipeline.batches == []
+
+
+def test_pool_batches_when_supported(faster_whisper):
+    pool = TranscriberPool(pool_size=1, num_workers=1, batching=True)
+    assert len(pool.batchers) == 1
+    assert pool.transcribe(samples(5), language="en") == "5 en"